@@ -1,3 +1,58 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import ChatMessage, ChatSession
+
+
+class ChatMessagePaginationTests(APITestCase):
+    """Cursor pages of chat history, oldest first"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.client.force_authenticate(self.user)
+        self.session = ChatSession.objects.create(user=self.user)
+        other_session = ChatSession.objects.create(user=self.user)
+        
+        # Most messages share one timestamp, so only the id orders them
+        now = timezone.now()
+        timestamps = [now - timedelta(seconds=1)] + [now] * 7 + [now + timedelta(seconds=1)]
+        self.messages = [
+            ChatMessage.objects.create(session=self.session, sender='user', message=str(index), timestamp=timestamp)
+            for index, timestamp in enumerate(timestamps)
+        ]
+        ChatMessage.objects.create(session=other_session, sender='bot', message='elsewhere', timestamp=now)
+    
+    def walk(self, url, direction='next'):
+        ids = []
+        last = None
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(set(response.data), {'next', 'previous', 'results'})
+            page = [message['id'] for message in response.data['results']]
+            ids = ids + page if direction == 'next' else page + ids
+            last, url = response, response.data[direction]
+        return ids, last
+    
+    def test_pages_neither_skip_nor_repeat_equal_timestamps(self):
+        ids, last = self.walk(f'/api/chatbot/messages/?session={self.session.id}&page_size=2')
+        self.assertEqual(ids, [message.id for message in self.messages])
+        
+        # And back again from the last page
+        back, _ = self.walk(last.data['previous'], direction='previous')
+        self.assertEqual(back, [message.id for message in self.messages[:-1]])
+    
+    def test_all_sessions_of_the_user(self):
+        ids, _ = self.walk('/api/chatbot/messages/?page_size=3')
+        self.assertEqual(len(ids), 10)
+    
+    def test_invalid_session_filter_is_empty(self):
+        response = self.client.get('/api/chatbot/messages/', {'session': 'abc'})
+        self.assertEqual(response.data['results'], [])
+    
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/api/chatbot/messages/', {'cursor': 'cD0yMDI2LTAxLTAxVDAwOjAwOjAwfHg='})
+        self.assertEqual(response.status_code, 404)
@@ -2,6 +2,7 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from config.pagination import ChronologicalCursorPagination
 from .models import ChatSession, ChatMessage, ChatbotContext
 from .serializers import ChatSessionSerializer, ChatMessageSerializer, ChatbotContextSerializer
 
@@ -40,9 +41,15 @@ class ChatMessageViewSet(viewsets.ModelViewSet):
     """API endpoint for chat messages"""
     serializer_class = ChatMessageSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ChronologicalCursorPagination
     
     def get_queryset(self):
-        return ChatMessage.objects.filter(session__user=self.request.user)
+        queryset = ChatMessage.objects.filter(session__user=self.request.user)
+        # ?session=<id> pages one conversation over the (session, timestamp) index
+        session_id = self.request.query_params.get('session')
+        if session_id is not None:
+            queryset = queryset.filter(session_id=session_id) if session_id.isdigit() else queryset.none()
+        return queryset
     
     @action(detail=False, methods=['post'])
     def send(self, request):
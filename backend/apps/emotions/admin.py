@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import EmotionLog, UserSession, UserProfile
+from .models import DetectionJob, EmotionLog, UserSession, UserProfile
 
 
 @admin.register(EmotionLog)
@@ -16,7 +16,16 @@ class UserSessionAdmin(admin.ModelAdmin):
     list_display = ['user', 'start_time', 'end_time', 'is_active', 'dominant_emotion', 'total_emotions_detected']
     list_filter = ['is_active', 'dominant_emotion', 'start_time']
     search_fields = ['user__username']
-    readonly_fields = ['start_time', 'end_time']
+    readonly_fields = ['start_time', 'end_time', *UserSession.STAT_FIELDS]
+
+
+@admin.register(DetectionJob)
+class DetectionJobAdmin(admin.ModelAdmin):
+    list_display = ['user', 'source', 'status', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'source', 'created_at']
+    search_fields = ['user__username']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+    exclude = ['payload']
 
 
 @admin.register(UserProfile)
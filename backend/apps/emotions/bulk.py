@@ -0,0 +1,133 @@
+"""
+Bulk ingestion of emotion logs recorded on the client
+
+Clients that detect emotions on-device, or buffer results while offline,
+upload them in one request. Entries are checked with plain validation
+functions instead of one ModelSerializer per row, and the valid ones are
+written with chunked bulk inserts in a single transaction.
+"""
+from datetime import timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import EmotionLog, UserSession
+
+
+EMOTION_TYPES = {choice for choice, _ in EmotionLog.EMOTION_CHOICES}
+SOURCES = {choice for choice, _ in EmotionLog.SOURCE_CHOICES}
+ENTRY_FIELDS = {'emotion_type', 'confidence', 'source', 'timestamp', 'raw_data', 'session_id'}
+
+
+def validate_entry(entry, session_ids):
+    """
+    Check one log entry and convert it to EmotionLog field values
+    
+    Args:
+        entry: Decoded JSON object of the entry
+        session_ids: IDs of the sessions the user may attach logs to
+    
+    Returns:
+        (field values, None) for a valid entry, or (None, errors by field)
+    """
+    if not isinstance(entry, dict):
+        return None, {'non_field_errors': 'Expected a JSON object'}
+    
+    errors = {}
+    unknown = set(entry) - ENTRY_FIELDS
+    if unknown:
+        errors['non_field_errors'] = f"Unknown fields: {', '.join(sorted(unknown))}"
+    
+    emotion_type = entry.get('emotion_type')
+    if emotion_type not in EMOTION_TYPES:
+        errors['emotion_type'] = f"Must be one of: {', '.join(sorted(EMOTION_TYPES))}"
+    
+    source = entry.get('source')
+    if source not in SOURCES:
+        errors['source'] = f"Must be one of: {', '.join(sorted(SOURCES))}"
+    
+    confidence = entry.get('confidence')
+    if isinstance(confidence, bool) or not isinstance(confidence, (int, float)) or not 0 <= confidence <= 1:
+        errors['confidence'] = 'Must be a number between 0 and 1'
+    
+    timestamp = entry.get('timestamp')
+    if timestamp is None:
+        timestamp = timezone.now()
+    else:
+        timestamp = _parse_timestamp(timestamp)
+        if timestamp is None:
+            errors['timestamp'] = 'Must be an ISO 8601 date-time'
+    
+    raw_data = entry.get('raw_data')
+    if raw_data is not None and not isinstance(raw_data, (dict, list)):
+        errors['raw_data'] = 'Must be a JSON object or array'
+    
+    session_id = entry.get('session_id')
+    if session_id is not None and session_id not in session_ids:
+        errors['session_id'] = 'Unknown session'
+    
+    if errors:
+        return None, errors
+    
+    return {
+        'emotion_type': emotion_type,
+        'confidence': float(confidence),
+        'source': source,
+        'timestamp': timestamp,
+        'raw_data': raw_data,
+        'session_id': session_id,
+    }, None
+
+
+def ingest_emotion_logs(user, entries, chunk_size=500):
+    """
+    Validate and store a batch of client-recorded emotion logs
+    
+    Args:
+        user: Owner of the logs
+        entries: Decoded JSON entries
+        chunk_size: Rows per INSERT statement
+    
+    Returns:
+        (number created, per-entry results in input order); each result has
+        the entry index and status 'created' with the log id, or 'invalid'
+        with errors by field
+    """
+    # One query for every session referenced by the batch
+    referenced = {entry.get('session_id') for entry in entries if isinstance(entry, dict)}
+    referenced = {session_id for session_id in referenced if isinstance(session_id, int) and not isinstance(session_id, bool)}
+    session_ids = set(UserSession.objects.filter(user=user, id__in=referenced).values_list('id', flat=True))
+    
+    results = []
+    logs = []
+    for index, entry in enumerate(entries):
+        values, errors = validate_entry(entry, session_ids)
+        if errors:
+            results.append({'index': index, 'status': 'invalid', 'errors': errors})
+        else:
+            results.append({'index': index, 'status': 'created'})
+            logs.append((index, EmotionLog(user=user, **values)))
+    
+    with transaction.atomic():
+        created = EmotionLog.objects.bulk_create([log for _, log in logs], batch_size=chunk_size)
+    
+    for (index, _), log in zip(logs, created):
+        results[index]['id'] = log.id
+    
+    return len(created), results
+
+
+def _parse_timestamp(value):
+    """Parse an ISO 8601 string into an aware datetime (naive values are taken as UTC)"""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        return None
+    if parsed is None:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
@@ -0,0 +1,212 @@
+"""
+Database-backed queue for asynchronous emotion detection
+
+The detect endpoint stores uploads as pending DetectionJob rows; worker
+processes (`python manage.py run_detection_worker`) claim pending jobs in
+batches, run one batched inference over them and write the EmotionLogs.
+Clients poll /api/emotions/jobs/<id>/ for the result.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ml_models.facial_emotion import facial_detector, keep_largest_face
+from ml_models.voice_emotion import voice_detector
+from .models import DetectionJob, EmotionLog
+from .results import face_raw_data, facial_response, voice_raw_data, voice_response
+
+
+def claim_jobs(limit):
+    """
+    Mark up to limit pending jobs as running and return them, oldest first
+    
+    Rows locked by another worker are skipped, so several workers can
+    claim concurrently without handing out the same job twice.
+    """
+    with transaction.atomic():
+        job_ids = list(
+            DetectionJob.objects.select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .order_by('created_at')
+            .values_list('id', flat=True)[:limit]
+        )
+        if job_ids:
+            DetectionJob.objects.filter(id__in=job_ids).update(
+                status='running',
+                started_at=timezone.now(),
+                attempts=F('attempts') + 1
+            )
+    
+    return list(DetectionJob.objects.filter(id__in=job_ids).select_related('user', 'session').order_by('created_at'))
+
+
+def requeue_stale_jobs(timeout, max_attempts):
+    """
+    Recover jobs left running by a worker that died: retry them, or fail
+    them after max_attempts
+    
+    Returns:
+        Number of jobs requeued
+    """
+    stale = DetectionJob.objects.filter(status='running', started_at__lt=timezone.now() - timedelta(seconds=timeout))
+    stale.filter(attempts__gte=max_attempts).update(
+        status='failed',
+        error='Detection timed out',
+        payload=None,
+        finished_at=timezone.now()
+    )
+    return stale.filter(attempts__lt=max_attempts).update(status='pending')
+
+
+def process_jobs(jobs):
+    """
+    Run detection for claimed jobs and store their results
+    
+    All facial jobs are classified with one detect_batch call and all voice
+    jobs with one detect_batch_from_bytes call. The EmotionLogs are then
+    written with one bulk insert, in the same transaction as the job
+    updates, so a job is never requeued once its log is stored. Jobs that
+    were requeued while running (and may belong to another worker now) are
+    left alone.
+    """
+    facial_jobs = [job for job in jobs if job.source == 'face']
+    voice_jobs = [job for job in jobs if job.source == 'voice']
+    for job in jobs:
+        if job.source not in ('face', 'voice'):
+            _fail(job, f'Unsupported source: {job.source}')
+    
+    pending_logs = []
+    if facial_jobs:
+        pending_logs += _detect_facial_jobs(facial_jobs)
+    if voice_jobs:
+        pending_logs += _detect_voice_jobs(voice_jobs)
+    
+    with transaction.atomic():
+        owned = set(
+            DetectionJob.objects.select_for_update()
+            .filter(status='running', id__in=[job.id for job in jobs])
+            .values_list('id', 'attempts')
+        )
+        jobs = [job for job in jobs if (job.id, job.attempts) in owned]
+        pending_logs = [entry for entry in pending_logs if (entry[0].id, entry[0].attempts) in owned]
+        
+        created = EmotionLog.objects.bulk_create([log for _, _, log, _ in pending_logs])
+        for (job, result, _, build_response), emotion_log in zip(pending_logs, created):
+            response = build_response(result, emotion_log, job.session)
+            response['timestamp'] = emotion_log.timestamp.isoformat()
+            job.emotion_log = emotion_log
+            _finish(job, response)
+        
+        DetectionJob.objects.bulk_update(jobs, ['status', 'result', 'error', 'emotion_log', 'payload', 'finished_at'])
+
+
+def run_pending(batch_size):
+    """
+    Claim and process one batch of pending jobs
+    
+    Returns:
+        Number of jobs processed
+    """
+    jobs = claim_jobs(batch_size)
+    if jobs:
+        process_jobs(jobs)
+    return len(jobs)
+
+
+def _detect_facial_jobs(jobs):
+    """
+    Classify facial jobs, finishing or failing those without a face
+    
+    Returns:
+        (job, result, unsaved EmotionLog, response builder) per detected face
+    """
+    frames = []
+    decoded_jobs = []
+    decode_infos = []
+    
+    for job in jobs:
+        frame, decode_info = facial_detector.decode(bytes(job.payload))
+        if frame is None:
+            _fail(job, 'Could not decode image')
+        else:
+            frames.append(frame)
+            decoded_jobs.append(job)
+            decode_infos.append(decode_info)
+    
+    if not frames:
+        return []
+    
+    try:
+        detections = facial_detector.detect_batch(frames)
+    except Exception as e:
+        for job in decoded_jobs:
+            _fail(job, f'Error processing image: {str(e)}')
+        return []
+    
+    logs = []
+    for job, result, decode_info in zip(decoded_jobs, detections, decode_infos):
+        result = facial_detector.apply_decode_info(result, decode_info)
+        if job.options.get('largest_face_only'):
+            result = keep_largest_face(result)
+        
+        if not result.get('face_detected', False):
+            _finish(job, {
+                'error': result.get('error', 'No face detected in image'),
+                'emotion': 'neutral',
+                'confidence': 0.0,
+                'face_detected': False
+            })
+            continue
+        
+        logs.append((job, result, EmotionLog(
+            user=job.user,
+            emotion_type=result['emotion'],
+            confidence=float(result['confidence']),
+            source='face',
+            session=job.session,
+            raw_data=face_raw_data(result)
+        ), facial_response))
+    
+    return logs
+
+
+def _detect_voice_jobs(jobs):
+    """
+    Classify voice jobs, failing those whose audio could not be processed
+    
+    Returns:
+        (job, result, unsaved EmotionLog, response builder) per processed clip
+    """
+    logs = []
+    results = voice_detector.detect_batch_from_bytes([bytes(job.payload) for job in jobs])
+    for job, result in zip(jobs, results):
+        if not result.get('audio_processed', False):
+            _fail(job, result.get('error', 'Could not process audio'))
+            continue
+        
+        logs.append((job, result, EmotionLog(
+            user=job.user,
+            emotion_type=result['emotion'],
+            confidence=float(result['confidence']),
+            source='voice',
+            session=job.session,
+            raw_data=voice_raw_data(result)
+        ), voice_response))
+    
+    return logs
+
+
+def _finish(job, result):
+    job.status = 'done'
+    job.result = result
+    job.payload = None
+    job.finished_at = timezone.now()
+
+
+def _fail(job, error):
+    job.status = 'failed'
+    job.error = error
+    job.payload = None
+    job.finished_at = timezone.now()
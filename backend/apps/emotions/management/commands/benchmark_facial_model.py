@@ -0,0 +1,109 @@
+import os
+import resource
+import time
+
+import cv2
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from ml_models.backends import get_backend
+from ml_models.facial_emotion import EMOTION_INPUT_SIZE, FacialEmotionDetector
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def _peak_rss_mb():
+    """Peak resident memory of this process (ru_maxrss is in KiB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = 'Check the ONNX emotion model against the DeepFace Keras model and compare their latency'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=settings.FACIAL_MODEL_PATH, help='ONNX model (default: FACIAL_MODEL_PATH)')
+        parser.add_argument(
+            '--images',
+            help='Directory of face images to compare on (default: random inputs, which only checks numerics)'
+        )
+        parser.add_argument('--samples', type=int, default=256, help='Number of random inputs without --images')
+        parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32])
+        parser.add_argument('--repeats', type=int, default=20, help='Timed runs per batch size')
+        parser.add_argument('--threads', type=int, default=settings.FACIAL_CLASSIFIER_THREADS, help='ONNX Runtime intra-op threads')
+        parser.add_argument('--min-agreement', type=float, default=0.98, help='Minimum top-1 agreement to pass')
+        parser.add_argument('--max-diff', type=float, default=0.05, help='Maximum absolute probability difference to pass')
+    
+    def handle(self, *args, **options):
+        faces = self._load_faces(options)
+        self.stdout.write(f'Comparing on {len(faces)} faces')
+        
+        # Load the lighter backend first so the peak RSS growth of each is visible
+        backends = {}
+        for name in ('onnx', 'keras'):
+            rss_before = _peak_rss_mb()
+            started = time.perf_counter()
+            backend = get_backend(name, model_path=options['model'], threads=options['threads'])
+            try:
+                backend.load()
+            except Exception as e:
+                raise CommandError(f'Could not load the {name} backend: {e}')
+            backends[name] = backend
+            self.stdout.write(
+                f'{name}: loaded in {time.perf_counter() - started:.2f}s, '
+                f'peak RSS +{_peak_rss_mb() - rss_before:.0f} MB'
+            )
+        
+        reference = backends['keras'].predict(faces)
+        candidate = backends['onnx'].predict(faces)
+        diff = np.abs(reference - candidate)
+        agreement = float(np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1)))
+        self.stdout.write(
+            f'Parity: top-1 agreement {agreement:.2%}, '
+            f'max abs diff {diff.max():.5f}, mean abs diff {diff.mean():.6f}'
+        )
+        
+        self.stdout.write('Latency per batch (p50 / p95 ms):')
+        for batch_size in options['batch_sizes']:
+            batch = faces[np.arange(batch_size) % len(faces)]
+            timings = {name: self._time(backend, batch, options['repeats']) for name, backend in backends.items()}
+            speedup = timings['keras'][0] / timings['onnx'][0] if timings['onnx'][0] else float('inf')
+            self.stdout.write(
+                f'  batch {batch_size:>3}: '
+                + ', '.join(f'{name} {p50:.2f} / {p95:.2f}' for name, (p50, p95) in timings.items())
+                + f' (onnx {speedup:.1f}x)'
+            )
+        
+        if agreement < options['min_agreement'] or diff.max() > options['max_diff']:
+            raise CommandError('The ONNX model does not match the Keras model within tolerance')
+        self.stdout.write(self.style.SUCCESS('Parity check passed'))
+    
+    def _load_faces(self, options):
+        """Preprocessed faces from --images, or random inputs in the model's range"""
+        if not options['images']:
+            rng = np.random.default_rng(0)
+            return rng.random((options['samples'], EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE, 1), dtype=np.float32)
+        
+        detector = FacialEmotionDetector(classifier=get_backend('keras'))
+        faces = []
+        for filename in sorted(os.listdir(options['images'])):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            frame = cv2.imread(os.path.join(options['images'], filename))
+            if frame is None:
+                continue
+            for face_obj in detector.extract_faces(frame):
+                faces.append(detector.preprocess_face(face_obj['face']))
+        
+        if not faces:
+            raise CommandError(f"No faces found in {options['images']}")
+        return np.stack(faces).astype(np.float32)
+    
+    def _time(self, backend, batch, repeats):
+        backend.predict(batch)
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            backend.predict(batch)
+            timings.append(1000 * (time.perf_counter() - started))
+        return float(np.percentile(timings, 50)), float(np.percentile(timings, 95))
@@ -0,0 +1,81 @@
+import io
+import time
+
+import numpy as np
+import soundfile as sf
+from django.core.management.base import BaseCommand, CommandError
+from ml_models.audio_utils import decode_audio
+from ml_models.voice_emotion import VoiceEmotionDetector
+
+
+# Sample rates of the generated clips: telephony, the feature rate, CD and video/browser audio
+SYNTHETIC_RATES = [16000, 22050, 44100, 48000]
+
+
+def _synthetic_clip(sr, duration, seed):
+    """A voiced-speech-like clip: a gliding harmonic tone with syllable-rate amplitude and noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sr * duration)) / sr
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sr
+    voice = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+    y = 0.1 * envelope * voice + 0.01 * rng.standard_normal(len(t))
+    return y.astype(np.float32)
+
+
+class Command(BaseCommand):
+    help = 'Time the stages of voice loading (decode, resample to the feature rate, feature extraction) per clip'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='*', help='Audio files to benchmark (default: synthetic clips at common rates)')
+        parser.add_argument('--duration', type=float, default=3.0, help='Seconds of audio per synthetic clip')
+        parser.add_argument('--repeats', type=int, default=10, help='Timed runs per clip and stage')
+    
+    def handle(self, *args, **options):
+        clips = self._load_clips(options)
+        detector = VoiceEmotionDetector()
+        repeats = options['repeats']
+        
+        self.stdout.write('Per clip: ms per stage (p50) and the share of resampling in the total')
+        for name, data in clips:
+            y, sr = decode_audio(data, max_duration=detector.max_duration)
+            resampled, feature_sr = detector.prepare_signal(y, sr)
+            stages = {
+                'decode': self._time(lambda: decode_audio(data, max_duration=detector.max_duration), repeats),
+                'resample': self._time(lambda: detector.prepare_signal(y, sr), repeats),
+                'features': self._time(lambda: detector.extract_features_from_signal(resampled, feature_sr), repeats),
+            }
+            total = sum(stages.values())
+            self.stdout.write(
+                f'  {name}: ' + ', '.join(f'{stage} {ms:.2f}' for stage, ms in stages.items())
+                + f', total {total:.2f} ms (resampling {100 * stages["resample"] / total:.0f}%)'
+            )
+    
+    def _load_clips(self, options):
+        """(name, encoded WAV/FLAC/... bytes) pairs"""
+        if options['files']:
+            clips = []
+            for path in options['files']:
+                try:
+                    with open(path, 'rb') as f:
+                        clips.append((path, f.read()))
+                except OSError as e:
+                    raise CommandError(str(e))
+            return clips
+        
+        clips = []
+        for seed, sr in enumerate(SYNTHETIC_RATES):
+            buffer = io.BytesIO()
+            sf.write(buffer, _synthetic_clip(sr, options['duration'], seed), sr, format='WAV', subtype='PCM_16')
+            clips.append((f'{sr} Hz', buffer.getvalue()))
+        return clips
+    
+    def _time(self, run, repeats):
+        run()
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            run()
+            timings.append(1000 * (time.perf_counter() - started))
+        return float(np.percentile(timings, 50))
@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from ml_models.backends import KerasEmotionBackend
+from ml_models.facial_emotion import EMOTION_INPUT_SIZE
+
+
+class Command(BaseCommand):
+    help = "Export DeepFace's Keras emotion model to ONNX (optionally int8-quantized) for the onnx classifier backend"
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=settings.FACIAL_MODEL_PATH,
+            help='Where to write the ONNX model (default: FACIAL_MODEL_PATH)'
+        )
+        parser.add_argument(
+            '--quantize',
+            action='store_true',
+            help='Quantize weights to int8 (smaller and faster on CPU, slightly less accurate)'
+        )
+        parser.add_argument('--opset', type=int, default=13, help='ONNX opset version')
+    
+    def handle(self, *args, **options):
+        try:
+            import tensorflow as tf
+            import tf2onnx
+        except ImportError as e:
+            raise CommandError(f'Exporting needs tensorflow and tf2onnx: {e}')
+        
+        output = options['output']
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        
+        model = KerasEmotionBackend().load().model
+        signature = (tf.TensorSpec((None, EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE, 1), tf.float32, name='face'),)
+        
+        if not options['quantize']:
+            tf2onnx.convert.from_keras(model, input_signature=signature, opset=options['opset'], output_path=output)
+        else:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            
+            with tempfile.TemporaryDirectory() as temp_dir:
+                float_path = os.path.join(temp_dir, 'facial_emotion.float.onnx')
+                tf2onnx.convert.from_keras(model, input_signature=signature, opset=options['opset'], output_path=float_path)
+                quantize_dynamic(float_path, output, weight_type=QuantType.QUInt8)
+        
+        size_mb = os.path.getsize(output) / (1024 * 1024)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {output} ({size_mb:.1f} MB)'))
+        self.stdout.write('Check it with: python manage.py benchmark_facial_model')
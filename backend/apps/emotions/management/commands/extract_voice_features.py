@@ -0,0 +1,175 @@
+import csv
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from ml_models.audio_features import FEATURE_DIM
+from ml_models.voice_emotion import VoiceEmotionDetector
+
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.ogg', '.mp3')
+INDEX_FIELDS = ['row', 'path', 'label', 'status']
+
+# Detector of each worker process, created by _init_worker
+_detector = None
+
+
+def _init_worker(max_duration):
+    global _detector
+    _detector = VoiceEmotionDetector()
+    _detector.max_duration = max_duration
+
+
+def _extract_chunk(rows, paths):
+    """
+    Decode a chunk of files and extract their features, batching the
+    signals that share a sample rate
+    
+    Returns:
+        (rows, features, statuses); files that fail to load get zero
+        features and status 'failed'
+    """
+    features = np.zeros((len(paths), FEATURE_DIM), dtype=np.float32)
+    statuses = ['ok'] * len(paths)
+    by_rate = defaultdict(list)
+    
+    for position, path in enumerate(paths):
+        try:
+            y, sr = _detector.load_signal(path)
+            y, sr = _detector.prepare_signal(y, sr)
+        except Exception:
+            statuses[position] = 'failed'
+            continue
+        by_rate[sr].append((position, y))
+    
+    for sr, items in by_rate.items():
+        positions = [position for position, _ in items]
+        features[positions] = _detector.extract_features_batch([y for _, y in items], sr)
+    
+    return rows, features, statuses
+
+
+class Command(BaseCommand):
+    help = 'Extract voice features for a dataset of audio clips into a memory-mapped .npy matrix (resumable)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--input',
+            default=os.path.join(settings.DATA_DIR, 'raw'),
+            help='Dataset directory; each clip is labelled with the name of its parent directory'
+        )
+        parser.add_argument(
+            '--output',
+            default=os.path.join(settings.DATA_DIR, 'processed'),
+            help='Directory for voice_features.npy and voice_features_index.csv'
+        )
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+        parser.add_argument('--chunk-size', type=int, default=64, help='Clips per task sent to a worker')
+        parser.add_argument(
+            '--max-duration',
+            type=float,
+            default=VoiceEmotionDetector().max_duration,
+            help='Seconds of audio read per clip (match the detector)'
+        )
+        parser.add_argument('--overwrite', action='store_true', help='Start over instead of resuming')
+    
+    def handle(self, *args, **options):
+        files = self._find_files(options['input'])
+        if not files:
+            raise CommandError(f"No audio files ({', '.join(AUDIO_EXTENSIONS)}) under {options['input']}")
+        
+        os.makedirs(options['output'], exist_ok=True)
+        matrix_path = os.path.join(options['output'], 'voice_features.npy')
+        index_path = os.path.join(options['output'], 'voice_features_index.csv')
+        
+        done = set() if options['overwrite'] else self._completed_rows(index_path, matrix_path, files)
+        if done:
+            matrix = np.load(matrix_path, mmap_mode='r+')
+        else:
+            matrix = np.lib.format.open_memmap(matrix_path, mode='w+', dtype=np.float32, shape=(len(files), FEATURE_DIM))
+            with open(index_path, 'w', newline='') as f:
+                csv.writer(f).writerow(INDEX_FIELDS)
+        
+        pending = [row for row in range(len(files)) if row not in done]
+        self.stdout.write(f'{len(files)} clips, {len(done)} already extracted, {len(pending)} to go')
+        if not pending:
+            return
+        
+        chunk_size = max(1, options['chunk_size'])
+        chunks = [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+        failed = 0
+        
+        with open(index_path, 'a', newline='') as index_file, ProcessPoolExecutor(
+            max_workers=max(1, options['workers']),
+            initializer=_init_worker,
+            initargs=(options['max_duration'],)
+        ) as pool:
+            writer = csv.writer(index_file)
+            futures = [
+                pool.submit(_extract_chunk, rows, [os.path.join(options['input'], files[row][0]) for row in rows])
+                for rows in chunks
+            ]
+            
+            for completed, future in enumerate(as_completed(futures), start=1):
+                rows, features, statuses = future.result()
+                matrix[rows] = features
+                # Rows reach the index only once their features are on disk,
+                # so an interrupted run resumes without gaps
+                matrix.flush()
+                for row, status in zip(rows, statuses):
+                    path, label = files[row]
+                    writer.writerow([row, path, label, status])
+                index_file.flush()
+                
+                failed += statuses.count('failed')
+                self.stdout.write(f'  {completed}/{len(chunks)} chunks', ending='\r')
+        
+        self.stdout.write('')
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} clips could not be decoded (status "failed" in the index)'))
+        self.stdout.write(self.style.SUCCESS(f'Wrote {matrix_path} and {index_path}'))
+    
+    def _find_files(self, root):
+        """Sorted (path relative to root, label) pairs of the audio files under root"""
+        files = []
+        for directory, _, names in os.walk(root):
+            for name in names:
+                if name.lower().endswith(AUDIO_EXTENSIONS):
+                    path = os.path.relpath(os.path.join(directory, name), root)
+                    files.append((path, os.path.basename(directory)))
+        return sorted(files)
+    
+    def _completed_rows(self, index_path, matrix_path, files):
+        """
+        Rows recorded by a previous run, after checking it covered the same
+        files; the index is rewritten without any line left incomplete by an
+        interruption
+        """
+        if not (os.path.exists(index_path) and os.path.exists(matrix_path)):
+            return set()
+        
+        matrix = np.load(matrix_path, mmap_mode='r')
+        if matrix.shape != (len(files), FEATURE_DIM):
+            raise CommandError(
+                f'{matrix_path} has shape {matrix.shape} but the dataset needs {(len(files), FEATURE_DIM)}; '
+                'use --overwrite to start over'
+            )
+        
+        entries = []
+        with open(index_path, newline='') as f:
+            for entry in csv.DictReader(f):
+                if entry.get('status') not in ('ok', 'failed'):
+                    continue
+                row = int(entry['row'])
+                if row >= len(files) or files[row][0] != entry['path']:
+                    raise CommandError(f'{index_path} does not match the dataset; use --overwrite to start over')
+                entries.append(entry)
+        
+        with open(index_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=INDEX_FIELDS)
+            writer.writeheader()
+            writer.writerows(entries)
+        return {int(entry['row']) for entry in entries}
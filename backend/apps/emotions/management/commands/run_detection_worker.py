@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ml_models.warmup import warmup_models
+from apps.emotions.jobs import requeue_stale_jobs, run_pending
+
+
+class Command(BaseCommand):
+    help = 'Process queued detection jobs (detect requests sent with async=true)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.DETECTION_JOB_BATCH_SIZE,
+            help='Jobs claimed and classified together'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.DETECTION_JOB_POLL_INTERVAL,
+            help='Seconds to wait when the queue is empty'
+        )
+        parser.add_argument('--once', action='store_true', help='Process the pending jobs, then exit')
+    
+    def handle(self, *args, **options):
+        warmup_models()
+        self.stdout.write(self.style.SUCCESS('Detection worker ready'))
+        
+        try:
+            while True:
+                requeued = requeue_stale_jobs(settings.DETECTION_JOB_TIMEOUT, settings.DETECTION_JOB_MAX_ATTEMPTS)
+                if requeued:
+                    self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale jobs'))
+                
+                processed = run_pending(options['batch_size'])
+                if processed:
+                    self.stdout.write(f'Processed {processed} jobs')
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Detection worker stopped')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from ml_models.inference_server import InferenceServer, get_server_settings
+
+
+class Command(BaseCommand):
+    help = 'Run the inference server that owns the emotion models in a fixed process pool'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', help='Unix socket path (default: ML_INFERENCE_SOCKET)')
+        parser.add_argument('--workers', type=int, help='Number of model processes (default: ML_INFERENCE_WORKERS)')
+    
+    def handle(self, *args, **options):
+        server_settings = get_server_settings()
+        address = options['socket'] or server_settings['address']
+        workers = options['workers'] or server_settings['workers']
+        
+        server = InferenceServer(address, server_settings['authkey'], workers=workers)
+        self.stdout.write(self.style.SUCCESS(f'Inference server listening on {address} with {workers} workers'))
+        
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Inference server stopped')
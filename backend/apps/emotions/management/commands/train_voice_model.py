@@ -0,0 +1,125 @@
+import csv
+import os
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from ml_models.voice_classifier import VoiceClassifier
+from apps.emotions.models import EmotionLog
+
+
+class Command(BaseCommand):
+    help = 'Train the voice emotion classifier on features from extract_voice_features and save it to VOICE_MODEL_PATH'
+    
+    def add_arguments(self, parser):
+        processed = os.path.join(settings.DATA_DIR, 'processed')
+        parser.add_argument('--features', default=os.path.join(processed, 'voice_features.npy'), help='Feature matrix')
+        parser.add_argument('--index', default=os.path.join(processed, 'voice_features_index.csv'), help='Label index')
+        parser.add_argument('--output', default=settings.VOICE_MODEL_PATH, help='Where to write the model (default: VOICE_MODEL_PATH)')
+        parser.add_argument(
+            '--map',
+            action='append',
+            default=[],
+            metavar='LABEL=EMOTION',
+            help='Rename a dataset label (e.g. calm=neutral); map to "skip" to leave a label out'
+        )
+        parser.add_argument('--hidden', type=int, default=64, help='Hidden layer width (0 for a linear model)')
+        parser.add_argument('--epochs', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=64)
+        parser.add_argument('--learning-rate', type=float, default=1e-3)
+        parser.add_argument('--weight-decay', type=float, default=1e-4)
+        parser.add_argument('--validation-split', type=float, default=0.2, help='Fraction of each class held out for evaluation')
+        parser.add_argument('--seed', type=int, default=0)
+    
+    def handle(self, *args, **options):
+        features, labels = self._load_dataset(options)
+        train, validation = self._split(labels, options['validation_split'], options['seed'])
+        self.stdout.write(f'{len(train)} training and {len(validation)} validation clips, classes: {", ".join(sorted(set(labels)))}')
+        
+        started = time.perf_counter()
+        classifier = VoiceClassifier.train(
+            features[train],
+            labels[train],
+            hidden=options['hidden'],
+            epochs=options['epochs'],
+            batch_size=options['batch_size'],
+            learning_rate=options['learning_rate'],
+            weight_decay=options['weight_decay'],
+            seed=options['seed']
+        )
+        self.stdout.write(f'Trained in {time.perf_counter() - started:.1f}s')
+        
+        if len(validation):
+            self._report(classifier, features[validation], labels[validation])
+        
+        output = options['output']
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        classifier.save(output)
+        # np.savez appends .npz to paths without it
+        if not output.endswith('.npz'):
+            os.replace(output + '.npz', output)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {output}'))
+    
+    def _load_dataset(self, options):
+        """Feature rows and emotion labels of the successfully extracted clips"""
+        try:
+            matrix = np.load(options['features'], mmap_mode='r')
+            with open(options['index'], newline='') as f:
+                entries = [entry for entry in csv.DictReader(f) if entry['status'] == 'ok']
+        except OSError as e:
+            raise CommandError(f'{e}; run `python manage.py extract_voice_features` first')
+        
+        mapping = {}
+        for item in options['map']:
+            source, _, target = item.partition('=')
+            if not target:
+                raise CommandError(f'Invalid --map {item!r}; use LABEL=EMOTION')
+            mapping[source] = target
+        
+        rows, labels = [], []
+        for entry in entries:
+            label = mapping.get(entry['label'], entry['label'])
+            if label != 'skip':
+                rows.append(int(entry['row']))
+                labels.append(label)
+        
+        emotions = {choice for choice, _ in EmotionLog.EMOTION_CHOICES}
+        unknown = sorted(set(labels) - emotions)
+        if unknown:
+            raise CommandError(
+                f"Labels {', '.join(unknown)} are not emotions ({', '.join(sorted(emotions))}); "
+                'rename or skip them with --map'
+            )
+        if len(set(labels)) < 2:
+            raise CommandError('Training needs clips of at least two emotions')
+        
+        rows = np.array(rows)
+        order = np.argsort(rows)
+        return np.asarray(matrix[rows[order]]), np.array(labels)[order]
+    
+    def _split(self, labels, fraction, seed):
+        """Stratified (train, validation) row indices"""
+        rng = np.random.default_rng(seed)
+        train, validation = [], []
+        for label in np.unique(labels):
+            rows = rng.permutation(np.flatnonzero(labels == label))
+            held_out = int(round(len(rows) * fraction))
+            validation.extend(rows[:held_out])
+            train.extend(rows[held_out:])
+        return np.array(train, dtype=int), np.array(validation, dtype=int)
+    
+    def _report(self, classifier, features, labels):
+        """Validation accuracy, per-emotion recall and inference latency"""
+        predicted = np.array(classifier.labels)[classifier.predict_proba(features).argmax(axis=1)]
+        self.stdout.write(f'Validation accuracy: {np.mean(predicted == labels):.3f}')
+        for label in classifier.labels:
+            mask = labels == label
+            if mask.any():
+                self.stdout.write(f'  {label}: recall {np.mean(predicted[mask] == label):.3f} ({mask.sum()} clips)')
+        
+        started = time.perf_counter()
+        for row in features[:100]:
+            classifier.predict_proba(row[np.newaxis])
+        per_clip = 1000 * (time.perf_counter() - started) / min(100, len(features))
+        self.stdout.write(f'Inference: {per_clip:.3f} ms per clip')
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from ml_models.warmup import DETECTORS, warmup_models
+
+
+class Command(BaseCommand):
+    help = 'Load emotion detection models and run a dummy inference so they are ready to serve'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models',
+            nargs='*',
+            help=f"Models to warm up: {', '.join(DETECTORS)} (default: all)"
+        )
+    
+    def handle(self, *args, **options):
+        unknown = set(options['models']) - set(DETECTORS)
+        if unknown:
+            raise CommandError(f"Unknown models: {', '.join(sorted(unknown))}")
+        
+        report = warmup_models(options['models'] or None)
+        
+        for name, result in report.items():
+            if result['warm']:
+                self.stdout.write(self.style.SUCCESS(f"{name}: warm in {result['seconds']}s"))
+            else:
+                self.stdout.write(self.style.ERROR(f"{name}: failed after {result['seconds']}s - {result['error']}"))
+        
+        if not all(result['warm'] for result in report.values()):
+            raise CommandError('Some models could not be warmed up')
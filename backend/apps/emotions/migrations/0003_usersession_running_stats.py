@@ -0,0 +1,88 @@
+# Generated by Django 6.0 on 2026-10-18 07:40
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_running_stats(apps, schema_editor):
+    """Fill the running statistics of existing sessions from their emotion logs"""
+    EmotionLog = apps.get_model('emotions', 'EmotionLog')
+    UserSession = apps.get_model('emotions', 'UserSession')
+    
+    count_fields = {field.name for field in UserSession._meta.get_fields() if field.name.endswith('_count')}
+    stats = defaultdict(lambda: {'total_emotions_detected': 0, 'confidence_sum': 0.0})
+    rows = (
+        EmotionLog.objects.filter(session__isnull=False)
+        .values('session_id', 'emotion_type')
+        .annotate(count=Count('id'), confidence=Sum('confidence'))
+        .order_by()
+    )
+    for row in rows:
+        field = f"{row['emotion_type']}_count"
+        if field not in count_fields:
+            continue
+        session_stats = stats[row['session_id']]
+        session_stats[field] = row['count']
+        session_stats['total_emotions_detected'] += row['count']
+        session_stats['confidence_sum'] += row['confidence'] or 0.0
+    
+    for session_id, session_stats in stats.items():
+        UserSession.objects.filter(pk=session_id).update(**session_stats)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emotions', '0002_detectionjob'),
+    ]
+    
+    operations = [
+        migrations.AddField(
+            model_name='usersession',
+            name='angry_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='confidence_sum',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='disgust_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='fear_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='happy_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='neutral_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='sad_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='surprise_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='worried_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_running_stats, migrations.RunPython.noop),
+    ]
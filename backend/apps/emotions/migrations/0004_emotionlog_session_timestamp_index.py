@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 07:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emotions', '0003_usersession_running_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emotionlog',
+            index=models.Index(fields=['session', 'timestamp'], name='emotions_em_session_3af701_idx'),
+        ),
+    ]
@@ -1,8 +1,59 @@
-from django.db import models
+from collections import defaultdict
+
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Sum, Value, When
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import User
 from django.utils import timezone
 
 
+class EmotionLogQuerySet(models.QuerySet):
+    # Fields feeding the sessions' running statistics
+    STAT_SOURCE_FIELDS = {'session', 'session_id', 'emotion_type', 'confidence'}
+    # Primary keys per statistics query, below SQLite's bound parameter limit
+    STAT_CHUNK_SIZE = 900
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        """Insert logs and add them to their sessions' running statistics in the same transaction"""
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            UserSession.record_emotions(created)
+        return created
+    
+    def update(self, **kwargs):
+        """
+        Update the logs; when a session, emotion or confidence changes, move
+        them between their sessions' running statistics in the same transaction
+        """
+        if not self.STAT_SOURCE_FIELDS & kwargs.keys():
+            return super().update(**kwargs)
+        
+        with transaction.atomic(using=self.db):
+            pks = list(self.select_for_update().values_list('pk', flat=True))
+            self._record_statistics(pks, sign=-1)
+            updated = super().update(**kwargs)
+            self._record_statistics(pks)
+        return updated
+    
+    update.alters_data = True
+    
+    def delete(self):
+        """Delete the logs and remove them from their sessions' running statistics in the same transaction"""
+        with transaction.atomic(using=self.db):
+            pks = list(self.select_for_update().values_list('pk', flat=True))
+            self._record_statistics(pks, sign=-1)
+            return super().delete()
+    
+    delete.alters_data = True
+    delete.queryset_only = True
+    
+    def _record_statistics(self, pks, sign=1):
+        """Add the logs with these primary keys to (sign=-1: remove them from) their sessions' running statistics"""
+        for start in range(0, len(pks), self.STAT_CHUNK_SIZE):
+            chunk = pks[start:start + self.STAT_CHUNK_SIZE]
+            UserSession.record_emotion_totals(self.model._base_manager.using(self.db).filter(pk__in=chunk), sign=sign)
+
+
 class EmotionLog(models.Model):
     """Stores detected emotions from face or voice analysis"""
     
@@ -33,15 +84,35 @@ class EmotionLog(models.Model):
     # Optional: Store raw data for analysis
     raw_data = models.JSONField(null=True, blank=True, help_text="Raw emotion detection data")
     
+    objects = EmotionLogQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-timestamp']
         indexes = [
             models.Index(fields=['user', '-timestamp']),
+            models.Index(fields=['session', 'timestamp']),
             models.Index(fields=['emotion_type']),
         ]
     
     def __str__(self):
         return f"{self.user.username} - {self.emotion_type} ({self.confidence:.2f}) at {self.timestamp}"
+    
+    def save(self, *args, **kwargs):
+        """Save the log, keeping its session's running statistics in step"""
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = EmotionLog.objects.filter(pk=self.pk).only('session_id', 'emotion_type', 'confidence').first()
+            super().save(*args, **kwargs)
+            if previous is not None:
+                UserSession.record_emotions([previous], sign=-1)
+            UserSession.record_emotions([self])
+    
+    def delete(self, *args, **kwargs):
+        """Delete the log and remove it from its session's running statistics"""
+        with transaction.atomic():
+            UserSession.record_emotions([self], sign=-1)
+            return super().delete(*args, **kwargs)
 
 
 class UserSession(models.Model):
@@ -52,10 +123,25 @@ class UserSession(models.Model):
     end_time = models.DateTimeField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
     
-    # Session statistics (calculated on session end)
+    # Session statistics (stored on session end)
     dominant_emotion = models.CharField(max_length=20, null=True, blank=True)
     average_confidence = models.FloatField(null=True, blank=True)
+    
+    # Running statistics, updated as emotion logs are stored
     total_emotions_detected = models.IntegerField(default=0)
+    confidence_sum = models.FloatField(default=0.0)
+    happy_count = models.IntegerField(default=0)
+    sad_count = models.IntegerField(default=0)
+    angry_count = models.IntegerField(default=0)
+    fear_count = models.IntegerField(default=0)
+    surprise_count = models.IntegerField(default=0)
+    disgust_count = models.IntegerField(default=0)
+    neutral_count = models.IntegerField(default=0)
+    worried_count = models.IntegerField(default=0)
+    
+    # Counter field of each emotion, in EMOTION_CHOICES order (the tie-break order for the dominant emotion)
+    COUNT_FIELDS = {emotion: f'{emotion}_count' for emotion, _ in EmotionLog.EMOTION_CHOICES}
+    STAT_FIELDS = ('total_emotions_detected', 'confidence_sum', *COUNT_FIELDS.values())
     
     class Meta:
         ordering = ['-start_time']
@@ -63,27 +149,134 @@ class UserSession(models.Model):
     def __str__(self):
         return f"{self.user.username} - Session {self.id} ({self.start_time})"
     
-    def end_session(self):
-        """End the session and calculate statistics"""
-        self.end_time = timezone.now()
-        self.is_active = False
+    def save(self, *args, **kwargs):
+        """
+        Save the session without writing back the running statistics, which
+        change only through record_emotions and may be stale on this instance
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.STAT_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
+    @property
+    def emotion_counts(self):
+        """Emotion logs of the session per emotion"""
+        return {emotion: getattr(self, field) for emotion, field in self.COUNT_FIELDS.items()}
+    
+    @property
+    def current_dominant_emotion(self):
+        """Most frequent emotion so far (None before the first log)"""
+        if not self.total_emotions_detected:
+            return None
+        counts = self.emotion_counts
+        return max(counts, key=counts.get)
+    
+    @property
+    def current_average_confidence(self):
+        """Mean confidence of the session's logs so far (None before the first log)"""
+        if not self.total_emotions_detected:
+            return None
+        return self.confidence_sum / self.total_emotions_detected
+    
+    @classmethod
+    def record_emotions(cls, logs, sign=1):
+        """
+        Add logs to (sign=-1: remove them from) their sessions' running
+        statistics, with one atomic UPDATE per session
+        """
+        cls._record_totals(((log.session_id, log.emotion_type, 1, log.confidence) for log in logs), sign)
+    
+    @classmethod
+    def record_emotion_totals(cls, logs, sign=1):
+        """Same as record_emotions for a queryset of logs, totalled per session and emotion in the database"""
+        totals = (
+            logs.filter(session__isnull=False)
+            .values_list('session_id', 'emotion_type')
+            .annotate(Count('id'), Sum('confidence'))
+            .order_by()
+        )
+        cls._record_totals(totals, sign)
+    
+    @classmethod
+    def _record_totals(cls, totals, sign):
+        """Apply (session_id, emotion_type, count, confidence_sum) rows to the running statistics"""
+        deltas = defaultdict(lambda: defaultdict(float))
+        for session_id, emotion_type, count, confidence in totals:
+            if session_id is None or emotion_type not in cls.COUNT_FIELDS:
+                continue
+            delta = deltas[session_id]
+            delta['total_emotions_detected'] += sign * count
+            delta['confidence_sum'] += sign * float(confidence)
+            delta[cls.COUNT_FIELDS[emotion_type]] += sign * count
         
-        # Calculate statistics
-        emotions = self.emotions.all()
-        if emotions.exists():
-            self.total_emotions_detected = emotions.count()
-            self.average_confidence = emotions.aggregate(models.Avg('confidence'))['confidence__avg']
-            
-            # Find dominant emotion
-            from django.db.models import Count
-            dominant = emotions.values('emotion_type').annotate(
-                count=Count('emotion_type')
-            ).order_by('-count').first()
-            
-            if dominant:
-                self.dominant_emotion = dominant['emotion_type']
+        for session_id, delta in deltas.items():
+            cls.objects.filter(pk=session_id).update(**{
+                field: F(field) + (value if field == 'confidence_sum' else int(value))
+                for field, value in delta.items()
+            })
+    
+    def end_session(self):
+        """End the session and store its statistics from the running counters, in one UPDATE"""
+        counts = [F(field) for field in self.COUNT_FIELDS.values()]
+        most = Greatest(*counts)
         
-        self.save()
+        UserSession.objects.filter(pk=self.pk).update(
+            end_time=timezone.now(),
+            is_active=False,
+            average_confidence=Case(
+                When(total_emotions_detected__gt=0, then=F('confidence_sum') / F('total_emotions_detected')),
+                default=None,
+                output_field=models.FloatField()
+            ),
+            dominant_emotion=Case(
+                When(total_emotions_detected=0, then=Value(None)),
+                *[When(**{field: most}, then=Value(emotion)) for emotion, field in self.COUNT_FIELDS.items()],
+                default=None,
+                output_field=models.CharField()
+            )
+        )
+        self.refresh_from_db()
+
+
+class DetectionJob(models.Model):
+    """Queued emotion detection, processed by `python manage.py run_detection_worker`"""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='detection_jobs')
+    session = models.ForeignKey(UserSession, on_delete=models.SET_NULL, related_name='detection_jobs', null=True, blank=True)
+    source = models.CharField(max_length=10, choices=EmotionLog.SOURCE_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    
+    # Uploaded media, cleared once the job has finished
+    payload = models.BinaryField(null=True, blank=True)
+    options = models.JSONField(default=dict, blank=True)
+    
+    result = models.JSONField(null=True, blank=True, help_text="Detection response, as returned by the detect endpoint")
+    error = models.TextField(blank=True)
+    emotion_log = models.ForeignKey(EmotionLog, on_delete=models.SET_NULL, related_name='+', null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.source} job {self.id} ({self.status})"
 
 
 class UserProfile(models.Model):
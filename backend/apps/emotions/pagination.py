@@ -0,0 +1,8 @@
+from django.conf import settings
+from config.pagination import TimestampCursorPagination
+
+
+class SessionEmotionPagination(TimestampCursorPagination):
+    """Pages of a session's emotion logs (GET /api/emotions/sessions/{id}/emotions/), over the (session, timestamp) index"""
+    page_size = settings.SESSION_EMOTIONS_PAGE_SIZE
+    max_page_size = settings.SESSION_EMOTIONS_MAX_PAGE_SIZE
@@ -0,0 +1,68 @@
+"""
+Conversion of detection results into EmotionLog raw data and response bodies
+
+Shared by the API views, the detection job worker and the WebSocket stream,
+so every path stores and returns the same shapes.
+"""
+from ml_models.facial_emotion import EMOTION_LABELS
+
+
+def serializable_scores(result):
+    """Convert numpy types to Python native types for JSON serialization"""
+    all_emotions = result.get('all_emotions', {})
+    return {emotion: float(score) for emotion, score in all_emotions.items()}
+
+
+def face_raw_data(result):
+    """
+    Compact raw data for a facial EmotionLog: the primary face's scores plus
+    every face's box, emotion and scores (in EMOTION_LABELS order)
+    """
+    return {
+        'all_emotions': serializable_scores(result),
+        'faces': [
+            {
+                'box': [face['region'][key] for key in ('x', 'y', 'w', 'h')],
+                'emotion': face['emotion'],
+                'confidence': round(float(face['confidence']), 4),
+                'scores': [round(float(face['all_emotions'][label]), 2) for label in EMOTION_LABELS],
+            }
+            for face in result.get('faces', [])
+        ],
+    }
+
+
+def facial_response(result, emotion_log, session):
+    """Response body for a stored facial detection"""
+    return {
+        'id': emotion_log.id,
+        'emotion': result['emotion'],
+        'confidence': float(result['confidence']),
+        'face_detected': True,
+        'all_emotions': serializable_scores(result),
+        'face_count': result['face_count'],
+        'faces': result['faces'],
+        'pipeline': result.get('pipeline'),
+        'timestamp': emotion_log.timestamp,
+        'session_id': session.id if session else None
+    }
+
+
+def voice_raw_data(result):
+    """Raw data for a voice EmotionLog: the acoustic feature vector and class probabilities"""
+    raw_data = {'features': [round(float(value), 6) for value in result.get('features', [])]}
+    if 'all_emotions' in result:
+        raw_data['all_emotions'] = result['all_emotions']
+    return raw_data
+
+
+def voice_response(result, emotion_log, session):
+    """Response body for a stored voice detection"""
+    return {
+        'id': emotion_log.id,
+        'emotion': result['emotion'],
+        'confidence': float(result['confidence']),
+        'audio_processed': True,
+        'timestamp': emotion_log.timestamp,
+        'session_id': session.id if session else None
+    }
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import EmotionLog, UserSession, UserProfile
+from .models import DetectionJob, EmotionLog, UserSession, UserProfile
 
 
 class EmotionDetectionSerializer(serializers.Serializer):
@@ -29,17 +29,46 @@ class EmotionLogSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'timestamp']
 
 
+class DetectionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DetectionJob
+        fields = ['id', 'source', 'status', 'result', 'error', 'emotion_log', 'session',
+                  'attempts', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+
+class EmotionLogSummarySerializer(serializers.ModelSerializer):
+    """Emotion log without its raw detection data"""
+    
+    class Meta:
+        model = EmotionLog
+        fields = ['id', 'emotion_type', 'confidence', 'source', 'timestamp']
+        read_only_fields = fields
+
+
 class UserSessionSerializer(serializers.ModelSerializer):
-    emotions = EmotionLogSerializer(many=True, read_only=True)
+    """Session with its summary statistics; the logs are paged at sessions/{id}/emotions/"""
+    # Live values from the running statistics, also while the session is active
+    dominant_emotion = serializers.CharField(source='current_dominant_emotion', read_only=True)
+    average_confidence = serializers.FloatField(source='current_average_confidence', read_only=True)
+    emotion_counts = serializers.DictField(child=serializers.IntegerField(), read_only=True)
     
     class Meta:
         model = UserSession
         fields = ['id', 'start_time', 'end_time', 'is_active', 'dominant_emotion', 
-                  'average_confidence', 'total_emotions_detected', 'emotions']
+                  'average_confidence', 'total_emotions_detected', 'emotion_counts']
         read_only_fields = ['id', 'start_time', 'end_time', 'dominant_emotion', 
                             'average_confidence', 'total_emotions_detected']
 
 
+class UserSessionDetailSerializer(UserSessionSerializer):
+    """Session summary plus its latest logs, prefetched into recent_emotions by the view"""
+    recent_emotions = EmotionLogSummarySerializer(many=True, read_only=True)
+    
+    class Meta(UserSessionSerializer.Meta):
+        fields = UserSessionSerializer.Meta.fields + ['recent_emotions']
+
+
 class UserProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     
@@ -0,0 +1,208 @@
+"""
+Live facial emotion detection over a WebSocket
+
+Clients connect to /ws/emotions/stream/?session_id=<id> with their Django
+session cookie, send encoded frames (JPEG/PNG/BMP) as binary messages and
+receive JSON emotion updates. Only the newest frame is kept while a frame
+is being analyzed, so a client sending faster than the server can keep up
+has its older frames skipped instead of queued.
+"""
+import asyncio
+import json
+from http.cookies import SimpleCookie
+from importlib import import_module
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.http.request import validate_host
+
+from ml_models.facial_emotion import facial_detector
+from ml_models.image_utils import sniff_image_type
+from .models import EmotionLog, UserSession
+from .results import face_raw_data
+
+
+STREAM_PATH = '/ws/emotions/stream/'
+
+# WebSocket close codes
+CLOSE_FORBIDDEN_ORIGIN = 4003
+CLOSE_UNAUTHENTICATED = 4001
+CLOSE_SESSION_NOT_FOUND = 4004
+
+
+def _headers(scope):
+    return {name.decode('latin-1'): value.decode('latin-1') for name, value in scope.get('headers', [])}
+
+
+def _origin_allowed(headers):
+    """Reject cross-site connections, since the socket authenticates with the session cookie"""
+    origin = headers.get('origin')
+    if not origin or getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False):
+        return True
+    if origin in getattr(settings, 'CORS_ALLOWED_ORIGINS', []):
+        return True
+    return validate_host(urlparse(origin).hostname or '', settings.ALLOWED_HOSTS)
+
+
+def _load_user(session_key):
+    """Resolve the user of a Django session key, as AuthenticationMiddleware would"""
+    engine = import_module(settings.SESSION_ENGINE)
+    request = SimpleNamespace(session=engine.SessionStore(session_key))
+    return get_user(request)
+
+
+def _load_session(user, session_id):
+    """Return the user's active session with this id, or get/create their active session"""
+    if session_id:
+        return UserSession.objects.filter(id=session_id, user=user, is_active=True).first()
+    session, _ = UserSession.objects.get_or_create(user=user, is_active=True)
+    return session
+
+
+def _save_log(user, session, result):
+    return EmotionLog.objects.create(
+        user=user,
+        emotion_type=result['emotion'],
+        confidence=float(result['confidence']),
+        source='face',
+        session=session,
+        raw_data=face_raw_data(result)
+    )
+
+
+class EmotionStream:
+    """One WebSocket connection streaming frames for a UserSession"""
+    
+    def __init__(self, scope, receive, send):
+        self.scope = scope
+        self.receive = receive
+        self.send = send
+        self.user = None
+        self.session = None
+        self.latest_frame = None
+        self.frame_ready = asyncio.Event()
+        self.received = 0
+        self.analyzed = 0
+        self.skipped = 0
+        self.track_key = None
+    
+    async def run(self):
+        message = await self.receive()
+        if message['type'] != 'websocket.connect':
+            return
+        
+        headers = _headers(self.scope)
+        if not _origin_allowed(headers):
+            return await self.close(CLOSE_FORBIDDEN_ORIGIN)
+        
+        cookies = SimpleCookie(headers.get('cookie', ''))
+        session_cookie = cookies.get(settings.SESSION_COOKIE_NAME)
+        self.user = await sync_to_async(_load_user)(session_cookie.value if session_cookie else None)
+        if not self.user.is_authenticated:
+            return await self.close(CLOSE_UNAUTHENTICATED)
+        
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        session_id = query.get('session_id', [None])[0]
+        try:
+            self.session = await sync_to_async(_load_session)(self.user, session_id)
+        except ValueError:
+            self.session = None
+        if self.session is None:
+            return await self.close(CLOSE_SESSION_NOT_FOUND)
+        
+        # Faces are tracked per connection, so frames from one camera share a track
+        self.track_key = f'stream:{id(self)}'
+        await self.send({'type': 'websocket.accept'})
+        await self.send_json({'type': 'session', 'session_id': self.session.id})
+        
+        worker = asyncio.create_task(self.process_frames())
+        try:
+            while True:
+                message = await self.receive()
+                if message['type'] == 'websocket.disconnect':
+                    break
+                if message.get('bytes'):
+                    self.queue_frame(message['bytes'])
+                elif message.get('text'):
+                    await self.handle_text(message['text'])
+        finally:
+            worker.cancel()
+            if facial_detector.tracker is not None:
+                facial_detector.tracker.drop(self.track_key)
+    
+    def queue_frame(self, data):
+        """Keep only the newest frame; a frame still waiting here is skipped"""
+        self.received += 1
+        if self.latest_frame is not None:
+            self.skipped += 1
+        self.latest_frame = data
+        self.frame_ready.set()
+    
+    async def handle_text(self, text):
+        try:
+            message = json.loads(text)
+        except ValueError:
+            message = {}
+        
+        if message.get('type') == 'ping':
+            await self.send_json({'type': 'pong', **self.stats()})
+    
+    async def process_frames(self):
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            await self.frame_ready.wait()
+            self.frame_ready.clear()
+            data, self.latest_frame = self.latest_frame, None
+            
+            if len(data) > settings.FILE_UPLOAD_MAX_MEMORY_SIZE or sniff_image_type(data) is None:
+                await self.send_json({'type': 'error', 'error': 'Invalid frame. Send JPEG, PNG or BMP images.'})
+                continue
+            
+            try:
+                started = loop.time()
+                result = await sync_to_async(facial_detector.detect_from_bytes, thread_sensitive=False)(
+                    data, self.track_key, f'user:{self.user.id}'
+                )
+                self.analyzed += 1
+                
+                update = {
+                    'type': 'emotion',
+                    'emotion': result['emotion'],
+                    'confidence': float(result['confidence']),
+                    'face_detected': result.get('face_detected', False),
+                    'latency_ms': round(1000 * (loop.time() - started), 1),
+                    **self.stats()
+                }
+                
+                if result.get('face_detected', False):
+                    emotion_log = await sync_to_async(_save_log)(self.user, self.session, result)
+                    update.update({
+                        'id': emotion_log.id,
+                        'all_emotions': result['all_emotions'],
+                        'face_count': result['face_count'],
+                        'timestamp': emotion_log.timestamp.isoformat()
+                    })
+                else:
+                    update['error'] = result.get('error', 'No face detected in image')
+                
+                await self.send_json(update)
+            except Exception as e:
+                await self.send_json({'type': 'error', 'error': f'Error processing frame: {str(e)}'})
+    
+    def stats(self):
+        return {'frames_received': self.received, 'frames_analyzed': self.analyzed, 'frames_skipped': self.skipped}
+    
+    async def send_json(self, data):
+        await self.send({'type': 'websocket.send', 'text': json.dumps(data)})
+    
+    async def close(self, code):
+        await self.send({'type': 'websocket.close', 'code': code})
+
+
+async def emotion_stream(scope, receive, send):
+    """ASGI application for the emotion WebSocket endpoint"""
+    await EmotionStream(scope, receive, send).run()
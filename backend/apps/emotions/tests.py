@@ -1,3 +1,1163 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from importlib.util import find_spec
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APITestCase
+
+from ml_models.backends import EmotionBackend
+from ml_models.cache import DetectionCache
+from ml_models.facial_emotion import EMOTION_LABELS, FacialEmotionDetector
+from ml_models.fusion import CombinedEmotionDetector, fuse_scores
+from ml_models.tracking import FaceTracker
+from apps.emotions.bulk import ingest_emotion_logs, validate_entry
+from apps.emotions.jobs import claim_jobs, process_jobs, requeue_stale_jobs
+from apps.emotions.models import DetectionJob, EmotionLog, EmotionLogQuerySet, UserSession
+from apps.emotions.parsers import NDJSONParser
+from ml_models.audio_features import FEATURE_DIM
+from ml_models.vad import VoiceActivitySegmenter
+from ml_models.voice_classifier import VoiceClassifier
+from ml_models.voice_emotion import VoiceEmotionDetector
+
+
+def _face_crops(count=16, size=96, seed=0):
+    """Fixed BGR crops: smooth random shading, the same on every run"""
+    import cv2
+    
+    rng = np.random.default_rng(seed)
+    crops = []
+    for _ in range(count):
+        noise = rng.random((size // 8, size // 8, 3), dtype=np.float32)
+        crops.append((255 * cv2.resize(noise, (size, size), interpolation=cv2.INTER_CUBIC).clip(0, 1)).astype(np.uint8))
+    return crops
+
+
+@skipUnless(
+    find_spec('deepface') and find_spec('onnxruntime') and os.path.exists(settings.FACIAL_MODEL_PATH),
+    'needs deepface, onnxruntime and the exported model (python manage.py export_facial_model)'
+)
+class FacialBackendParityTests(SimpleTestCase):
+    """The ONNX classifier must reproduce DeepFace's Keras model"""
+    
+    # Same thresholds as benchmark_facial_model
+    MIN_AGREEMENT = 0.98
+    MAX_DIFF = 0.05
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from ml_models.backends import KerasEmotionBackend, OnnxEmotionBackend
+        from ml_models.facial_emotion import FacialEmotionDetector
+        
+        cls.keras = FacialEmotionDetector(classifier=KerasEmotionBackend())
+        cls.onnx = FacialEmotionDetector(classifier=OnnxEmotionBackend(settings.FACIAL_MODEL_PATH))
+        cls.crops = _face_crops()
+    
+    def assertParity(self, reference, candidate):
+        """Top-1 agreement and largest probability difference (inputs in percent)"""
+        agreement = np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1))
+        self.assertGreaterEqual(agreement, self.MIN_AGREEMENT)
+        self.assertLessEqual(np.abs(reference - candidate).max() / 100, self.MAX_DIFF)
+    
+    def test_onnx_matches_keras_backend(self):
+        self.assertParity(self.keras.classify_crops(self.crops), self.onnx.classify_crops(self.crops))
+    
+    def test_onnx_matches_deepface_analyze(self):
+        from deepface import DeepFace
+        
+        reference = []
+        for crop in self.crops:
+            result = DeepFace.analyze(img_path=crop, actions=['emotion'], detector_backend='skip', enforce_detection=False)
+            scores = result[0]['emotion'] if isinstance(result, list) else result['emotion']
+            reference.append([scores[label] for label in EMOTION_LABELS])
+        
+        self.assertParity(np.array(reference), self.onnx.classify_crops(self.crops))
+
+
+class _StubEmotionBackend(EmotionBackend):
+    """Classifier that finds every face happy"""
+    
+    name = 'stub'
+    
+    def _load(self):
+        return object()
+    
+    def predict(self, faces):
+        self.load()
+        scores = np.full((len(faces), len(EMOTION_LABELS)), 0.05)
+        scores[:, EMOTION_LABELS.index('happy')] = 0.7
+        return scores
+
+
+def _face_object(x=10, y=10, w=40, h=40, confidence=0.9):
+    """DeepFace extract_faces entry for a face at the given box"""
+    return {'face': np.full((h, w, 3), 0.5), 'facial_area': {'x': x, 'y': y, 'w': w, 'h': h}, 'confidence': confidence}
+
+
+class FacialBatchTests(SimpleTestCase):
+    """FacialEmotionDetector.detect_batch with face detection mocked"""
+    
+    def setUp(self):
+        self.detector = FacialEmotionDetector(classifier=_StubEmotionBackend(), detector_backend='opencv', max_image_side=0)
+        self.frames = [np.zeros((120, 160, 3), dtype=np.uint8) for _ in range(3)]
+    
+    def test_every_frame_gets_a_result(self):
+        faces = [[_face_object()], [], [_face_object(), _face_object(x=80, w=60, h=60)]]
+        with patch.object(self.detector, 'extract_faces', side_effect=faces):
+            results = self.detector.detect_batch(self.frames)
+        
+        self.assertEqual([result['face_detected'] for result in results], [True, False, True])
+        self.assertEqual(results[1]['error'], 'No face detected')
+        self.assertEqual(results[0]['emotion'], 'happy')
+        self.assertEqual(results[2]['face_count'], 2)
+        self.assertEqual(results[2]['faces'][0]['region'], {'x': 10, 'y': 10, 'w': 40, 'h': 40})
+    
+    def test_detection_errors_stay_per_frame(self):
+        faces = [[_face_object()], RuntimeError('detector failed'), []]
+        with patch.object(self.detector, 'extract_faces', side_effect=faces):
+            results = self.detector.detect_batch(self.frames)
+        
+        self.assertTrue(results[0]['face_detected'])
+        self.assertEqual(results[1]['error'], 'detector failed')
+        self.assertEqual(results[2]['error'], 'No face detected')
+    
+    def test_decode_info_applies_to_frames_without_faces(self):
+        with patch.object(self.detector, 'extract_faces', return_value=[]):
+            result = self.detector.detect_batch(self.frames[:1])[0]
+        
+        self.assertEqual(self.detector.apply_decode_info(result, {'input_size': [160, 120], 'decode_scale': 1}), result)
+
+
+class DetectionCacheTests(SimpleTestCase):
+    """DetectionCache counters, expiry, eviction, perceptual matching and scoping"""
+    
+    RESULT = {'emotion': 'happy', 'face_detected': True}
+    
+    def test_hit_and_miss_counters(self):
+        cache = DetectionCache()
+        cache.put('a', self.RESULT)
+        
+        self.assertEqual(cache.get('a'), self.RESULT)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats(), {'size': 1, 'exact_hits': 1, 'perceptual_hits': 0, 'misses': 1, 'hit_rate': 0.5})
+    
+    def test_results_are_copies(self):
+        cache = DetectionCache()
+        cache.put('a', self.RESULT)
+        cache.get('a')['emotion'] = 'sad'
+        self.assertEqual(cache.get('a')['emotion'], 'happy')
+    
+    def test_entries_expire_after_ttl(self):
+        cache = DetectionCache(ttl=10.0)
+        with patch('ml_models.cache.time.monotonic', return_value=100.0):
+            cache.put('a', self.RESULT)
+        with patch('ml_models.cache.time.monotonic', return_value=109.0):
+            self.assertIsNotNone(cache.get('a'))
+        with patch('ml_models.cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get('a'))
+            cache.put('b', self.RESULT)
+        self.assertEqual(cache.stats()['size'], 1)
+    
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = DetectionCache(max_size=2)
+        cache.put('a', self.RESULT)
+        cache.put('b', self.RESULT)
+        cache.get('a')
+        cache.put('c', self.RESULT)
+        
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+    
+    def test_perceptual_hits_within_hamming_distance(self):
+        cache = DetectionCache(phash_distance=2)
+        cache.put('a', self.RESULT, phash=0b1111)
+        
+        self.assertIsNotNone(cache.get('b', phash=0b1100))
+        self.assertIsNone(cache.get('c', phash=0b1000))
+        self.assertEqual(cache.stats()['perceptual_hits'], 1)
+    
+    def test_perceptual_hash_of_similar_frames(self):
+        frame = np.tile(np.arange(0, 240, 3, dtype=np.uint8), (60, 1))
+        brighter = np.clip(frame.astype(int) + 5, 0, 255).astype(np.uint8)
+        
+        self.assertEqual(DetectionCache.perceptual_hash(frame), DetectionCache.perceptual_hash(brighter))
+        self.assertNotEqual(DetectionCache.perceptual_hash(frame), DetectionCache.perceptual_hash(frame[:, ::-1]))
+    
+    def test_scopes_do_not_share_entries(self):
+        cache = DetectionCache(phash_distance=4)
+        cache.put('a', self.RESULT, phash=0b1111, scope='user:1')
+        
+        self.assertIsNotNone(cache.get('a', phash=0b1111, scope='user:1'))
+        self.assertIsNone(cache.get('a', phash=0b1111, scope='user:2'))
+        self.assertIsNone(cache.get('b', phash=0b1110, scope='user:2'))
+        self.assertIsNone(cache.get('a'))
+    
+    def test_detector_caches_per_scope(self):
+        detector = FacialEmotionDetector(classifier=_StubEmotionBackend(), max_image_side=0)
+        detector.enable_cache(phash_distance=4)
+        image = _image_bytes()
+        with patch.object(detector, 'extract_faces', return_value=[_face_object()]) as extract_faces:
+            first = detector.detect_from_bytes(image, scope='user:1')
+            self.assertEqual(detector.detect_from_bytes(image, scope='user:1'), first)
+            detector.detect_from_bytes(image, scope='user:2')
+        
+        self.assertEqual(extract_faces.call_count, 2)
+
+
+class FaceTrackerTests(SimpleTestCase):
+    """FaceTracker and FacialEmotionDetector.detect_tracked on a textured patch moving over a noise background"""
+    
+    REGION = {'x': 60, 'y': 40, 'w': 40, 'h': 40}
+    
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.background = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+        self.face = rng.integers(0, 256, (40, 40, 3), dtype=np.uint8)
+        self.tracker = FaceTracker(redetect_interval=3, ttl=30.0)
+    
+    def frame(self, dx=0, dy=0, face=True):
+        frame = self.background.copy()
+        if face:
+            x, y = self.REGION['x'] + dx, self.REGION['y'] + dy
+            frame[y:y + 40, x:x + 40] = self.face
+        return frame
+    
+    def test_track_follows_the_face(self):
+        self.tracker.start('a', self.frame(), self.REGION)
+        region, similarity = self.tracker.track('a', self.frame(dx=6, dy=-4))
+        
+        self.assertEqual(region, {'x': 66, 'y': 36, 'w': 40, 'h': 40})
+        self.assertGreater(similarity, 0.99)
+        self.assertIsNone(self.tracker.track('b', self.frame()))
+    
+    def test_lost_face_drops_the_track(self):
+        self.tracker.start('a', self.frame(), self.REGION)
+        
+        self.assertIsNone(self.tracker.track('a', self.frame(face=False)))
+        self.assertIsNone(self.tracker.track('a', self.frame()))
+        self.assertEqual(self.tracker.stats(), {'tracks': 0, 'tracked_frames': 0, 'detections': 1, 'lost': 1})
+    
+    def test_redetection_is_due_after_interval(self):
+        self.tracker.start('a', self.frame(), self.REGION)
+        for _ in range(3):
+            self.assertIsNotNone(self.tracker.track('a', self.frame()))
+        self.assertIsNone(self.tracker.track('a', self.frame()))
+    
+    def test_idle_tracks_expire(self):
+        with patch('ml_models.tracking.time.monotonic', return_value=100.0):
+            self.tracker.start('a', self.frame(), self.REGION)
+        with patch('ml_models.tracking.time.monotonic', return_value=131.0):
+            self.assertIsNone(self.tracker.track('a', self.frame()))
+        self.assertEqual(self.tracker.stats()['tracks'], 0)
+    
+    def test_least_recently_used_track_is_evicted(self):
+        tracker = FaceTracker(max_tracks=2)
+        for key in ('a', 'b', 'c'):
+            tracker.start(key, self.frame(), self.REGION)
+        
+        self.assertIsNone(tracker.track('a', self.frame()))
+        self.assertIsNotNone(tracker.track('c', self.frame()))
+    
+    def detector(self, face_confidence):
+        detector = FacialEmotionDetector(classifier=_StubEmotionBackend(), max_image_side=0)
+        detector.enable_tracking(redetect_interval=3)
+        face = _face_object(confidence=face_confidence, **self.REGION)
+        return detector, patch.object(detector, 'extract_faces', return_value=[face])
+    
+    def test_detect_tracked_reuses_detected_face(self):
+        detector, extract_faces = self.detector(face_confidence=0.95)
+        with extract_faces as mock:
+            first = detector.detect_tracked(self.frame(), 'session:1')
+            second = detector.detect_tracked(self.frame(dx=3), 'session:1')
+        
+        self.assertEqual(mock.call_count, 1)
+        self.assertNotIn('tracked', first['pipeline'])
+        self.assertTrue(second['pipeline']['tracked'])
+        self.assertEqual(second['faces'][0]['region']['x'], 63)
+    
+    def test_detect_tracked_ignores_whole_frame_fallback(self):
+        detector, extract_faces = self.detector(face_confidence=0.0)
+        with extract_faces as mock:
+            detector.detect_tracked(self.frame(), 'session:1')
+            second = detector.detect_tracked(self.frame(), 'session:1')
+        
+        self.assertEqual(mock.call_count, 2)
+        self.assertNotIn('tracked', second['pipeline'])
+        self.assertEqual(detector.tracker.stats()['detections'], 0)
+
+
+class VoiceLoadingTests(SimpleTestCase):
+    """Native-rate decoding plus one resample must give the features of librosa.load(sr=22050)"""
+    
+    RATES = [16000, 22050, 44100, 48000]
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import soundfile as sf
+        from apps.emotions.management.commands.benchmark_voice_loading import _synthetic_clip
+        
+        cls.detector = VoiceEmotionDetector()
+        cls.clips = {}
+        for seed, sr in enumerate(cls.RATES):
+            buffer = io.BytesIO()
+            sf.write(buffer, np.stack([_synthetic_clip(sr, 4.0, seed)] * 2, axis=1), sr, format='WAV', subtype='PCM_16')
+            cls.clips[sr] = buffer.getvalue()
+    
+    def test_features_match_librosa_load(self):
+        import librosa
+        
+        for sr, data in self.clips.items():
+            with self.subTest(sr=sr):
+                y, _ = librosa.load(io.BytesIO(data), sr=self.detector.sample_rate, duration=self.detector.max_duration)
+                expected = self.detector.extract_features_from_signal(y, self.detector.sample_rate)
+                np.testing.assert_allclose(self.detector.extract_features_from_bytes(data), expected, rtol=1e-4, atol=1e-4)
+    
+    def test_feature_rate_is_not_resampled(self):
+        y = np.zeros(100, dtype=np.float32)
+        self.assertIs(self.detector.prepare_signal(y, self.detector.sample_rate)[0], y)
+        self.assertEqual(self.detector.prepare_signal(y, 44100)[0].shape, (50,))
+
+
+class VoiceClassifierTests(SimpleTestCase):
+    """Training, the .npz round trip and stale model files"""
+    
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.labels = np.repeat(['happy', 'sad', 'angry'], 40)
+        centers = rng.normal(scale=5.0, size=(3, FEATURE_DIM))
+        self.features = centers[np.repeat(np.arange(3), 40)] + rng.normal(size=(120, FEATURE_DIM))
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'voice.npz')
+    
+    def tearDown(self):
+        self.directory.cleanup()
+    
+    def test_train_save_load_predict(self):
+        classifier = VoiceClassifier.train(self.features, self.labels, hidden=16, epochs=50)
+        classifier.save(self.path)
+        loaded = VoiceClassifier.load(self.path, input_dim=FEATURE_DIM)
+        
+        self.assertEqual(loaded.labels, ['angry', 'happy', 'sad'])
+        np.testing.assert_allclose(loaded.predict_proba(self.features), classifier.predict_proba(self.features), rtol=1e-6)
+        predicted = np.array(loaded.labels)[loaded.predict_proba(self.features).argmax(axis=1)]
+        self.assertGreater(np.mean(predicted == self.labels), 0.95)
+    
+    def test_load_rejects_other_feature_layout(self):
+        VoiceClassifier.train(self.features[:, :20], self.labels, hidden=0, epochs=5).save(self.path)
+        with self.assertRaisesRegex(ValueError, 'expects 20 features'):
+            VoiceClassifier.load(self.path, input_dim=FEATURE_DIM)
+    
+    def test_detector_falls_back_to_placeholder_for_stale_model(self):
+        VoiceClassifier.train(self.features[:, :20], self.labels, hidden=0, epochs=5).save(self.path)
+        detector = VoiceEmotionDetector(model_path=self.path)
+        
+        results = detector.predict_batch(np.zeros((2, FEATURE_DIM)))
+        self.assertIsNone(detector.classifier)
+        self.assertIn('expects 20 features', detector.model_error)
+        self.assertEqual([result['emotion'] for result in results], ['neutral', 'neutral'])
+        self.assertIn('expects 20 features', results[0]['note'])
+
+
+class VoiceActivitySegmenterTests(SimpleTestCase):
+    """Voiced-window segmentation (3 s windows, 1.5 s hop, 30 ms frames)"""
+    
+    SR = 16000
+    
+    def tone(self, seconds, amplitude=0.2):
+        t = np.arange(int(self.SR * seconds)) / self.SR
+        return (amplitude * np.sin(2 * np.pi * 200 * t)).astype(np.float32)
+    
+    def silence(self, seconds, noise=0.0):
+        return (noise * np.random.default_rng(0).standard_normal(int(self.SR * seconds))).astype(np.float32)
+    
+    def segment(self, parts, block_duration=10.0):
+        """(start, end) of every window, and the voiced duration"""
+        y = np.concatenate(parts)
+        segmenter = VoiceActivitySegmenter(self.SR, window=3.0, hop=1.5)
+        block = int(block_duration * self.SR)
+        windows = []
+        for start in range(0, len(y), block):
+            windows.extend(segmenter.process(y[start:start + block]))
+        windows.extend(segmenter.flush())
+        return [(start, end) for start, end, _ in windows], segmenter.voiced_duration
+    
+    def test_speech_from_the_first_frame(self):
+        windows, voiced = self.segment([self.tone(2.0)])
+        self.assertEqual(windows, [(0.0, 1.98)])
+        self.assertAlmostEqual(voiced, 1.98)
+    
+    def test_speech_before_a_pause_is_kept(self):
+        windows, _ = self.segment([self.tone(2.0), self.silence(1.0, noise=0.001), self.tone(2.0)])
+        self.assertEqual(windows, [(0.0, 2.01), (3.0, 4.98)])
+    
+    def test_silence_only(self):
+        for noise in (0.0, 0.001):
+            with self.subTest(noise=noise):
+                self.assertEqual(self.segment([self.silence(5.0, noise)]), ([], 0.0))
+    
+    def test_short_pauses_are_bridged(self):
+        windows, _ = self.segment([self.silence(1.0), self.tone(1.0), self.silence(0.2), self.tone(1.0), self.silence(1.0)])
+        self.assertEqual(windows, [(0.99, 3.21)])
+        
+        windows, _ = self.segment([self.silence(1.0), self.tone(1.0), self.silence(0.5), self.tone(1.0), self.silence(1.0)])
+        self.assertEqual(windows, [(0.99, 2.01), (2.49, 3.51)])
+    
+    def test_segments_shorter_than_min_speech_are_dropped(self):
+        windows, _ = self.segment([self.silence(1.0), self.tone(0.2), self.silence(1.0)])
+        self.assertEqual(windows, [])
+        
+        windows, _ = self.segment([self.silence(1.0), self.tone(0.4), self.silence(1.0)])
+        self.assertEqual(windows, [(0.99, 1.41)])
+    
+    def test_long_segments_slide_by_hop(self):
+        windows, _ = self.segment([self.tone(7.0)])
+        self.assertEqual(windows, [(0.0, 3.0), (1.5, 4.5), (3.0, 6.0), (4.5, 6.99)])
+    
+    def test_windows_do_not_depend_on_block_boundaries(self):
+        parts = [self.silence(0.5, noise=0.001), self.tone(4.0), self.silence(0.4, noise=0.001), self.tone(1.0)]
+        self.assertEqual(self.segment(parts, block_duration=0.077), self.segment(parts))
+
+
+class _StubFacialDetector:
+    emotion_mapping = {label: label for label in EMOTION_LABELS}
+    
+    def __init__(self, result):
+        self.result = result
+    
+    def detect_from_bytes(self, image_data, track_key=None, scope=None):
+        return self.result
+
+
+class _StubVoiceDetector:
+    def __init__(self, result):
+        self.result = result
+    
+    def detect_from_bytes(self, data):
+        return self.result
+
+
+class FusionTests(SimpleTestCase):
+    """Late fusion of facial (7 labels, percent) and voice (5 labels, probabilities) scores"""
+    
+    FACE = {
+        'face_detected': True,
+        'emotion': 'happy',
+        'all_emotions': {'angry': 5.0, 'disgust': 5.0, 'fear': 10.0, 'happy': 40.0, 'sad': 10.0, 'surprise': 20.0, 'neutral': 10.0},
+    }
+    VOICE = {
+        'audio_processed': True,
+        'emotion': 'sad',
+        'all_emotions': {'neutral': 0.1, 'happy': 0.1, 'sad': 0.6, 'angry': 0.1, 'fear': 0.1},
+    }
+    NO_FACE = {'face_detected': False, 'emotion': 'neutral', 'confidence': 0.0, 'error': 'No face detected'}
+    PLACEHOLDER_VOICE = {'audio_processed': True, 'emotion': 'neutral', 'confidence': 0.5, 'note': 'Voice ML model pending'}
+    
+    def detect(self, face, voice, face_weight=0.6, voice_weight=0.4):
+        detector = CombinedEmotionDetector(
+            _StubFacialDetector(face), _StubVoiceDetector(voice), face_weight=face_weight, voice_weight=voice_weight, workers=1
+        )
+        return detector.detect_from_bytes(b'image', b'audio')
+    
+    def test_fuse_scores_normalizes_and_weights(self):
+        fused = fuse_scores([({'happy': 75.0, 'sad': 25.0}, 0.5), ({'happy': 0.0, 'sad': 1.0}, 0.5)])
+        self.assertAlmostEqual(fused['happy'], 0.375)
+        self.assertAlmostEqual(fused['sad'], 0.625)
+    
+    def test_fuse_scores_skips_empty_and_unweighted(self):
+        self.assertEqual(fuse_scores([({'happy': 1.0}, 0.0), ({}, 1.0), ({'sad': 0.0}, 1.0)]), {})
+        self.assertEqual(fuse_scores([({'happy': 1.0}, 0.0), ({'sad': 2.0}, 0.3)]), {'sad': 1.0})
+    
+    def test_label_union(self):
+        result = self.detect(self.FACE, self.VOICE)
+        self.assertEqual(result['modalities'], ['face', 'voice'])
+        self.assertEqual(set(result['all_emotions']), set(EMOTION_LABELS))
+        self.assertAlmostEqual(sum(result['all_emotions'].values()), 1.0)
+        # disgust and surprise come from the face alone, at its weight
+        self.assertAlmostEqual(result['all_emotions']['surprise'], 0.6 * 0.2)
+        self.assertAlmostEqual(result['all_emotions']['sad'], 0.6 * 0.1 + 0.4 * 0.6)
+        self.assertEqual(result['emotion'], 'sad')
+    
+    def test_face_only(self):
+        for voice in (self.PLACEHOLDER_VOICE, {'emotion': 'neutral', 'confidence': 0.0, 'error': 'Could not read audio'}):
+            with self.subTest(voice=voice):
+                result = self.detect(self.FACE, voice)
+                self.assertEqual(result['modalities'], ['face'])
+                self.assertEqual(result['emotion'], 'happy')
+                self.assertAlmostEqual(result['confidence'], 0.4)
+    
+    def test_voice_only(self):
+        result = self.detect(self.NO_FACE, self.VOICE)
+        self.assertEqual(result['modalities'], ['voice'])
+        self.assertEqual(result['emotion'], 'sad')
+        self.assertAlmostEqual(result['confidence'], 0.6)
+    
+    def test_neither_modality(self):
+        result = self.detect(self.NO_FACE, self.PLACEHOLDER_VOICE)
+        self.assertEqual(result['modalities'], [])
+        self.assertEqual(result['emotion'], 'neutral')
+        self.assertEqual(result['confidence'], 0.0)
+        self.assertEqual(result['error'], 'No face detected')
+    
+    def test_zero_weights(self):
+        result = self.detect(self.FACE, self.VOICE, face_weight=0.0)
+        self.assertEqual(result['emotion'], 'sad')
+        self.assertAlmostEqual(result['confidence'], 0.6)
+        self.assertEqual(result['modalities'], ['voice'])
+        
+        result = self.detect(self.FACE, self.VOICE, voice_weight=0.0)
+        self.assertEqual(result['emotion'], 'happy')
+        self.assertEqual(result['modalities'], ['face'])
+        
+        result = self.detect(self.FACE, self.VOICE, face_weight=0.0, voice_weight=0.0)
+        self.assertEqual(result['modalities'], [])
+        self.assertEqual(result['emotion'], 'neutral')
+        self.assertEqual(result['error'], 'Face and voice weights are both zero')
+    
+    def test_zero_weighted_modality_with_nothing_else(self):
+        result = self.detect(self.FACE, self.PLACEHOLDER_VOICE, face_weight=0.0)
+        self.assertEqual(result['modalities'], [])
+        self.assertEqual(result['confidence'], 0.0)
+
+
+class BulkValidationTests(SimpleTestCase):
+    """validate_entry on client-recorded log entries"""
+    
+    ENTRY = {'emotion_type': 'happy', 'confidence': 0.8, 'source': 'face'}
+    
+    def errors(self, **changes):
+        _, errors = validate_entry({**self.ENTRY, **changes}, session_ids={7})
+        return errors or {}
+    
+    def test_valid_entry(self):
+        values, errors = validate_entry({**self.ENTRY, 'session_id': 7, 'raw_data': {'faces': []}}, session_ids={7})
+        self.assertIsNone(errors)
+        self.assertEqual(values['confidence'], 0.8)
+        self.assertEqual(values['session_id'], 7)
+        self.assertIsNotNone(values['timestamp'])
+    
+    def test_confidence(self):
+        for confidence in (True, False, float('nan'), float('inf'), -0.1, 1.5, '0.5', None):
+            with self.subTest(confidence=confidence):
+                self.assertIn('confidence', self.errors(confidence=confidence))
+        for confidence in (0, 1, 0.5):
+            with self.subTest(confidence=confidence):
+                self.assertEqual(self.errors(confidence=confidence), {})
+    
+    def test_timestamps(self):
+        values, _ = validate_entry({**self.ENTRY, 'timestamp': '2026-01-01T10:00:00'}, set())
+        self.assertEqual(values['timestamp'], datetime(2026, 1, 1, 10, tzinfo=dt_timezone.utc))
+        
+        values, _ = validate_entry({**self.ENTRY, 'timestamp': '2026-01-01T10:00:00+02:00'}, set())
+        self.assertEqual(values['timestamp'], datetime(2026, 1, 1, 8, tzinfo=dt_timezone.utc))
+        self.assertEqual(values['timestamp'].utcoffset(), timedelta(hours=2))
+        
+        for timestamp in ('yesterday', '2026-13-01T10:00:00', 1767261600):
+            with self.subTest(timestamp=timestamp):
+                self.assertIn('timestamp', self.errors(timestamp=timestamp))
+    
+    def test_unknown_fields_and_choices(self):
+        errors = self.errors(user_id=3, emotion_type='bored', source='text')
+        self.assertEqual(errors['non_field_errors'], 'Unknown fields: user_id')
+        self.assertIn('emotion_type', errors)
+        self.assertIn('source', errors)
+    
+    def test_session_and_raw_data(self):
+        self.assertEqual(self.errors(session_id=8)['session_id'], 'Unknown session')
+        self.assertIn('raw_data', self.errors(raw_data='text'))
+        self.assertEqual(validate_entry(['happy'], set()), (None, {'non_field_errors': 'Expected a JSON object'}))
+
+
+class BulkIngestTests(TestCase):
+    """ingest_emotion_logs against the database"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.session = UserSession.objects.create(user=self.user)
+        self.other_session = UserSession.objects.create(user=User.objects.create_user('other'))
+    
+    def test_created_rows_get_ids(self):
+        entries = [
+            {'emotion_type': 'happy', 'confidence': 0.8, 'source': 'face', 'session_id': self.session.id},
+            {'emotion_type': 'sad', 'confidence': 2, 'source': 'face'},
+            {'emotion_type': 'sad', 'confidence': 0.4, 'source': 'voice'},
+        ]
+        created, results = ingest_emotion_logs(self.user, entries, chunk_size=1)
+        
+        self.assertEqual(created, 2)
+        self.assertEqual([result['status'] for result in results], ['created', 'invalid', 'created'])
+        self.assertNotIn('id', results[1])
+        logs = {log.id: log for log in EmotionLog.objects.filter(user=self.user)}
+        self.assertEqual(set(logs), {results[0]['id'], results[2]['id']})
+        self.assertEqual(logs[results[0]['id']].session_id, self.session.id)
+        self.assertEqual(logs[results[2]['id']].emotion_type, 'sad')
+    
+    def test_another_users_session_is_rejected(self):
+        created, results = ingest_emotion_logs(
+            self.user, [{'emotion_type': 'happy', 'confidence': 0.8, 'source': 'face', 'session_id': self.other_session.id}]
+        )
+        self.assertEqual(created, 0)
+        self.assertEqual(results[0]['errors'], {'session_id': 'Unknown session'})
+        self.assertFalse(EmotionLog.objects.exists())
+
+
+class SessionStatisticsTests(TestCase):
+    """UserSession running statistics kept in step with EmotionLog writes"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.session = UserSession.objects.create(user=self.user)
+        self.other_session = UserSession.objects.create(user=self.user)
+    
+    def log(self, emotion_type, confidence, session=None):
+        return EmotionLog(user=self.user, emotion_type=emotion_type, confidence=confidence, source='face', session=session or self.session)
+    
+    def assertStatistics(self, session, counts, confidence_sum):
+        session.refresh_from_db()
+        self.assertEqual(session.total_emotions_detected, sum(counts.values()))
+        self.assertAlmostEqual(session.confidence_sum, confidence_sum)
+        self.assertEqual({emotion: count for emotion, count in session.emotion_counts.items() if count}, counts)
+    
+    def test_create(self):
+        self.log('happy', 0.8).save()
+        EmotionLog.objects.create(user=self.user, emotion_type='sad', confidence=0.4, source='voice', session=self.session)
+        EmotionLog.objects.create(user=self.user, emotion_type='sad', confidence=0.9, source='voice')
+        self.assertStatistics(self.session, {'happy': 1, 'sad': 1}, 1.2)
+    
+    def test_bulk_create(self):
+        EmotionLog.objects.bulk_create([
+            self.log('happy', 0.8), self.log('happy', 0.6), self.log('fear', 0.5, self.other_session)
+        ])
+        self.assertStatistics(self.session, {'happy': 2}, 1.4)
+        self.assertStatistics(self.other_session, {'fear': 1}, 0.5)
+    
+    def test_move_log_between_sessions(self):
+        log = self.log('happy', 0.8)
+        log.save()
+        log.session = self.other_session
+        log.emotion_type = 'angry'
+        log.save()
+        self.assertStatistics(self.session, {}, 0.0)
+        self.assertStatistics(self.other_session, {'angry': 1}, 0.8)
+    
+    def test_queryset_update(self):
+        EmotionLog.objects.bulk_create([self.log('happy', 0.8), self.log('sad', 0.4), self.log('sad', 0.2)])
+        
+        updated = EmotionLog.objects.filter(emotion_type='sad').update(emotion_type='worried', session=self.other_session)
+        self.assertEqual(updated, 2)
+        self.assertStatistics(self.session, {'happy': 1}, 0.8)
+        self.assertStatistics(self.other_session, {'worried': 2}, 0.6)
+        
+        EmotionLog.objects.filter(session=self.other_session).update(confidence=1.0)
+        self.assertStatistics(self.other_session, {'worried': 2}, 2.0)
+        
+        EmotionLog.objects.filter(emotion_type='happy').update(session=None)
+        self.assertStatistics(self.session, {}, 0.0)
+    
+    def test_update_in_chunks(self):
+        EmotionLog.objects.bulk_create([self.log('neutral', 0.5) for _ in range(5)])
+        with patch.object(EmotionLogQuerySet, 'STAT_CHUNK_SIZE', 2):
+            EmotionLog.objects.update(session=self.other_session)
+        self.assertStatistics(self.session, {}, 0.0)
+        self.assertStatistics(self.other_session, {'neutral': 5}, 2.5)
+    
+    def test_delete(self):
+        logs = EmotionLog.objects.bulk_create([self.log('happy', 0.8), self.log('sad', 0.4), self.log('sad', 0.2)])
+        logs[0].delete()
+        self.assertStatistics(self.session, {'sad': 2}, 0.6)
+        
+        EmotionLog.objects.filter(confidence__lt=0.3).delete()
+        self.assertStatistics(self.session, {'sad': 1}, 0.4)
+        
+        self.session.emotions.all().delete()
+        self.assertStatistics(self.session, {}, 0.0)
+    
+    def test_end_session_breaks_ties_in_choice_order(self):
+        EmotionLog.objects.bulk_create([
+            self.log('sad', 0.2), self.log('happy', 0.4), self.log('sad', 0.6), self.log('happy', 0.8), self.log('fear', 1.0)
+        ])
+        self.session.end_session()
+        
+        self.assertFalse(self.session.is_active)
+        self.assertIsNotNone(self.session.end_time)
+        self.assertEqual(self.session.dominant_emotion, 'happy')
+        self.assertAlmostEqual(self.session.average_confidence, 0.6)
+    
+    def test_end_empty_session(self):
+        self.session.end_session()
+        
+        self.assertFalse(self.session.is_active)
+        self.assertIsNone(self.session.dominant_emotion)
+        self.assertIsNone(self.session.average_confidence)
+
+
+def _image_bytes(width=80, height=60):
+    """PNG-encoded blank frame"""
+    import cv2
+    
+    return cv2.imencode('.png', np.zeros((height, width, 3), dtype=np.uint8))[1].tobytes()
+
+
+def _face_result(emotion='happy', confidence=0.7):
+    """Facial detection result with one face, as returned by detect_batch"""
+    scores = {label: 5.0 for label in EMOTION_LABELS}
+    scores[emotion] = 100 * confidence
+    face = {'emotion': emotion, 'confidence': confidence, 'all_emotions': scores,
+            'region': {'x': 10, 'y': 10, 'w': 40, 'h': 40}, 'face_confidence': 0.9}
+    return {
+        'emotion': emotion, 'confidence': confidence, 'all_emotions': scores, 'face_detected': True,
+        'face_count': 1, 'faces': [face], 'pipeline': {'detector_backend': 'opencv'},
+    }
+
+
+def _voice_result(emotion='sad', confidence=0.6):
+    """Voice detection result, as returned by detect_batch_from_bytes"""
+    scores = {'neutral': 0.1, 'happy': 0.1, 'sad': 0.1, 'angry': 0.1, 'fear': 0.1}
+    scores[emotion] = confidence
+    return {'emotion': emotion, 'confidence': confidence, 'all_emotions': scores, 'audio_processed': True,
+            'features': [0.5] * FEATURE_DIM}
+
+
+class DetectionJobQueueTests(TestCase):
+    """claim_jobs, requeue_stale_jobs and process_jobs with the detectors mocked"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.session = UserSession.objects.create(user=self.user)
+    
+    def job(self, source='face', payload=None, age=0, **fields):
+        return DetectionJob.objects.create(
+            user=self.user, session=self.session, source=source, payload=payload or _image_bytes(),
+            created_at=timezone.now() - timedelta(seconds=age), **fields
+        )
+    
+    def test_claim_jobs_oldest_first(self):
+        newest, oldest, middle = self.job(age=1), self.job(age=30), self.job(age=10)
+        self.job(age=60, status='done')
+        
+        claimed = claim_jobs(2)
+        self.assertEqual([job.id for job in claimed], [oldest.id, middle.id])
+        for job in claimed:
+            self.assertEqual((job.status, job.attempts), ('running', 1))
+            self.assertIsNotNone(job.started_at)
+        
+        self.assertEqual([job.id for job in claim_jobs(2)], [newest.id])
+        self.assertEqual(claim_jobs(2), [])
+    
+    def test_requeue_stale_jobs(self):
+        started = timezone.now() - timedelta(seconds=120)
+        retry = self.job(status='running', started_at=started, attempts=1)
+        exhausted = self.job(status='running', started_at=started, attempts=3)
+        recent = self.job(status='running', started_at=timezone.now(), attempts=1)
+        
+        self.assertEqual(requeue_stale_jobs(timeout=60, max_attempts=3), 1)
+        
+        retry.refresh_from_db()
+        exhausted.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual(retry.status, 'pending')
+        self.assertEqual((exhausted.status, exhausted.error, exhausted.payload), ('failed', 'Detection timed out', None))
+        self.assertIsNotNone(exhausted.finished_at)
+        self.assertEqual(recent.status, 'running')
+        self.assertEqual([job.id for job in claim_jobs(5)], [retry.id])
+    
+    def test_process_jobs(self):
+        face = self.job(age=5)
+        no_face = self.job(age=4)
+        undecodable = self.job(age=3, payload=b'not an image')
+        voice = self.job('voice', b'audio', age=2)
+        bad_voice = self.job('voice', b'noise', age=1)
+        combined = self.job('combined')
+        
+        detections = [_face_result(), {'emotion': 'neutral', 'confidence': 0.0, 'error': 'No face detected', 'face_detected': False}]
+        voice_results = [_voice_result(), {'error': 'Could not decode audio', 'audio_processed': False}]
+        with patch('apps.emotions.jobs.facial_detector.detect_batch', return_value=detections), \
+                patch('apps.emotions.jobs.voice_detector.detect_batch_from_bytes', return_value=voice_results):
+            process_jobs(claim_jobs(10))
+        
+        jobs = {job.id: job for job in DetectionJob.objects.all()}
+        self.assertEqual(
+            [jobs[job.id].status for job in (face, no_face, undecodable, voice, bad_voice, combined)],
+            ['done', 'done', 'failed', 'done', 'failed', 'failed']
+        )
+        self.assertTrue(all(job.payload is None and job.finished_at for job in jobs.values()))
+        self.assertEqual(jobs[no_face.id].result['error'], 'No face detected')
+        self.assertEqual(jobs[undecodable.id].error, 'Could not decode image')
+        self.assertEqual(jobs[bad_voice.id].error, 'Could not decode audio')
+        self.assertEqual(jobs[combined.id].error, 'Unsupported source: combined')
+        
+        face_log, voice_log = jobs[face.id].emotion_log, jobs[voice.id].emotion_log
+        self.assertEqual((face_log.source, face_log.emotion_type, face_log.session_id), ('face', 'happy', self.session.id))
+        self.assertEqual(face_log.raw_data['faces'][0]['box'], [10, 10, 40, 40])
+        self.assertEqual((voice_log.source, voice_log.emotion_type), ('voice', 'sad'))
+        self.assertEqual(len(voice_log.raw_data['features']), FEATURE_DIM)
+        self.assertEqual(EmotionLog.objects.count(), 2)
+        self.assertEqual(jobs[face.id].result['id'], face_log.id)
+        self.assertEqual(jobs[voice.id].result['session_id'], self.session.id)
+        
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.emotion_counts['happy'] + self.session.emotion_counts['sad'], 2)
+    
+    def test_logs_roll_back_with_failed_job_update(self):
+        job = self.job()
+        with patch('apps.emotions.jobs.facial_detector.detect_batch', return_value=[_face_result()]), \
+                patch.object(DetectionJob.objects, 'bulk_update', side_effect=RuntimeError('database went away')):
+            with self.assertRaises(RuntimeError):
+                process_jobs(claim_jobs(1))
+        
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'running')
+        self.assertFalse(EmotionLog.objects.exists())
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.total_emotions_detected, 0)
+    
+    def test_requeued_jobs_are_left_to_their_new_worker(self):
+        job = self.job()
+        claimed = claim_jobs(1)
+        # Requeued as stale and claimed again while this worker was still detecting
+        DetectionJob.objects.filter(id=job.id).update(attempts=F('attempts') + 1)
+        with patch('apps.emotions.jobs.facial_detector.detect_batch', return_value=[_face_result()]):
+            process_jobs(claimed)
+        
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('running', 2))
+        self.assertFalse(EmotionLog.objects.exists())
+
+
+class DetectionAPITests(APITestCase):
+    """Detection, analysis and bulk endpoints with the detectors mocked"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.client.force_authenticate(self.user)
+        self.session = UserSession.objects.create(user=self.user)
+    
+    def upload(self, name='frame.png', data=None):
+        return SimpleUploadedFile(name, _image_bytes() if data is None else data)
+    
+    def test_detect_batch_stores_one_log_per_face(self):
+        no_face = {'emotion': 'neutral', 'confidence': 0.0, 'face_detected': False, 'error': 'No face detected'}
+        with patch('apps.emotions.views.facial_detector.detect_batch',
+                   return_value=[_face_result('happy', 0.8), no_face]) as detect_batch:
+            response = self.client.post('/api/emotions/logs/detect_batch/', {
+                'images': [self.upload(), self.upload('notes.txt', b'not an image'), self.upload()],
+                'session_id': self.session.id,
+            }, format='multipart')
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(detect_batch.call_args.args[0]), 2)
+        self.assertEqual((response.data['total_images'], response.data['faces_detected']), (3, 1))
+        self.assertEqual(response.data['session_id'], self.session.id)
+        first, invalid, missing = response.data['results']
+        self.assertEqual((first['emotion'], first['confidence'], first['face_count']), ('happy', 0.8, 1))
+        self.assertEqual(first['pipeline']['input_size'], [80, 60])
+        self.assertTrue(invalid['error'].startswith('Invalid file type'))
+        self.assertEqual((missing['error'], missing['face_detected']), ('No face detected', False))
+        
+        log = EmotionLog.objects.get()
+        self.assertEqual(log.id, first['id'])
+        self.assertEqual((log.emotion_type, log.confidence, log.source, log.session_id), ('happy', 0.8, 'face', self.session.id))
+        self.assertEqual(len(log.raw_data['faces']), 1)
+    
+    def test_detect_batch_without_images(self):
+        response = self.client.post('/api/emotions/logs/detect_batch/', {}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_analyze_video_stores_the_timeline(self):
+        timeline = [
+            {'second': second, 'emotion': emotion, 'confidence': 0.6, 'samples': 2,
+             'all_emotions': {label: 60.0 if label == emotion else 5.0 for label in EMOTION_LABELS}}
+            for second, emotion in enumerate(['happy', 'sad'])
+        ]
+        result = {'duration': 2.0, 'fps': 25.0, 'frames_analyzed': 4, 'faces_detected': 4, 'timeline': timeline}
+        with patch('apps.emotions.views.probe_video', return_value={'duration': 2.0, 'fps': 25.0, 'frame_count': 50}), \
+                patch('apps.emotions.views.facial_detector.analyze_video', return_value=result):
+            response = self.client.post('/api/emotions/logs/analyze_video/', {
+                'video': SimpleUploadedFile('clip.mp4', b'video'), 'session_id': self.session.id,
+            }, format='multipart')
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['logs_created'], 2)
+        self.assertEqual([entry['emotion'] for entry in response.data['timeline']], ['happy', 'sad'])
+        self.assertEqual(response.data['timeline'][0]['scores'][EMOTION_LABELS.index('happy')], 60.0)
+        
+        logs = list(EmotionLog.objects.order_by('timestamp'))
+        self.assertEqual([(log.emotion_type, log.source, log.session_id) for log in logs],
+                         [('happy', 'face', self.session.id), ('sad', 'face', self.session.id)])
+        self.assertEqual([log.raw_data['video_offset'] for log in logs], [0, 1])
+        self.assertEqual(logs[1].timestamp - logs[0].timestamp, timedelta(seconds=1))
+    
+    def test_analyze_video_rejects_long_videos(self):
+        with patch('apps.emotions.views.probe_video', return_value={'duration': settings.VIDEO_MAX_DURATION + 1, 'fps': 25.0}), \
+                patch('apps.emotions.views.facial_detector.analyze_video') as analyze_video:
+            response = self.client.post('/api/emotions/logs/analyze_video/', {
+                'video': SimpleUploadedFile('clip.mp4', b'video'),
+            }, format='multipart')
+        
+        self.assertEqual(response.status_code, 400)
+        analyze_video.assert_not_called()
+        self.assertFalse(EmotionLog.objects.exists())
+    
+    def test_analyze_audio_stores_one_log_per_segment(self):
+        segments = [
+            {'start': 0.0, 'end': 3.0, 'emotion': 'sad', 'confidence': 0.7, 'all_emotions': {'sad': 0.7, 'happy': 0.3}},
+            {'start': 4.5, 'end': 6.0, 'emotion': 'happy', 'confidence': 0.55, 'all_emotions': {'sad': 0.45, 'happy': 0.55}},
+        ]
+        result = {'duration': 6.0, 'voiced_duration': 4.5, 'segments': segments, 'audio_processed': True}
+        with patch('apps.emotions.views.probe_audio', return_value={'duration': 6.0}), \
+                patch('apps.emotions.views.voice_detector.analyze_audio', return_value=result):
+            response = self.client.post('/api/emotions/logs/analyze_audio/', {
+                'audio': SimpleUploadedFile('clip.wav', b'audio'), 'session_id': self.session.id,
+            }, format='multipart')
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['logs_created'], response.data['voiced_duration']), (2, 4.5))
+        self.assertEqual([segment['emotion'] for segment in response.data['segments']], ['sad', 'happy'])
+        
+        logs = list(EmotionLog.objects.order_by('timestamp'))
+        self.assertEqual([(log.emotion_type, log.source) for log in logs], [('sad', 'voice'), ('happy', 'voice')])
+        self.assertEqual([log.raw_data['audio_offset'] for log in logs], [0.0, 4.5])
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.total_emotions_detected, 2)
+    
+    def test_analyze_audio_without_saving(self):
+        result = {'duration': 3.0, 'voiced_duration': 3.0, 'audio_processed': True, 'segments': [
+            {'start': 0.0, 'end': 3.0, 'emotion': 'sad', 'confidence': 0.7, 'all_emotions': {'sad': 0.7}},
+        ]}
+        with patch('apps.emotions.views.probe_audio', return_value={'duration': 3.0}), \
+                patch('apps.emotions.views.voice_detector.analyze_audio', return_value=result):
+            response = self.client.post('/api/emotions/logs/analyze_audio/', {
+                'audio': SimpleUploadedFile('clip.wav', b'audio'), 'save': 'false',
+            }, format='multipart')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['logs_created'], 0)
+        self.assertFalse(EmotionLog.objects.exists())
+    
+    def test_bulk_json(self):
+        response = self.client.post('/api/emotions/logs/bulk/', [
+            {'emotion_type': 'happy', 'confidence': 0.8, 'source': 'face', 'session_id': self.session.id},
+            {'emotion_type': 'bored', 'confidence': 0.8, 'source': 'face'},
+        ], format='json')
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['invalid']), (1, 1))
+        self.assertEqual([result['status'] for result in response.data['results']], ['created', 'invalid'])
+        log = EmotionLog.objects.get()
+        self.assertEqual((log.id, log.user, log.session_id), (response.data['results'][0]['id'], self.user, self.session.id))
+    
+    def test_bulk_ndjson(self):
+        body = b'{"emotion_type": "sad", "confidence": 0.4, "source": "voice"}\n\n{"emotion_type": "happy", "confidence": 0.9, "source": "face"}\n'
+        response = self.client.post('/api/emotions/logs/bulk/', body, content_type='application/x-ndjson')
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(sorted(EmotionLog.objects.values_list('emotion_type', flat=True)), ['happy', 'sad'])
+    
+    def test_bulk_with_only_invalid_entries(self):
+        response = self.client.post('/api/emotions/logs/bulk/', [{'emotion_type': 'happy'}], format='json')
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], 0)
+        self.assertFalse(EmotionLog.objects.exists())
+    
+    def test_bulk_requires_a_list(self):
+        response = self.client.post('/api/emotions/logs/bulk/', {'emotion_type': 'happy'}, format='json')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_async_detect_queues_a_job(self):
+        with patch('apps.emotions.views.facial_detector.detect_from_bytes') as detect_from_bytes:
+            response = self.client.post('/api/emotions/logs/detect/', {
+                'image': self.upload(), 'async': 'true', 'session_id': self.session.id, 'largest_face_only': 'true',
+            }, format='multipart')
+        
+        self.assertEqual(response.status_code, 202)
+        detect_from_bytes.assert_not_called()
+        job = DetectionJob.objects.get()
+        self.assertEqual(response.data['job_id'], job.id)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertTrue(response.data['status_url'].endswith(f'/api/emotions/jobs/{job.id}/'))
+        self.assertEqual((job.user, job.session_id, job.source), (self.user, self.session.id, 'face'))
+        self.assertEqual(bytes(job.payload), _image_bytes())
+        self.assertEqual(job.options, {'largest_face_only': True})
+        self.assertFalse(EmotionLog.objects.exists())
+    
+    def test_detect_stores_a_log(self):
+        with patch('apps.emotions.views.facial_detector.detect_from_bytes', return_value=_face_result('sad', 0.6)):
+            response = self.client.post('/api/emotions/logs/detect/', {
+                'image': self.upload(), 'session_id': self.session.id,
+            }, format='multipart')
+        
+        self.assertEqual(response.status_code, 201)
+        log = EmotionLog.objects.get()
+        self.assertEqual((response.data['id'], response.data['emotion'], response.data['session_id']),
+                         (log.id, 'sad', self.session.id))
+        self.assertEqual((log.emotion_type, log.confidence, log.source), ('sad', 0.6, 'face'))
+    
+    def test_ready(self):
+        warm = {'facial': {'loaded': True, 'warm': True}, 'voice': {'loaded': True, 'warm': True}}
+        cold = {'facial': {'loaded': True, 'warm': True}, 'voice': {'loaded': False, 'warm': False}}
+        self.client.force_authenticate(None)
+        
+        with patch('apps.emotions.views.model_status', return_value=warm):
+            response = self.client.get('/api/emotions/ready/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'ready': True, 'models': warm})
+        
+        with patch('apps.emotions.views.model_status', return_value=cold):
+            response = self.client.get('/api/emotions/ready/')
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.data['ready'])
+
+
+class EmotionLogPaginationTests(APITestCase):
+    """Cursor pages of /api/emotions/logs/, newest first, with ties on the timestamp broken by id"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        timestamps = [now + timedelta(seconds=1)] + [now] * 7 + [now - timedelta(seconds=1)]
+        self.logs = EmotionLog.objects.bulk_create([
+            EmotionLog(user=self.user, emotion_type='happy', confidence=0.5, source='face', timestamp=timestamp)
+            for timestamp in timestamps
+        ])
+        other = User.objects.create_user('other')
+        EmotionLog.objects.create(user=other, emotion_type='sad', confidence=0.5, source='face', timestamp=now)
+    
+    def expected(self):
+        return [log.id for log in sorted(self.logs, key=lambda log: (log.timestamp, log.id), reverse=True)]
+    
+    def test_pages_neither_skip_nor_repeat_equal_timestamps(self):
+        ids = []
+        pages = 0
+        url = '/api/emotions/logs/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(set(response.data), {'next', 'previous', 'results'})
+            ids += [log['id'] for log in response.data['results']]
+            pages += 1
+            url = response.data['next']
+        
+        self.assertEqual(pages, 5)
+        self.assertEqual(ids, self.expected())
+    
+    def test_previous_page_returns_the_same_rows(self):
+        first = self.client.get('/api/emotions/logs/?page_size=3')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        
+        self.assertEqual([log['id'] for log in back.data['results']], self.expected()[:3])
+        self.assertEqual([log['id'] for log in second.data['results']], self.expected()[3:6])
+    
+    def test_page_size_is_capped(self):
+        with patch('config.pagination.TimestampCursorPagination.max_page_size', 4):
+            response = self.client.get('/api/emotions/logs/?page_size=100')
+        self.assertEqual(len(response.data['results']), 4)
+
+
+class SessionAPITests(APITestCase):
+    """Session list and detail payloads and the paged sessions/{id}/emotions/ sub-resource"""
+    
+    SUMMARY_FIELDS = {'id', 'start_time', 'end_time', 'is_active', 'dominant_emotion',
+                      'average_confidence', 'total_emotions_detected', 'emotion_counts'}
+    LOG_FIELDS = {'id', 'emotion_type', 'confidence', 'source', 'timestamp'}
+    
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.client.force_authenticate(self.user)
+        self.session = UserSession.objects.create(user=self.user)
+        started = timezone.now() - timedelta(minutes=1)
+        self.logs = EmotionLog.objects.bulk_create([
+            EmotionLog(user=self.user, session=self.session, emotion_type='happy' if index % 3 else 'sad',
+                       confidence=0.5, source='face', timestamp=started + timedelta(seconds=index),
+                       raw_data={'all_emotions': {'happy': 50.0}})
+            for index in range(12)
+        ])
+        self.newest_first = [log.id for log in sorted(self.logs, key=lambda log: log.timestamp, reverse=True)]
+        self.other_session = UserSession.objects.create(user=User.objects.create_user('other'))
+    
+    def url(self, session=None, suffix=''):
+        return f'/api/emotions/sessions/{(session or self.session).id}/{suffix}'
+    
+    def test_list_has_summaries_only(self):
+        response = self.client.get('/api/emotions/sessions/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([session['id'] for session in response.data], [self.session.id])
+        session = response.data[0]
+        self.assertEqual(set(session), self.SUMMARY_FIELDS)
+        self.assertEqual(session['total_emotions_detected'], 12)
+        self.assertEqual(session['dominant_emotion'], 'happy')
+        self.assertEqual(session['emotion_counts']['sad'], 4)
+    
+    def test_active_has_summary_only(self):
+        response = self.client.get('/api/emotions/sessions/active/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), self.SUMMARY_FIELDS)
+    
+    def test_retrieve_embeds_latest_logs(self):
+        response = self.client.get(self.url())
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), self.SUMMARY_FIELDS | {'recent_emotions'})
+        recent = response.data['recent_emotions']
+        self.assertEqual([log['id'] for log in recent], self.newest_first[:settings.SESSION_RECENT_EMOTIONS])
+        self.assertEqual(set(recent[0]), self.LOG_FIELDS)
+    
+    @override_settings(SESSION_RECENT_EMOTIONS=3)
+    def test_recent_emotions_limit(self):
+        response = self.client.get(self.url())
+        self.assertEqual([log['id'] for log in response.data['recent_emotions']], self.newest_first[:3])
+    
+    def test_emotions_are_paged_newest_first(self):
+        ids = []
+        url = self.url(suffix='emotions/?page_size=5')
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            self.assertLessEqual(len(response.data['results']), 5)
+            for log in response.data['results']:
+                self.assertEqual(set(log), self.LOG_FIELDS)
+            ids += [log['id'] for log in response.data['results']]
+            url = response.data['next']
+        
+        self.assertEqual(ids, self.newest_first)
+    
+    def test_emotions_raw_data_on_request(self):
+        response = self.client.get(self.url(suffix='emotions/'), {'raw_data': '1'})
+        
+        self.assertEqual(len(response.data['results']), 12)
+        self.assertEqual(set(response.data['results'][0]), self.LOG_FIELDS | {'raw_data'})
+        self.assertEqual(response.data['results'][0]['raw_data'], {'all_emotions': {'happy': 50.0}})
+    
+    def test_other_users_session_is_not_found(self):
+        self.assertEqual(self.client.get(self.url(self.other_session)).status_code, 404)
+        self.assertEqual(self.client.get(self.url(self.other_session, 'emotions/')).status_code, 404)
+
+
+class NDJSONParserTests(SimpleTestCase):
+    def parse(self, body):
+        return NDJSONParser().parse(io.BytesIO(body))
+    
+    def test_blank_lines_are_skipped(self):
+        self.assertEqual(self.parse(b'{"a": 1}\n\n  \r\n[2]\n'), [{'a': 1}, [2]])
+        self.assertEqual(self.parse(b''), [])
+    
+    def test_parse_error_names_the_line(self):
+        with self.assertRaisesRegex(ParseError, 'line 3'):
+            self.parse(b'{"a": 1}\n\n{"a": \n')
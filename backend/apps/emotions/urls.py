@@ -1,12 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import EmotionLogViewSet, UserSessionViewSet, UserProfileViewSet
+from .views import EmotionLogViewSet, DetectionJobViewSet, UserSessionViewSet, UserProfileViewSet, ModelStatusView
 
 router = DefaultRouter()
 router.register(r'logs', EmotionLogViewSet, basename='emotionlog')
+router.register(r'jobs', DetectionJobViewSet, basename='detectionjob')
 router.register(r'sessions', UserSessionViewSet, basename='usersession')
 router.register(r'profile', UserProfileViewSet, basename='userprofile')
 
 urlpatterns = [
+    path('ready/', ModelStatusView.as_view(), name='model-status'),
     path('', include(router.urls)),
 ]
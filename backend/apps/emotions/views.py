@@ -1,21 +1,102 @@
+import tempfile
+from contextlib import contextmanager
+from datetime import timedelta
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-import os
-import tempfile
-import numpy as np
-from .models import EmotionLog, UserSession, UserProfile
-from .serializers import EmotionLogSerializer, UserSessionSerializer, UserProfileSerializer
-from ml_models.facial_emotion import facial_detector
+from rest_framework.reverse import reverse
+from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.views import APIView
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+from .bulk import ingest_emotion_logs
+from .models import DetectionJob, EmotionLog, UserSession, UserProfile
+from .pagination import SessionEmotionPagination
+from config.pagination import TimestampCursorPagination
+from .parsers import NDJSONParser
+from .results import face_raw_data, facial_response, serializable_scores, voice_raw_data, voice_response
+from .serializers import (
+    DetectionJobSerializer, EmotionLogSerializer, EmotionLogSummarySerializer,
+    UserSessionSerializer, UserSessionDetailSerializer, UserProfileSerializer
+)
+from ml_models.facial_emotion import EMOTION_LABELS, facial_detector, keep_largest_face
+from ml_models.voice_emotion import voice_detector
+from ml_models.fusion import combined_detector
+from ml_models.audio_utils import probe_audio, sniff_audio_type
+from ml_models.image_utils import sniff_image_type
+from ml_models.video import probe_video
+from ml_models.warmup import model_status
+
+
+ALLOWED_IMAGE_TYPES = ['jpeg', 'png', 'bmp']
+ALLOWED_AUDIO_TYPES = ['wav', 'flac', 'ogg', 'mp3']
+
+
+def _get_active_session(request):
+    """Return the requesting user's active session named by 'session_id', if any"""
+    session_id = request.data.get('session_id')
+    
+    if session_id:
+        try:
+            return UserSession.objects.get(id=session_id, user=request.user, is_active=True)
+        except (UserSession.DoesNotExist, ValueError):
+            pass
+    return None
+
+
+def _is_true(value):
+    """Interpret a form/query flag such as 'true', '1' or 'yes'"""
+    return str(value).lower() in ('1', 'true', 'yes', 'on')
+
+
+def _job_accepted(request, job):
+    """Response body for a queued detection job"""
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': reverse('detectionjob-detail', args=[job.id], request=request)
+    }
+
+
+def _read_upload(uploaded_file):
+    """
+    Return the contents of an uploaded file without extra copies.
+    In-memory uploads expose their buffer directly; uploads Django
+    spooled to disk are read once.
+    """
+    file_obj = getattr(uploaded_file, 'file', None)
+    if hasattr(file_obj, 'getbuffer'):
+        return file_obj.getbuffer()
+    uploaded_file.seek(0)
+    return uploaded_file.read()
+
+
+@contextmanager
+def _upload_path(uploaded_file):
+    """
+    Yield a filesystem path for an upload, for readers such as OpenCV that
+    need one. Uploads Django already spooled to disk are used in place;
+    in-memory uploads are streamed to a temporary file in chunks.
+    """
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        yield uploaded_file.temporary_file_path()
+        return
+    
+    with tempfile.NamedTemporaryFile(suffix='.upload') as temp_file:
+        uploaded_file.seek(0)
+        for chunk in uploaded_file.chunks():
+            temp_file.write(chunk)
+        temp_file.flush()
+        yield temp_file.name
 
 
 class EmotionLogViewSet(viewsets.ModelViewSet):
     """API endpoint for emotion logs"""
     serializer_class = EmotionLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TimestampCursorPagination
     
     def get_queryset(self):
         return EmotionLog.objects.filter(user=self.request.user)
@@ -23,14 +104,54 @@ class EmotionLogViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        """
+        Store many client-recorded emotion logs in one request
+        Expected data: a JSON array (application/json) or one JSON object per
+        line (application/x-ndjson), each with:
+        - 'emotion_type', 'confidence' (0-1) and 'source'
+        - 'timestamp': (optional) ISO 8601 time of the detection, default now
+        - 'raw_data': (optional) JSON object or array
+        - 'session_id': (optional) ID of one of the user's sessions
+        
+        Invalid entries are reported without rejecting the others; the
+        response lists a status per entry, in input order.
+        """
+        entries = request.data
+        if not isinstance(entries, list):
+            return Response(
+                {'error': 'Expected a JSON array or NDJSON lines of log entries.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(entries) > settings.EMOTION_LOG_BULK_MAX_ENTRIES:
+            return Response(
+                {'error': f'Too many entries. At most {settings.EMOTION_LOG_BULK_MAX_ENTRIES} are allowed per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        created, results = ingest_emotion_logs(request.user, entries, chunk_size=settings.EMOTION_LOG_BULK_CHUNK_SIZE)
+        
+        return Response({
+            'created': created,
+            'invalid': len(entries) - created,
+            'results': results
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST)
+    
     @action(detail=False, methods=['post'])
     def detect(self, request):
         """
         Detect emotion from uploaded image or audio
         Expected data: 
         - 'image': uploaded image file (for facial detection)
-        - 'source': 'face' or 'voice'
-        - 'session_id': (optional) ID of current session
+        - 'audio': uploaded audio file (for voice detection)
+        - 'source': 'face', 'voice' or 'combined' (an image and an audio clip
+          captured together, analyzed concurrently and fused into one log)
+        - 'session_id': (optional) ID of current session; consecutive frames
+          of a session track the face instead of detecting it every time
+        - 'largest_face_only': (optional) report only the largest face
+        - 'async': (optional) queue a face or voice detection and return a job
+          id at once; poll /api/emotions/jobs/<job_id>/ for the result
         """
         source = request.data.get('source', 'face')
         
@@ -38,11 +159,314 @@ class EmotionLogViewSet(viewsets.ModelViewSet):
             return self._detect_facial_emotion(request)
         elif source == 'voice':
             return self._detect_voice_emotion(request)
+        elif source == 'combined':
+            return self._detect_combined_emotion(request)
         else:
             return Response(
-                {'error': 'Invalid source. Use "face" or "voice"'},
+                {'error': 'Invalid source. Use "face", "voice" or "combined"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    @action(detail=False, methods=['post'])
+    def detect_batch(self, request):
+        """
+        Detect emotions from several uploaded images in one request
+        Expected data:
+        - 'images': uploaded image files (repeat the field once per image)
+        - 'session_id': (optional) ID of current session
+        - 'largest_face_only': (optional) report only the largest face per image
+        
+        All faces are classified in a single model pass and every successful
+        detection is stored with one bulk insert.
+        """
+        image_files = request.FILES.getlist('images')
+        
+        if not image_files:
+            return Response(
+                {'error': 'No image files provided. Please upload one or more images.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        max_images = settings.FACIAL_BATCH_MAX_IMAGES
+        if len(image_files) > max_images:
+            return Response(
+                {'error': f'Too many images. At most {max_images} images are allowed per batch.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        # Reject undecodable files individually so one bad upload does not fail the batch
+        results = [None] * len(image_files)
+        frames = []
+        frame_indexes = []
+        decode_infos = {}
+        
+        for index, image_file in enumerate(image_files):
+            image_data = _read_upload(image_file)
+            frame = None
+            if sniff_image_type(image_data):
+                frame, decode_infos[index] = facial_detector.decode(image_data)
+            
+            if frame is None:
+                results[index] = {
+                    'error': 'Invalid file type. Allowed: ' + ', '.join(ALLOWED_IMAGE_TYPES),
+                    'emotion': 'neutral',
+                    'confidence': 0.0,
+                    'face_detected': False
+                }
+            else:
+                frames.append(frame)
+                frame_indexes.append(index)
+        
+        try:
+            detections = facial_detector.detect_batch(frames) if frames else []
+        except Exception as e:
+            return Response(
+                {'error': f'Error processing images: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        session = _get_active_session(request)
+        largest_face_only = _is_true(request.data.get('largest_face_only'))
+        logs = []
+        
+        for index, result in zip(frame_indexes, detections):
+            result = facial_detector.apply_decode_info(result, decode_infos[index])
+            if largest_face_only:
+                result = keep_largest_face(result)
+            
+            if not result.get('face_detected', False):
+                results[index] = {
+                    'error': result.get('error', 'No face detected in image'),
+                    'emotion': 'neutral',
+                    'confidence': 0.0,
+                    'face_detected': False
+                }
+                continue
+            
+            all_emotions_serializable = serializable_scores(result)
+            logs.append((index, EmotionLog(
+                user=request.user,
+                emotion_type=result['emotion'],
+                confidence=float(result['confidence']),
+                source='face',
+                session=session,
+                raw_data=face_raw_data(result)
+            )))
+            results[index] = {
+                'emotion': result['emotion'],
+                'confidence': float(result['confidence']),
+                'face_detected': True,
+                'all_emotions': all_emotions_serializable,
+                'face_count': result['face_count'],
+                'faces': result['faces'],
+                'pipeline': result.get('pipeline')
+            }
+        
+        created = EmotionLog.objects.bulk_create([log for _, log in logs])
+        for (index, _), emotion_log in zip(logs, created):
+            results[index]['id'] = emotion_log.id
+            results[index]['timestamp'] = emotion_log.timestamp
+        
+        return Response({
+            'results': results,
+            'total_images': len(image_files),
+            'faces_detected': len(created),
+            'session_id': session.id if session else None
+        }, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'])
+    def analyze_video(self, request):
+        """
+        Analyze a recorded video into a per-second emotion timeline
+        Expected data:
+        - 'video': uploaded video file
+        - 'sample_rate': (optional) frames analyzed per second of video
+        - 'session_id': (optional) ID of current session
+        - 'save': (optional) store one emotion log per second with a face, default true
+        
+        Frames are decoded and classified in parallel segments; stored logs
+        are timestamped at their offset into the video and written with one
+        bulk insert.
+        """
+        if 'video' not in request.FILES:
+            return Response(
+                {'error': 'No video file provided. Please upload a video.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            sample_rate = float(request.data.get('sample_rate', settings.VIDEO_SAMPLE_RATE))
+        except (TypeError, ValueError):
+            sample_rate = 0
+        if not 0 < sample_rate <= settings.VIDEO_MAX_SAMPLE_RATE:
+            return Response(
+                {'error': f'Invalid sample_rate. Use a value between 0 and {settings.VIDEO_MAX_SAMPLE_RATE}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            with _upload_path(request.FILES['video']) as video_path:
+                info = probe_video(video_path)
+                if info is None:
+                    return Response(
+                        {'error': 'Could not read video. Upload a file OpenCV can decode.'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                if info['duration'] > settings.VIDEO_MAX_DURATION:
+                    return Response(
+                        {'error': f'Video too long. At most {settings.VIDEO_MAX_DURATION} seconds are allowed.'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                
+                result = facial_detector.analyze_video(
+                    video_path,
+                    sample_rate=sample_rate,
+                    workers=settings.VIDEO_ANALYSIS_WORKERS,
+                    batch_size=settings.VIDEO_BATCH_SIZE
+                )
+        except Exception as e:
+            return Response(
+                {'error': f'Error processing video: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        if 'error' in result:
+            return Response({'error': result['error']}, status=status.HTTP_400_BAD_REQUEST)
+        
+        timeline = [
+            {
+                'second': entry['second'],
+                'emotion': entry['emotion'],
+                'confidence': round(float(entry['confidence']), 4),
+                'samples': entry['samples'],
+                'scores': [round(float(entry['all_emotions'][label]), 2) for label in EMOTION_LABELS]
+            }
+            for entry in result['timeline']
+        ]
+        
+        session = _get_active_session(request)
+        created = []
+        if _is_true(request.data.get('save', True)):
+            # The video is assumed to end at upload time
+            started_at = timezone.now() - timedelta(seconds=result['duration'])
+            created = EmotionLog.objects.bulk_create([
+                EmotionLog(
+                    user=request.user,
+                    emotion_type=entry['emotion'],
+                    confidence=entry['confidence'],
+                    source='face',
+                    session=session,
+                    timestamp=started_at + timedelta(seconds=entry['second']),
+                    raw_data={
+                        'all_emotions': dict(zip(EMOTION_LABELS, entry['scores'])),
+                        'video_offset': entry['second'],
+                        'samples': entry['samples']
+                    }
+                )
+                for entry in timeline
+            ])
+        
+        return Response({
+            'duration': result['duration'],
+            'fps': result['fps'],
+            'sample_rate': sample_rate,
+            'frames_analyzed': result['frames_analyzed'],
+            'faces_detected': result['faces_detected'],
+            'labels': EMOTION_LABELS,
+            'timeline': timeline,
+            'logs_created': len(created),
+            'session_id': session.id if session else None
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'])
+    def analyze_audio(self, request):
+        """
+        Analyze a whole voice recording into per-segment emotions
+        Expected data:
+        - 'audio': uploaded audio file (WAV/FLAC/OGG)
+        - 'session_id': (optional) ID of current session
+        - 'save': (optional) store one emotion log per segment, default true
+        
+        The recording is read in blocks; silence is skipped by voice activity
+        detection and voiced stretches are classified in sliding windows.
+        Stored logs are timestamped at their offset into the recording.
+        """
+        if 'audio' not in request.FILES:
+            return Response(
+                {'error': 'No audio file provided. Please upload an audio file.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            with _upload_path(request.FILES['audio']) as audio_path:
+                info = probe_audio(audio_path)
+                if info is None:
+                    return Response(
+                        {'error': 'Could not read audio. Upload a WAV, FLAC or OGG file.'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                if info['duration'] > settings.VOICE_MAX_RECORDING_DURATION:
+                    return Response(
+                        {'error': f'Recording too long. At most {settings.VOICE_MAX_RECORDING_DURATION} seconds are allowed.'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                
+                result = voice_detector.analyze_audio(
+                    audio_path,
+                    window=settings.VOICE_SEGMENT_WINDOW,
+                    hop=settings.VOICE_SEGMENT_HOP
+                )
+        except Exception as e:
+            return Response(
+                {'error': f'Error processing audio: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        if not result.get('audio_processed', False):
+            return Response({'error': result.get('error', 'Could not process audio')}, status=status.HTTP_400_BAD_REQUEST)
+        
+        segments = [
+            {
+                'start': segment['start'],
+                'end': segment['end'],
+                'emotion': segment['emotion'],
+                'confidence': round(float(segment['confidence']), 4),
+                'all_emotions': {
+                    label: round(float(score), 4) for label, score in segment.get('all_emotions', {}).items()
+                }
+            }
+            for segment in result['segments']
+        ]
+        
+        session = _get_active_session(request)
+        created = []
+        if _is_true(request.data.get('save', True)):
+            # The recording is assumed to end at upload time
+            started_at = timezone.now() - timedelta(seconds=result['duration'])
+            created = EmotionLog.objects.bulk_create([
+                EmotionLog(
+                    user=request.user,
+                    emotion_type=segment['emotion'],
+                    confidence=segment['confidence'],
+                    source='voice',
+                    session=session,
+                    timestamp=started_at + timedelta(seconds=segment['start']),
+                    raw_data={
+                        'all_emotions': segment['all_emotions'],
+                        'audio_offset': segment['start'],
+                        'audio_end': segment['end']
+                    }
+                )
+                for segment in segments
+            ])
+        
+        return Response({
+            'duration': result['duration'],
+            'voiced_duration': result['voiced_duration'],
+            'segments': segments,
+            'logs_created': len(created),
+            'session_id': session.id if session else None
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
     
     def _detect_facial_emotion(self, request):
         """
@@ -56,30 +480,34 @@ class EmotionLogViewSet(viewsets.ModelViewSet):
             )
         
         image_file = request.FILES['image']
+        image_data = _read_upload(image_file)
         
-        # Validate file type
-        allowed_extensions = ['jpg', 'jpeg', 'png', 'bmp']
-        file_extension = image_file.name.split('.')[-1].lower()
-        
-        if file_extension not in allowed_extensions:
+        # Validate file type from the content itself rather than the file name
+        if sniff_image_type(image_data) is None:
             return Response(
-                {'error': f'Invalid file type. Allowed: {', '.join(allowed_extensions)}'},
+                {'error': 'Invalid file type. Allowed: ' + ', '.join(ALLOWED_IMAGE_TYPES)},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Save uploaded file temporarily
+        session = _get_active_session(request)
+        
+        if _is_true(request.data.get('async')):
+            job = DetectionJob.objects.create(
+                user=request.user,
+                session=session,
+                source='face',
+                payload=bytes(image_data),
+                options={'largest_face_only': _is_true(request.data.get('largest_face_only'))}
+            )
+            return Response(_job_accepted(request, job), status=status.HTTP_202_ACCEPTED)
+        
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_extension}') as tmp_file:
-                for chunk in image_file.chunks():
-                    tmp_file.write(chunk)
-                tmp_file_path = tmp_file.name
-            
-            # Detect emotion using ML model
-            result = facial_detector.detect_from_image(tmp_file_path)
-            
-            # Clean up temporary file
-            os.unlink(tmp_file_path)
+            # Decode in memory and detect emotion using ML model; frames of a
+            # session reuse the face tracked from its previous frames
+            track_key = f'session:{session.id}' if session else None
+            result = facial_detector.detect_from_bytes(image_data, track_key=track_key, scope=f'user:{request.user.id}')
+            if _is_true(request.data.get('largest_face_only')):
+                result = keep_largest_face(result)
             
             # Check if detection was successful
             if not result.get('face_detected', False):
@@ -91,60 +519,177 @@ class EmotionLogViewSet(viewsets.ModelViewSet):
                 }, status=status.HTTP_200_OK)
             
             # Create emotion log
-            session_id = request.data.get('session_id')
-            session = None
+            emotion_log = EmotionLog.objects.create(
+                user=request.user,
+                emotion_type=result['emotion'],
+                confidence=float(result['confidence']),
+                source='face',
+                session=session,
+                raw_data=face_raw_data(result)
+            )
             
-            if session_id:
-                try:
-                    session = UserSession.objects.get(id=session_id, user=request.user, is_active=True)
-                except UserSession.DoesNotExist:
-                    pass
+            return Response(facial_response(result, emotion_log, session), status=status.HTTP_201_CREATED)
+        
+        except Exception as e:
+            return Response(
+                {'error': f'Error processing image: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
+    def _detect_voice_emotion(self, request):
+        """
+        Handle voice emotion detection from uploaded audio, decoded in memory
+        """
+        if 'audio' not in request.FILES:
+            return Response(
+                {'error': 'No audio file provided. Please upload an audio file.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        audio_data = _read_upload(request.FILES['audio'])
+        
+        # Validate file type from the content itself rather than the file name
+        if sniff_audio_type(audio_data) is None:
+            return Response(
+                {'error': 'Invalid file type. Allowed: ' + ', '.join(ALLOWED_AUDIO_TYPES)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        session = _get_active_session(request)
+        
+        if _is_true(request.data.get('async')):
+            job = DetectionJob.objects.create(
+                user=request.user,
+                session=session,
+                source='voice',
+                payload=bytes(audio_data)
+            )
+            return Response(_job_accepted(request, job), status=status.HTTP_202_ACCEPTED)
+        
+        try:
+            result = voice_detector.detect_from_bytes(audio_data)
+            
+            if not result.get('audio_processed', False):
+                return Response({
+                    'error': result.get('error', 'Could not process audio'),
+                    'emotion': 'neutral',
+                    'confidence': 0.0,
+                    'audio_processed': False
+                }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Convert numpy types to Python native types for JSON serialization
-            all_emotions = result.get('all_emotions', {})
-            all_emotions_serializable = {
-                emotion: float(score) for emotion, score in all_emotions.items()
+            emotion_log = EmotionLog.objects.create(
+                user=request.user,
+                emotion_type=result['emotion'],
+                confidence=float(result['confidence']),
+                source='voice',
+                session=session,
+                raw_data=voice_raw_data(result)
+            )
+            
+            return Response(voice_response(result, emotion_log, session), status=status.HTTP_201_CREATED)
+        
+        except Exception as e:
+            return Response(
+                {'error': f'Error processing audio: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
+    def _detect_combined_emotion(self, request):
+        """
+        Handle combined detection from an uploaded image and audio clip,
+        fusing the facial and voice scores into one emotion log
+        """
+        if 'image' not in request.FILES or 'audio' not in request.FILES:
+            return Response(
+                {'error': 'Combined detection needs both an image and an audio file.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        image_data = _read_upload(request.FILES['image'])
+        audio_data = _read_upload(request.FILES['audio'])
+        
+        if sniff_image_type(image_data) is None:
+            return Response(
+                {'error': 'Invalid image type. Allowed: ' + ', '.join(ALLOWED_IMAGE_TYPES)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if sniff_audio_type(audio_data) is None:
+            return Response(
+                {'error': 'Invalid audio type. Allowed: ' + ', '.join(ALLOWED_AUDIO_TYPES)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        session = _get_active_session(request)
+        
+        try:
+            track_key = f'session:{session.id}' if session else None
+            result = combined_detector.detect_from_bytes(
+                image_data, audio_data, track_key=track_key, scope=f'user:{request.user.id}'
+            )
+            
+            if not result['modalities']:
+                return Response({
+                    'error': result['error'],
+                    'emotion': 'neutral',
+                    'confidence': 0.0,
+                    'face_detected': False,
+                    'audio_processed': result['voice'].get('audio_processed', False)
+                }, status=status.HTTP_200_OK)
+            
+            face, voice = result['face'], result['voice']
+            raw_data = {
+                'all_emotions': {emotion: round(score, 4) for emotion, score in result['all_emotions'].items()},
+                'modalities': result['modalities'],
             }
+            if face.get('face_detected', False):
+                raw_data['face'] = face_raw_data(face)
+            if voice.get('audio_processed', False):
+                raw_data['voice'] = voice_raw_data(voice)
             
             emotion_log = EmotionLog.objects.create(
                 user=request.user,
                 emotion_type=result['emotion'],
                 confidence=float(result['confidence']),
-                source='face',
+                source='combined',
                 session=session,
-                raw_data=all_emotions_serializable
+                raw_data=raw_data
             )
             
-            # Return response
             return Response({
                 'id': emotion_log.id,
                 'emotion': result['emotion'],
                 'confidence': float(result['confidence']),
-                'face_detected': True,
-                'all_emotions': all_emotions_serializable,
+                'all_emotions': raw_data['all_emotions'],
+                'modalities': result['modalities'],
+                'face': {
+                    'emotion': face['emotion'],
+                    'confidence': float(face['confidence']),
+                    'face_detected': face.get('face_detected', False),
+                    'face_count': face.get('face_count', 0)
+                },
+                'voice': {
+                    'emotion': voice['emotion'],
+                    'confidence': float(voice['confidence']),
+                    'audio_processed': voice.get('audio_processed', False)
+                },
                 'timestamp': emotion_log.timestamp,
                 'session_id': session.id if session else None
             }, status=status.HTTP_201_CREATED)
-            
+        
         except Exception as e:
-            # Clean up on error
-            if 'tmp_file_path' in locals() and os.path.exists(tmp_file_path):
-                os.unlink(tmp_file_path)
-            
             return Response(
-                {'error': f'Error processing image: {str(e)}'},
+                {'error': f'Error processing combined input: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class DetectionJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """API endpoint for polling queued detection jobs"""
+    serializer_class = DetectionJobSerializer
+    permission_classes = [IsAuthenticated]
     
-    def _detect_voice_emotion(self, request):
-        """
-        Handle voice emotion detection (placeholder for future implementation)
-        """
-        return Response({
-            'message': 'Voice emotion detection - Coming soon',
-            'emotion': 'neutral',
-            'confidence': 0.0
-        }, status=status.HTTP_501_NOT_IMPLEMENTED)
+    def get_queryset(self):
+        return DetectionJob.objects.filter(user=self.request.user).defer('payload')
 
 
 class UserSessionViewSet(viewsets.ModelViewSet):
@@ -153,11 +698,40 @@ class UserSessionViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return UserSession.objects.filter(user=self.request.user)
+        queryset = UserSession.objects.filter(user=self.request.user)
+        if self.action == 'retrieve':
+            # The latest logs only, in one extra query and without their raw data
+            recent = (
+                EmotionLog.objects
+                .only('id', 'session_id', 'emotion_type', 'confidence', 'source', 'timestamp')
+                .order_by('-timestamp', '-id')[:settings.SESSION_RECENT_EMOTIONS]
+            )
+            queryset = queryset.prefetch_related(Prefetch('emotions', queryset=recent, to_attr='recent_emotions'))
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return UserSessionDetailSerializer
+        return super().get_serializer_class()
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
+    @action(detail=True, methods=['get'], pagination_class=SessionEmotionPagination)
+    def emotions(self, request, pk=None):
+        """Page through a session's emotion logs, newest first"""
+        session = self.get_object()
+        logs = EmotionLog.objects.filter(session=session)
+        # Raw detection data (feature vectors, per-face scores) only on request
+        if _is_true(request.query_params.get('raw_data')):
+            serializer_class = EmotionLogSerializer
+        else:
+            serializer_class = EmotionLogSummarySerializer
+            logs = logs.defer('raw_data')
+        
+        page = self.paginate_queryset(logs)
+        return self.get_paginated_response(serializer_class(page, many=True).data)
+    
     @action(detail=True, methods=['post'])
     def end(self, request, pk=None):
         """End a session and calculate statistics"""
@@ -191,3 +765,21 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         profile, created = UserProfile.objects.get_or_create(user=request.user)
         serializer = self.get_serializer(profile)
         return Response(serializer.data)
+
+
+
+class ModelStatusView(APIView):
+    """
+    Readiness endpoint reporting whether the emotion models are loaded and warm.
+    Returns 503 until every model has been warmed up.
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        models = model_status()
+        ready = all(state['warm'] for state in models.values())
+        
+        return Response(
+            {'ready': ready, 'models': models},
+            status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        )
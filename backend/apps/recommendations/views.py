@@ -2,6 +2,7 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from config.pagination import TimestampCursorPagination
 from .models import Recommendation, UserRecommendationHistory, EmotionInsight
 from .serializers import RecommendationSerializer, UserRecommendationHistorySerializer, EmotionInsightSerializer
 import random
@@ -44,9 +45,10 @@ class UserRecommendationHistoryViewSet(viewsets.ModelViewSet):
     """API endpoint for user recommendation history"""
     serializer_class = UserRecommendationHistorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TimestampCursorPagination
     
     def get_queryset(self):
-        return UserRecommendationHistory.objects.filter(user=self.request.user)
+        return UserRecommendationHistory.objects.filter(user=self.request.user).select_related('recommendation')
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
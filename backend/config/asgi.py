@@ -2,6 +2,9 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP is served by Django; the live emotion WebSocket at /ws/emotions/stream/
+is served by apps.emotions.streaming. Run under an ASGI server, e.g.
+``uvicorn config.asgi:application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
@@ -13,4 +16,20 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up, since it loads models
+from apps.emotions.streaming import STREAM_PATH, emotion_stream  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """Route WebSocket connections to the emotion stream and everything else to Django"""
+    if scope['type'] == 'websocket':
+        if scope['path'] == STREAM_PATH:
+            return await emotion_stream(scope, receive, send)
+        
+        # Unknown WebSocket path: reject the handshake
+        await receive()
+        return await send({'type': 'websocket.close'})
+    
+    return await django_application(scope, receive, send)
@@ -147,6 +147,9 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Keep typical image uploads in memory so detection can decode them without touching disk
+FILE_UPLOAD_MAX_MEMORY_SIZE = config('FILE_UPLOAD_MAX_MEMORY_SIZE', default=10 * 1024 * 1024, cast=int)
+
 # CORS Settings
 CORS_ALLOW_ALL_ORIGINS = DEBUG
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:3000', cast=lambda v: [s.strip() for s in v.split(',')])
@@ -162,9 +165,85 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Cursor pagination of emotion logs, chat messages and recommendation history
+# (clients may ask for up to the max with ?page_size=)
+API_PAGE_SIZE = config('API_PAGE_SIZE', default=50, cast=int)
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=500, cast=int)
+
 # ML Model Paths
-FACIAL_MODEL_PATH = config('FACIAL_MODEL_PATH', default=str(BASE_DIR.parent / 'models' / 'trained' / 'facial_emotion.h5'))
-VOICE_MODEL_PATH = config('VOICE_MODEL_PATH', default=str(BASE_DIR.parent / 'models' / 'trained' / 'voice_emotion.pth'))
+FACIAL_MODEL_PATH = config('FACIAL_MODEL_PATH', default=str(BASE_DIR.parent / 'models' / 'trained' / 'facial_emotion.onnx'))
+VOICE_MODEL_PATH = config('VOICE_MODEL_PATH', default=str(BASE_DIR.parent / 'models' / 'trained' / 'voice_emotion.npz'))
+# Training data: raw/ datasets and processed/ feature matrices
+DATA_DIR = config('DATA_DIR', default=str(BASE_DIR.parent / 'data'))
+
+# ML Inference Settings
+# Face detector used by DeepFace: opencv, ssd, mtcnn, retinaface, mediapipe, yunet, ...
+FACIAL_DETECTOR_BACKEND = config('FACIAL_DETECTOR_BACKEND', default='opencv')
+# Longest image side (pixels) analyzed; larger uploads are downscaled first (0 disables the cap)
+FACIAL_MAX_IMAGE_SIDE = config('FACIAL_MAX_IMAGE_SIDE', default=1280, cast=int)
+# Decode large JPEGs at 1/2, 1/4 or 1/8 size directly when that still covers FACIAL_MAX_IMAGE_SIDE
+FACIAL_REDUCED_DECODE = config('FACIAL_REDUCED_DECODE', default=True, cast=bool)
+# Emotion classifier engine: 'keras' (DeepFace's model) or 'onnx' (FACIAL_MODEL_PATH via ONNX Runtime,
+# created with `python manage.py export_facial_model`); threads is ONNX Runtime's intra-op pool (0 = default)
+FACIAL_CLASSIFIER_BACKEND = config('FACIAL_CLASSIFIER_BACKEND', default='keras')
+FACIAL_CLASSIFIER_THREADS = config('FACIAL_CLASSIFIER_THREADS', default=0, cast=int)
+
+FACIAL_BATCH_MAX_IMAGES = config('FACIAL_BATCH_MAX_IMAGES', default=32, cast=int)
+
+# Micro-batching of concurrent detect requests (0 disables it)
+FACIAL_BATCH_WINDOW_MS = config('FACIAL_BATCH_WINDOW_MS', default=0, cast=float)
+FACIAL_BATCH_MAX_SIZE = config('FACIAL_BATCH_MAX_SIZE', default=8, cast=int)
+
+# Detection result cache (0 disables it); set a Hamming distance to also match near-identical frames
+FACIAL_CACHE_SIZE = config('FACIAL_CACHE_SIZE', default=256, cast=int)
+FACIAL_CACHE_TTL = config('FACIAL_CACHE_TTL', default=30.0, cast=float)
+FACIAL_CACHE_PHASH_DISTANCE = config('FACIAL_CACHE_PHASH_DISTANCE', default=None, cast=lambda v: int(v) if v not in (None, '') else None)
+
+# Face tracking between frames of a live session; full detection runs when the track is lost or every N frames
+FACIAL_TRACKING = config('FACIAL_TRACKING', default=True, cast=bool)
+FACIAL_REDETECT_INTERVAL = config('FACIAL_REDETECT_INTERVAL', default=10, cast=int)
+FACIAL_TRACK_MIN_SIMILARITY = config('FACIAL_TRACK_MIN_SIMILARITY', default=0.6, cast=float)
+FACIAL_TRACK_TTL = config('FACIAL_TRACK_TTL', default=30.0, cast=float)
+
+# Queued detection jobs (detect with async=true), processed by `python manage.py run_detection_worker`
+DETECTION_JOB_BATCH_SIZE = config('DETECTION_JOB_BATCH_SIZE', default=8, cast=int)
+DETECTION_JOB_POLL_INTERVAL = config('DETECTION_JOB_POLL_INTERVAL', default=0.5, cast=float)
+DETECTION_JOB_TIMEOUT = config('DETECTION_JOB_TIMEOUT', default=300, cast=int)
+DETECTION_JOB_MAX_ATTEMPTS = config('DETECTION_JOB_MAX_ATTEMPTS', default=3, cast=int)
+
+# Recorded video analysis
+VIDEO_SAMPLE_RATE = config('VIDEO_SAMPLE_RATE', default=2.0, cast=float)
+VIDEO_MAX_SAMPLE_RATE = config('VIDEO_MAX_SAMPLE_RATE', default=10.0, cast=float)
+VIDEO_ANALYSIS_WORKERS = config('VIDEO_ANALYSIS_WORKERS', default=os.cpu_count() or 1, cast=int)
+VIDEO_BATCH_SIZE = config('VIDEO_BATCH_SIZE', default=16, cast=int)
+VIDEO_MAX_DURATION = config('VIDEO_MAX_DURATION', default=600, cast=int)
+
+# Whole-recording analysis (analyze_audio): sliding window and hop over voiced segments, in seconds
+VOICE_SEGMENT_WINDOW = config('VOICE_SEGMENT_WINDOW', default=3.0, cast=float)
+VOICE_SEGMENT_HOP = config('VOICE_SEGMENT_HOP', default=1.5, cast=float)
+VOICE_MAX_RECORDING_DURATION = config('VOICE_MAX_RECORDING_DURATION', default=3600, cast=int)
+
+# Combined (face + voice) detection: weights of each modality in the fused scores
+COMBINED_FACE_WEIGHT = config('COMBINED_FACE_WEIGHT', default=0.6, cast=float)
+COMBINED_VOICE_WEIGHT = config('COMBINED_VOICE_WEIGHT', default=0.4, cast=float)
+COMBINED_WORKERS = config('COMBINED_WORKERS', default=4, cast=int)
+
+# Bulk upload of client-recorded emotion logs (POST /api/emotions/logs/bulk/)
+EMOTION_LOG_BULK_MAX_ENTRIES = config('EMOTION_LOG_BULK_MAX_ENTRIES', default=5000, cast=int)
+EMOTION_LOG_BULK_CHUNK_SIZE = config('EMOTION_LOG_BULK_CHUNK_SIZE', default=500, cast=int)
+
+# Session payloads: page size of GET /api/emotions/sessions/{id}/emotions/ (cursor
+# paginated like API_PAGE_SIZE) and latest logs embedded in a single session's detail
+SESSION_EMOTIONS_PAGE_SIZE = config('SESSION_EMOTIONS_PAGE_SIZE', default=50, cast=int)
+SESSION_EMOTIONS_MAX_PAGE_SIZE = config('SESSION_EMOTIONS_MAX_PAGE_SIZE', default=500, cast=int)
+SESSION_RECENT_EMOTIONS = config('SESSION_RECENT_EMOTIONS', default=10, cast=int)
+
+# 'local' runs models inside each web worker; 'server' submits work to the
+# inference server started with `python manage.py run_inference_server`
+ML_INFERENCE_BACKEND = config('ML_INFERENCE_BACKEND', default='local')
+ML_INFERENCE_SOCKET = config('ML_INFERENCE_SOCKET', default='/tmp/emotionsense-inference.sock')
+ML_INFERENCE_AUTHKEY = config('ML_INFERENCE_AUTHKEY', default=SECRET_KEY)
+ML_INFERENCE_WORKERS = config('ML_INFERENCE_WORKERS', default=2, cast=int)
 
 # OpenAI API
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
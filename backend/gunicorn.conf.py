@@ -0,0 +1,32 @@
+"""
+Gunicorn configuration
+
+Run with: gunicorn config.wsgi -c gunicorn.conf.py
+"""
+from decouple import config
+
+
+bind = config('GUNICORN_BIND', default='0.0.0.0:8000')
+workers = config('GUNICORN_WORKERS', default=2, cast=int)
+timeout = config('GUNICORN_TIMEOUT', default=120, cast=int)
+
+# Models are loaded in each worker after the fork, never in the master, so
+# TensorFlow state is not shared across processes
+preload_app = False
+
+# Set to False on pods that do not serve inference (admin, API-only workers)
+ML_WARMUP_ON_START = config('ML_WARMUP_ON_START', default=True, cast=bool)
+
+
+def post_worker_init(worker):
+    """Warm up models once the worker has loaded Django, before it accepts requests"""
+    if not ML_WARMUP_ON_START:
+        return
+    
+    from ml_models.warmup import warmup_models
+    
+    for name, result in warmup_models().items():
+        if result['warm']:
+            worker.log.info('Model %s warm in %ss', name, result['seconds'])
+        else:
+            worker.log.warning('Model %s warm-up failed: %s', name, result['error'])
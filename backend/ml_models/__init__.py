@@ -1,5 +1,18 @@
 # ML Models Package
-from .facial_emotion import facial_detector
-from .voice_emotion import voice_detector
+# Detectors are imported on first access so that importing this package
+# (e.g. from manage.py migrate or the admin) does not load TensorFlow or librosa.
+import importlib
+
+_DETECTOR_MODULES = {
+    'facial_detector': 'facial_emotion',
+    'voice_detector': 'voice_emotion',
+}
 
 __all__ = ['facial_detector', 'voice_detector']
+
+
+def __getattr__(name):
+    if name in _DETECTOR_MODULES:
+        module = importlib.import_module(f'.{_DETECTOR_MODULES[name]}', __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,194 @@
+"""
+Acoustic feature extraction from a single shared spectrogram
+
+librosa's feature functions each compute their own STFT (and chroma_stft
+also runs pitch tracking to estimate tuning). Here one power spectrogram
+per clip feeds every spectral feature, and clips can be processed as one
+zero-padded batch so the framing and FFT run vectorized over all of them.
+
+The feature layout follows the librosa settings used before (n_fft=2048,
+hop_length=512, hann window, centered frames): per-clip means of 13 MFCCs,
+12 chroma bins, zero-crossing rate, RMS energy and spectral centroid.
+Chroma assumes A440 tuning instead of estimating it per clip.
+"""
+import threading
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import scipy.fft
+import scipy.signal
+
+
+FEATURE_NAMES = (
+    [f'mfcc_{i}' for i in range(13)]
+    + [f'chroma_{i}' for i in range(12)]
+    + ['zcr', 'rms', 'spectral_centroid']
+)
+FEATURE_DIM = len(FEATURE_NAMES)
+
+# Clips per vectorized pass; bounds the memory of the framed batch
+BATCH_CHUNK = 32
+
+# power_to_db settings of librosa.feature.mfcc
+AMIN = 1e-10
+TOP_DB = 80.0
+
+
+class FeatureExtractor:
+    """
+    Vectorized acoustic feature extractor
+    
+    Filter banks are built once per sample rate and reused.
+    """
+    
+    def __init__(self, n_fft: int = 2048, hop_length: int = 512, n_mels: int = 128, n_mfcc: int = 13, n_chroma: int = 12):
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.n_mfcc = n_mfcc
+        self.n_chroma = n_chroma
+        self.window = scipy.signal.get_window('hann', n_fft, fftbins=True).astype(np.float32)
+        self._filters = {}
+        self._lock = threading.Lock()
+    
+    def extract(self, y: np.ndarray, sr: int) -> np.ndarray:
+        """
+        Extract the feature vector of one clip
+        
+        Args:
+            y: Mono audio signal
+            sr: Sample rate of the signal
+        
+        Returns:
+            Feature vector of length FEATURE_DIM
+        """
+        return self.extract_batch([y], sr)[0]
+    
+    def extract_batch(self, signals: Sequence[np.ndarray], sr: int) -> np.ndarray:
+        """
+        Extract feature vectors of several clips at once
+        
+        Clips are sorted by length and zero-padded into arrays of up to
+        BATCH_CHUNK clips; frames past the end of each clip are masked out
+        of its averages, so results match extracting the clips one by one.
+        
+        Args:
+            signals: Mono audio signals, all at sample rate sr
+            sr: Sample rate of the signals
+        
+        Returns:
+            Array of shape (len(signals), FEATURE_DIM)
+        """
+        features = np.zeros((len(signals), FEATURE_DIM), dtype=np.float32)
+        order = np.argsort([len(y) for y in signals], kind='stable')
+        for start in range(0, len(order), BATCH_CHUNK):
+            chunk = order[start:start + BATCH_CHUNK]
+            features[chunk] = self._extract_padded([signals[i] for i in chunk], sr)
+        return features
+    
+    def _extract_padded(self, signals: Sequence[np.ndarray], sr: int) -> np.ndarray:
+        batch, lengths = self._pad(signals)
+        frame_counts = 1 + lengths // self.hop_length
+        # (clips, frames) mask of frames inside each clip
+        mask = np.arange(frame_counts.max())[np.newaxis, :] < frame_counts[:, np.newaxis]
+        
+        power = self._power_spectrogram(batch)[:, :mask.shape[1]]
+        features = self._spectral_features(power, mask, sr)
+        features['zcr'] = self._zero_crossing_rate(batch, lengths, mask)
+        
+        frames = mask.sum(axis=1, keepdims=True)
+        means = [
+            _masked_mean(features['mfcc'], mask, frames),
+            _masked_mean(features['chroma'], mask, frames),
+            _masked_mean(features['zcr'][..., np.newaxis], mask, frames),
+            _masked_mean(features['rms'][..., np.newaxis], mask, frames),
+            _masked_mean(features['centroid'][..., np.newaxis], mask, frames),
+        ]
+        return np.concatenate(means, axis=1).astype(np.float32)
+    
+    def _pad(self, signals: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        lengths = np.array([len(y) for y in signals])
+        batch = np.zeros((len(signals), max(1, lengths.max())), dtype=np.float32)
+        for row, y in zip(batch, signals):
+            row[:len(y)] = y
+        return batch, lengths
+    
+    def _frame(self, padded: np.ndarray) -> np.ndarray:
+        """(clips, samples) -> (clips, frames, n_fft) view of overlapping frames"""
+        windows = np.lib.stride_tricks.sliding_window_view(padded, self.n_fft, axis=-1)
+        return windows[:, ::self.hop_length]
+    
+    def _power_spectrogram(self, batch: np.ndarray) -> np.ndarray:
+        """Centered, zero-padded STFT power of every clip: (clips, frames, 1 + n_fft // 2)"""
+        pad = self.n_fft // 2
+        padded = np.pad(batch, ((0, 0), (pad, pad)))
+        spectrum = scipy.fft.rfft(self._frame(padded) * self.window, axis=-1)
+        return spectrum.real ** 2 + spectrum.imag ** 2
+    
+    def _spectral_features(self, power: np.ndarray, mask: np.ndarray, sr: int) -> Dict[str, np.ndarray]:
+        """Per-frame MFCC, chroma, RMS and spectral centroid from one power spectrogram"""
+        mel_basis, chroma_basis, frequencies = self._get_filters(sr)
+        
+        # MFCC: log mel power (top_db relative to each clip's peak), then DCT
+        mel_db = 10.0 * np.log10(np.maximum(AMIN, power @ mel_basis.T))
+        peak = np.where(mask[..., np.newaxis], mel_db, -np.inf).max(axis=(1, 2), keepdims=True)
+        mel_db = np.maximum(mel_db, peak - TOP_DB)
+        mfcc = scipy.fft.dct(mel_db, type=2, norm='ortho', axis=-1)[..., :self.n_mfcc]
+        
+        # Chroma, each frame scaled to a maximum of 1
+        chroma = power @ chroma_basis.T
+        chroma_peak = chroma.max(axis=-1, keepdims=True)
+        chroma = chroma / np.where(chroma_peak < np.finfo(chroma.dtype).tiny, 1.0, chroma_peak)
+        
+        # RMS energy from the spectrum (Parseval), as librosa.feature.rms(S=...) computes it
+        energy = 2 * power.sum(axis=-1) - power[..., 0]
+        if self.n_fft % 2 == 0:
+            energy -= power[..., -1]
+        rms = np.sqrt(energy / self.n_fft ** 2)
+        
+        magnitude = np.sqrt(power)
+        total = magnitude.sum(axis=-1)
+        centroid = (magnitude @ frequencies) / np.where(total > 0, total, 1.0)
+        
+        return {'mfcc': mfcc, 'chroma': chroma, 'rms': rms, 'centroid': centroid}
+    
+    def _zero_crossing_rate(self, batch: np.ndarray, lengths: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Fraction of sign changes per frame, with edge padding as librosa.feature.zero_crossing_rate"""
+        pad = self.n_fft // 2
+        # Index every sample of the edge-padded clip into the unpadded batch row
+        positions = np.arange(batch.shape[1] + 2 * pad) - pad
+        positions = np.clip(positions[np.newaxis, :], 0, np.maximum(lengths, 1)[:, np.newaxis] - 1)
+        padded = np.take_along_axis(batch, positions, axis=1)
+        
+        padded[np.abs(padded) <= AMIN] = 0
+        signs = np.signbit(padded)
+        crossings = np.zeros(padded.shape, dtype=np.float32)
+        crossings[:, 1:] = signs[:, 1:] != signs[:, :-1]
+        
+        # Crossings inside each frame, excluding its first sample
+        cumulative = np.concatenate([np.zeros((len(batch), 1), np.float32), np.cumsum(crossings, axis=1)], axis=1)
+        starts = np.arange(mask.shape[1]) * self.hop_length
+        inside = cumulative[:, starts + self.n_fft] - cumulative[:, starts + 1]
+        return inside / self.n_fft
+    
+    def _get_filters(self, sr: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Mel and chroma filter banks and FFT bin frequencies for a sample rate"""
+        if sr not in self._filters:
+            with self._lock:
+                if sr not in self._filters:
+                    import librosa
+                    self._filters[sr] = (
+                        librosa.filters.mel(sr=sr, n_fft=self.n_fft, n_mels=self.n_mels).astype(np.float32),
+                        librosa.filters.chroma(sr=sr, n_fft=self.n_fft, n_chroma=self.n_chroma, tuning=0.0).astype(np.float32),
+                        np.fft.rfftfreq(self.n_fft, 1.0 / sr).astype(np.float32),
+                    )
+        return self._filters[sr]
+
+
+def _masked_mean(values: np.ndarray, mask: np.ndarray, frames: np.ndarray) -> np.ndarray:
+    """Mean over the frames axis of (clips, frames, features), counting only frames in mask"""
+    return np.where(mask[..., np.newaxis], values, 0).sum(axis=1) / frames
+
+
+# Shared instance; its filter banks are reused across requests
+feature_extractor = FeatureExtractor()
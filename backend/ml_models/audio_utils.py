@@ -0,0 +1,137 @@
+"""
+Audio decoding helpers for in-memory uploads
+"""
+import io
+import numpy as np
+import soundfile as sf
+from typing import Dict, Iterator, Optional, Tuple
+
+
+# Magic byte signatures of the audio containers accepted for detection
+AUDIO_SIGNATURES = [
+    (b'RIFF', 'wav'),
+    (b'fLaC', 'flac'),
+    (b'OggS', 'ogg'),
+    (b'ID3', 'mp3'),
+    (b'\xff\xfb', 'mp3'),
+    (b'\xff\xf3', 'mp3'),
+    (b'\xff\xf2', 'mp3'),
+]
+
+
+def sniff_audio_type(data) -> Optional[str]:
+    """
+    Identify an audio format from its leading magic bytes
+    
+    Args:
+        data: Raw audio bytes (bytes or memoryview)
+    
+    Returns:
+        Format name ('wav', 'flac', 'ogg', 'mp3') or None if unsupported
+    """
+    header = bytes(data[:12])
+    if header.startswith(b'RIFF') and header[8:12] != b'WAVE':
+        return None
+    for signature, audio_type in AUDIO_SIGNATURES:
+        if header.startswith(signature):
+            return audio_type
+    return None
+
+
+def decode_audio(data, max_duration: Optional[float] = None) -> Tuple[np.ndarray, int]:
+    """
+    Decode an encoded audio buffer into a mono float32 signal without
+    touching the filesystem
+    
+    Only the first max_duration seconds are decoded, so long uploads do
+    not pay for audio that is never analyzed.
+    
+    Args:
+        data: Raw audio bytes (bytes or memoryview)
+        max_duration: Seconds to decode from the start, or None for all
+    
+    Returns:
+        (signal, sample rate)
+    
+    Raises:
+        ValueError if the data cannot be decoded
+    """
+    return load_audio(io.BytesIO(data), max_duration=max_duration)
+
+
+def load_audio(source, max_duration: Optional[float] = None) -> Tuple[np.ndarray, int]:
+    """
+    Read an audio file at its native sample rate into a mono float32 signal
+    
+    Args:
+        source: File path or binary file-like object
+        max_duration: Seconds to read from the start, or None for all
+    
+    Returns:
+        (signal, sample rate)
+    
+    Raises:
+        ValueError if the audio cannot be decoded
+    """
+    try:
+        with sf.SoundFile(source) as audio:
+            frames = int(max_duration * audio.samplerate) if max_duration else -1
+            y = audio.read(frames, dtype='float32', always_2d=True)
+            sr = audio.samplerate
+    except (RuntimeError, sf.SoundFileError) as e:
+        raise ValueError('Could not decode audio') from e
+    
+    if y.shape[0] == 0:
+        raise ValueError('Audio contains no samples')
+    
+    # Downmix to mono as librosa.load does
+    return y.mean(axis=1), sr
+
+
+def probe_audio(path: str) -> Optional[Dict[str, float]]:
+    """
+    Read an audio file's sample rate, channel count and duration from its header
+    
+    Args:
+        path: Audio file path
+    
+    Returns:
+        Dict with sample_rate, channels and duration, or None if it cannot be read
+    """
+    try:
+        info = sf.info(path)
+    except (RuntimeError, sf.SoundFileError):
+        return None
+    if info.samplerate <= 0 or info.frames <= 0:
+        return None
+    return {'sample_rate': info.samplerate, 'channels': info.channels, 'duration': info.frames / info.samplerate}
+
+
+def iter_audio_blocks(source, block_duration: float = 10.0) -> Iterator[Tuple[np.ndarray, int]]:
+    """
+    Read an audio file block by block as mono float32 signals, so long
+    recordings are never held in memory at once
+    
+    Args:
+        source: File path or binary file-like object
+        block_duration: Seconds of audio per block
+    
+    Returns:
+        Iterator of (block, sample rate)
+    
+    Raises:
+        ValueError if the audio cannot be decoded
+    """
+    try:
+        audio = sf.SoundFile(source)
+    except (RuntimeError, sf.SoundFileError) as e:
+        raise ValueError('Could not decode audio') from e
+    
+    with audio:
+        block_frames = max(1, int(block_duration * audio.samplerate))
+        while True:
+            block = audio.read(block_frames, dtype='float32', always_2d=True)
+            if block.shape[0] == 0:
+                break
+            yield block.mean(axis=1), audio.samplerate
+
@@ -0,0 +1,125 @@
+"""
+Inference engines for the facial emotion classifier
+
+Every backend maps a stack of preprocessed faces of shape (N, 48, 48, 1)
+to softmax probabilities of shape (N, 7) in EMOTION_LABELS order, so
+backends can be swapped without touching detection or preprocessing.
+"""
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+
+
+class EmotionBackend:
+    """Lazily loaded emotion classifier"""
+    
+    name = None
+    
+    def __init__(self):
+        self._model = None
+        self._lock = threading.Lock()
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+    
+    def load(self):
+        """Load the model once, even under concurrent first requests"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+    
+    def predict(self, faces: np.ndarray) -> np.ndarray:
+        """
+        Classify preprocessed faces
+        
+        Args:
+            faces: Array of shape (N, 48, 48, 1) scaled to 0-1
+        
+        Returns:
+            Array of shape (N, 7) with class probabilities
+        """
+        raise NotImplementedError
+    
+    def _load(self):
+        raise NotImplementedError
+
+
+class KerasEmotionBackend(EmotionBackend):
+    """DeepFace's bundled Keras emotion model (downloads its weights on first use)"""
+    
+    name = 'keras'
+    
+    def predict(self, faces: np.ndarray) -> np.ndarray:
+        return self.load().model.predict(faces, verbose=0)
+    
+    def _load(self):
+        from deepface import DeepFace
+        return DeepFace.build_model('Emotion')
+
+
+class OnnxEmotionBackend(EmotionBackend):
+    """
+    Exported (optionally quantized) emotion model run with ONNX Runtime on CPU
+    
+    Create the model with `python manage.py export_facial_model`.
+    """
+    
+    name = 'onnx'
+    
+    def __init__(self, model_path: str, threads: int = 0):
+        super().__init__()
+        self.model_path = model_path
+        self.threads = threads
+        self._input_name = None
+    
+    def predict(self, faces: np.ndarray) -> np.ndarray:
+        session = self.load()
+        return session.run(None, {self._input_name: faces.astype(np.float32, copy=False)})[0]
+    
+    def _load(self):
+        import onnxruntime
+        
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f'ONNX emotion model not found: {self.model_path}')
+        
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads:
+            # Keep each process to its share of cores when running several workers
+            options.intra_op_num_threads = self.threads
+            options.inter_op_num_threads = 1
+        
+        session = onnxruntime.InferenceSession(self.model_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self._input_name = session.get_inputs()[0].name
+        return session
+
+
+BACKENDS = {
+    'keras': KerasEmotionBackend,
+    'onnx': OnnxEmotionBackend,
+}
+
+
+def get_backend(name: str, model_path: Optional[str] = None, threads: int = 0) -> EmotionBackend:
+    """
+    Create an emotion classifier backend
+    
+    Args:
+        name: 'keras' or 'onnx'
+        model_path: Exported model file (onnx only)
+        threads: Intra-op threads, 0 for the runtime default (onnx only)
+    
+    Returns:
+        EmotionBackend (not loaded yet)
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown emotion backend: {name}. Use one of: {', '.join(BACKENDS)}")
+    
+    if name == 'onnx':
+        return OnnxEmotionBackend(model_path, threads=threads)
+    return BACKENDS[name]()
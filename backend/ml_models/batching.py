@@ -0,0 +1,116 @@
+"""
+Dynamic micro-batching for concurrent inference calls
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-item calls into batches
+    
+    The first waiting item opens a window of max_wait_ms; items arriving
+    within it (up to max_batch_size) are processed by one batch_fn call and
+    each caller receives its own result.
+    """
+    
+    def __init__(self, batch_fn: Callable[[List[any]], List[any]], max_batch_size: int = 8, max_wait_ms: float = 5.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        
+        # Metrics
+        self._batches = 0
+        self._items = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._batch_sizes = {}
+    
+    def submit(self, item: any) -> any:
+        """
+        Queue an item and block until its batch has been processed
+        
+        Args:
+            item: Single input for batch_fn
+            
+        Returns:
+            The result batch_fn produced for this item
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future.result()
+    
+    def stats(self) -> Dict[str, any]:
+        """Batch size and queue wait metrics since start-up"""
+        with self._lock:
+            return {
+                'batches': self._batches,
+                'items': self._items,
+                'average_batch_size': round(self._items / self._batches, 2) if self._batches else 0.0,
+                'batch_size_histogram': dict(sorted(self._batch_sizes.items())),
+                'average_queue_wait_ms': round(1000 * self._wait_total / self._items, 2) if self._items else 0.0,
+                'max_queue_wait_ms': round(1000 * self._wait_max, 2),
+                'queue_depth': self._queue.qsize(),
+            }
+    
+    def _ensure_worker(self):
+        """Start the batching thread, again after a fork since threads do not survive it"""
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid:
+            return
+        
+        with self._lock:
+            if self._thread is None or self._pid != pid:
+                self._queue = queue.Queue()
+                self._pid = pid
+                self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._thread.start()
+    
+    def _collect(self) -> list:
+        """Block for the first item, then gather more until the window closes or the batch is full"""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            self._record(batch, started)
+            
+            try:
+                results = self.batch_fn([item for item, _, _ in batch])
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+    
+    def _record(self, batch: list, started: float):
+        waits = [started - queued_at for _, _, queued_at in batch]
+        
+        with self._lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._wait_total += sum(waits)
+            self._wait_max = max(self._wait_max, max(waits))
+            self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
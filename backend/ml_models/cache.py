@@ -0,0 +1,112 @@
+"""
+Detection result cache keyed by content hash and perceptual hash
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+
+class DetectionCache:
+    """
+    Bounded LRU cache of detection results with a time-to-live
+    
+    Entries are found by an exact content hash, or optionally by a
+    perceptual hash (dHash) within a Hamming distance, so near-identical
+    webcam frames can reuse a previous result. Every entry belongs to a
+    scope (such as the requesting user), and lookups only see entries of
+    their own scope, so one user's upload is never answered with a result
+    computed from another user's frame.
+    """
+    
+    def __init__(self, max_size: int = 256, ttl: float = 30.0, phash_distance: Optional[int] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.phash_distance = phash_distance
+        self._entries = OrderedDict()  # (scope, key) -> (expires_at, phash, result)
+        self._lock = threading.Lock()
+        self._exact_hits = 0
+        self._perceptual_hits = 0
+        self._misses = 0
+    
+    @staticmethod
+    def content_key(data) -> str:
+        """SHA-256 of raw bytes, a memoryview or a numpy array"""
+        if isinstance(data, np.ndarray):
+            data = np.ascontiguousarray(data)
+        return hashlib.sha256(data).hexdigest()
+    
+    @staticmethod
+    def perceptual_hash(frame: np.ndarray) -> int:
+        """64-bit difference hash of a downscaled grayscale frame"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+        bits = (small[:, 1:] > small[:, :-1]).flatten()
+        return int(np.packbits(bits).view('>u8')[0])
+    
+    @property
+    def uses_perceptual_hash(self) -> bool:
+        return self.phash_distance is not None
+    
+    def get(self, key: str, phash: Optional[int] = None, scope=None) -> Optional[Dict[str, any]]:
+        """
+        Look up a result by content key, then by perceptual hash
+        
+        Args:
+            key: Content hash from content_key()
+            phash: Optional perceptual hash from perceptual_hash()
+            scope: Owner of the lookup (e.g. 'user:<id>'); only its own entries match
+            
+        Returns:
+            Copy of the cached result, or None on a miss
+        """
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get((scope, key))
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end((scope, key))
+                self._exact_hits += 1
+                return dict(entry[2])
+            
+            if phash is not None and self.uses_perceptual_hash:
+                for other_key, (expires_at, other_phash, result) in reversed(self._entries.items()):
+                    if other_key[0] != scope or expires_at <= now or other_phash is None:
+                        continue
+                    if bin(phash ^ other_phash).count('1') <= self.phash_distance:
+                        self._entries.move_to_end(other_key)
+                        self._perceptual_hits += 1
+                        return dict(result)
+            
+            self._misses += 1
+            return None
+    
+    def put(self, key: str, result: Dict[str, any], phash: Optional[int] = None, scope=None):
+        """Store a result in a scope, evicting expired and least recently used entries"""
+        now = time.monotonic()
+        
+        with self._lock:
+            self._entries[(scope, key)] = (now + self.ttl, phash, dict(result))
+            self._entries.move_to_end((scope, key))
+            
+            while self._entries and next(iter(self._entries.values()))[0] <= now:
+                self._entries.popitem(last=False)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def stats(self) -> Dict[str, any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._exact_hits + self._perceptual_hits + self._misses
+            hits = self._exact_hits + self._perceptual_hits
+            return {
+                'size': len(self._entries),
+                'exact_hits': self._exact_hits,
+                'perceptual_hits': self._perceptual_hits,
+                'misses': self._misses,
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,16 @@
+"""
+Access to Django settings from the ML package
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+def get_setting(name: str, default=None):
+    """
+    Read a Django setting, falling back to a default when Django is not
+    configured (e.g. when the detectors are used from a plain script)
+    """
+    try:
+        return getattr(settings, name, default)
+    except ImproperlyConfigured:
+        return default
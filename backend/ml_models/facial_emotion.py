@@ -1,16 +1,76 @@
 """
 Facial Emotion Detection Module using OpenCV and DeepFace
 """
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import cv2
-from deepface import DeepFace
 import numpy as np
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .backends import EmotionBackend, get_backend
+from .batching import MicroBatcher
+from .cache import DetectionCache
+from .conf import get_setting
+from .image_utils import cap_resolution, decode_image, image_dimensions, reduced_decode_scale, sniff_image_type
+from .inference_server import InferenceError, get_inference_client
+from .tracking import FaceTracker
+from .video import average_emotions, build_timeline, iter_segment_frames, open_capture, probe_video, sample_frames, split_frame_range
+
+
+# Output order of the DeepFace emotion model
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+# Intermediate size DeepFace.analyze resizes faces to, and the emotion model input size
+ANALYZE_SIZE = 224
+EMOTION_INPUT_SIZE = 48
+
+
+def _scale_region(region: Dict[str, int], scale: float) -> Dict[str, int]:
+    """Map a face region's x, y, w, h to another image scale"""
+    return {key: int(round(region[key] * scale)) for key in ('x', 'y', 'w', 'h')}
+
+
+def _region_area(face: Dict[str, any]) -> int:
+    return face['region']['w'] * face['region']['h']
+
+
+def keep_largest_face(result: Dict[str, any]) -> Dict[str, any]:
+    """
+    Reduce a multi-face detection result to its largest face
+    
+    Args:
+        result: Result dict from FacialEmotionDetector
+        
+    Returns:
+        Copy of the result whose 'faces' holds only the largest face
+    """
+    if not result.get('faces'):
+        return result
+    
+    largest = max(result['faces'], key=_region_area)
+    return {**result, 'faces': [largest], 'face_count': 1}
+
+
+def _deepface():
+    """Import DeepFace on first use; it pulls in TensorFlow, which is slow and memory hungry"""
+    from deepface import DeepFace
+    return DeepFace
 
 
 class FacialEmotionDetector:
-    """Detects emotions from facial images using DeepFace"""
+    """
+    Detects emotions from facial images using DeepFace
+    
+    Faces are located with DeepFace and classified by an emotion backend:
+    DeepFace's Keras model, or an exported ONNX model run with ONNX Runtime.
+    With a client, inference is submitted to the inference server instead
+    of running in this process. Frames are downscaled to max_image_side
+    before face detection, and large JPEG uploads are decoded at reduced
+    size when reduced_decode is on.
+    """
     
-    def __init__(self):
+    def __init__(self, client=None, detector_backend: str = None, max_image_side: int = None, reduced_decode: bool = None,
+                 classifier: EmotionBackend = None):
         self.emotion_mapping = {
             'angry': 'angry',
             'disgust': 'disgust',
@@ -20,6 +80,85 @@ class FacialEmotionDetector:
             'surprise': 'surprise',
             'neutral': 'neutral'
         }
+        self.classifier = classifier or get_backend(
+            get_setting('FACIAL_CLASSIFIER_BACKEND', 'keras'),
+            model_path=get_setting('FACIAL_MODEL_PATH', None),
+            threads=get_setting('FACIAL_CLASSIFIER_THREADS', 0)
+        )
+        self.client = client
+        self.batcher = None
+        self.cache = None
+        self.tracker = None
+        self.is_warm = False
+        
+        # Preprocessing pipeline, defaulting to the deployment's settings
+        self.detector_backend = detector_backend or get_setting('FACIAL_DETECTOR_BACKEND', 'opencv')
+        self.max_image_side = max_image_side if max_image_side is not None else get_setting('FACIAL_MAX_IMAGE_SIDE', None)
+        self.reduced_decode = reduced_decode if reduced_decode is not None else get_setting('FACIAL_REDUCED_DECODE', False)
+    
+    def enable_batching(self, max_batch_size: int = 8, max_wait_ms: float = 5.0):
+        """
+        Route detect_from_frame through a micro-batcher so concurrent
+        callers share one classifier pass
+        
+        Args:
+            max_batch_size: Largest number of frames per batch
+            max_wait_ms: How long the first frame waits for others to join
+        """
+        self.batcher = MicroBatcher(self.detect_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    
+    def enable_cache(self, max_size: int = 256, ttl: float = 30.0, phash_distance: Optional[int] = None):
+        """
+        Put a result cache in front of detect_from_frame and detect_from_bytes
+        
+        Args:
+            max_size: Maximum number of cached results (LRU eviction)
+            ttl: Seconds a result stays valid
+            phash_distance: Max Hamming distance for perceptual-hash hits, None for exact hits only
+        """
+        self.cache = DetectionCache(max_size=max_size, ttl=ttl, phash_distance=phash_distance)
+    
+    def enable_tracking(self, redetect_interval: int = 10, min_similarity: float = 0.6, ttl: float = 30.0):
+        """
+        Track faces between frames of the same session so that full face
+        detection only runs when the track is lost or redetect_interval
+        frames have passed
+        
+        Args:
+            redetect_interval: Frames classified from the tracked box before detecting again
+            min_similarity: Minimum template match score to keep a track
+            ttl: Seconds an idle track is kept
+        """
+        self.tracker = FaceTracker(redetect_interval=redetect_interval, min_similarity=min_similarity, ttl=ttl)
+    
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the emotion model weights are in memory (in the server when using a client)"""
+        if self.client is not None:
+            return self.is_warm
+        return self.classifier.is_loaded
+    
+    def warmup(self) -> Dict[str, any]:
+        """
+        Load model weights and run one dummy inference so the first real
+        request does not pay for graph construction
+        
+        Returns:
+            Dict with the warm-up result
+        """
+        if self.client is not None:
+            try:
+                result = self.client.call('facial', 'warmup')
+            except InferenceError as e:
+                result = self._error_result(str(e))
+            self.is_warm = 'error' not in result
+            return result
+        
+        self.classifier.load()
+        frame = np.zeros((EMOTION_INPUT_SIZE * 2, EMOTION_INPUT_SIZE * 2, 3), dtype=np.uint8)
+        result = self._detect_frame(frame)
+        self.is_warm = 'error' not in result
+        return result
     
     def detect_from_image(self, image_path: str) -> Dict[str, any]:
         """
@@ -31,116 +170,475 @@ class FacialEmotionDetector:
         Returns:
             Dict with emotion, confidence, and raw data
         """
-        try:
-            # Analyze face using DeepFace
-            result = DeepFace.analyze(
-                img_path=image_path,
-                actions=['emotion'],
-                enforce_detection=False
-            )
-            
-            # Handle both single face and multiple faces
-            if isinstance(result, list):
-                result = result[0]  # Take first face
-            
-            # Get dominant emotion
-            dominant_emotion = result['dominant_emotion']
-            emotion_scores = result['emotion']
-            confidence = emotion_scores[dominant_emotion] / 100.0
-            
-            return {
-                'emotion': self.emotion_mapping.get(dominant_emotion, 'neutral'),
-                'confidence': confidence,
-                'all_emotions': emotion_scores,
-                'face_detected': True
-            }
-            
-        except Exception as e:
-            return {
-                'emotion': 'neutral',
-                'confidence': 0.0,
-                'error': str(e),
-                'face_detected': False
-            }
+        frame = cv2.imread(image_path)
+        
+        if frame is None:
+            return self._error_result(f'Could not read image: {image_path}')
+        
+        return self.detect_from_frame(frame)
     
-    def detect_from_frame(self, frame: np.ndarray) -> Dict[str, any]:
+    def detect_from_frame(self, frame: np.ndarray, scope=None) -> Dict[str, any]:
         """
         Detect emotion from a video frame (numpy array)
         
         Args:
             frame: Video frame as numpy array (from cv2)
+            scope: (optional) Result cache scope, such as the requesting user
             
         Returns:
             Dict with emotion, confidence, and raw data
         """
-        try:
-            # Analyze the frame
-            result = DeepFace.analyze(
-                img_path=frame,
-                actions=['emotion'],
-                enforce_detection=False
-            )
+        if self.cache is not None:
+            return self._cached_detection(self.cache.content_key(frame), frame, lambda: self._detect_frame(frame), scope)
+        return self._detect_frame(frame)
+    
+    def detect_from_bytes(self, data, track_key=None, scope=None) -> Dict[str, any]:
+        """
+        Detect emotion from an encoded image held in memory
+        
+        Args:
+            data: Encoded image bytes (JPEG/PNG/BMP), bytes or memoryview
+            track_key: (optional) Session key for face tracking between frames
+            scope: (optional) Result cache scope, such as the requesting user;
+                cached results are only shared within a scope
+        
+        Returns:
+            Dict with emotion, confidence, and raw data
+        """
+        if track_key is not None and self.tracker is not None:
+            frame, decode_info = self.decode(data)
+            if frame is None:
+                return self._error_result('Could not decode image')
+            return self.apply_decode_info(self.detect_tracked(frame, track_key), decode_info)
+        
+        if self.cache is not None:
+            # Perceptual lookups need the decoded frame; exact lookups only need the bytes
+            decoded = self.decode(data) if self.cache.uses_perceptual_hash and self.client is None else None
+            frame = decoded[0] if decoded else None
+            return self._cached_detection(self.cache.content_key(data), frame, lambda: self._detect_bytes(data, decoded), scope)
+        return self._detect_bytes(data)
+    
+    def decode(self, data) -> Tuple[Optional[np.ndarray], Dict[str, any]]:
+        """
+        Decode an encoded image, using reduced-size JPEG decoding when the
+        image is at least twice as large as max_image_side
+        
+        Args:
+            data: Encoded image bytes (JPEG/PNG/BMP), bytes or memoryview
             
-            if isinstance(result, list):
-                result = result[0]
+        Returns:
+            (frame or None, dict with the original size and decode scale)
+        """
+        size = image_dimensions(data)
+        scale = 1
+        if self.reduced_decode and sniff_image_type(data) == 'jpeg':
+            scale = reduced_decode_scale(size, self.max_image_side)
+        
+        frame = decode_image(data, scale=scale)
+        return frame, {'input_size': list(size) if size else None, 'decode_scale': scale}
+    
+    def detect_batch(self, frames: List[np.ndarray]) -> List[Dict[str, any]]:
+        """
+        Detect emotions for several frames with a single classifier pass
+        
+        Faces are located in every frame first, then all face crops from all
+        frames are stacked and classified by one forward pass of the emotion model.
+        
+        Args:
+            frames: List of frames as numpy arrays (from cv2)
             
-            dominant_emotion = result['dominant_emotion']
-            emotion_scores = result['emotion']
-            confidence = emotion_scores[dominant_emotion] / 100.0
+        Returns:
+            List of result dicts, in the same order as frames. Each result
+            lists every detected face under 'faces'; the top-level emotion
+            fields describe the largest face.
+        """
+        if self.client is not None:
+            try:
+                return self.client.call('facial', 'detect_batch', frames)
+            except InferenceError as e:
+                return [self._error_result(str(e)) for _ in frames]
+        
+        results = [None] * len(frames)
+        pipelines = [None] * len(frames)
+        faces = []
+        owners = []  # (frame index, face region, face detector confidence) per face
+        
+        for index, frame in enumerate(frames):
+            try:
+                processed = cap_resolution(frame, self.max_image_side)
+                pipelines[index] = {
+                    'detector_backend': self.detector_backend,
+                    'input_size': [frame.shape[1], frame.shape[0]],
+                    'processed_size': [processed.shape[1], processed.shape[0]],
+                }
+                scale = frame.shape[1] / processed.shape[1]
+                
+                frame_faces = []
+                frame_owners = []
+                for face_obj in self.extract_faces(processed):
+                    frame_faces.append(self.preprocess_face(face_obj['face']))
+                    frame_owners.append((index, _scale_region(face_obj['facial_area'], scale), float(face_obj.get('confidence', 0.0))))
+                
+                faces.extend(frame_faces)
+                owners.extend(frame_owners)
+            except Exception as e:
+                results[index] = self._error_result(str(e))
+        
+        if faces:
+            try:
+                scores = self.classify_faces(np.stack(faces))
+                frame_faces = {}
+                for (index, region, face_confidence), face_scores in zip(owners, scores):
+                    frame_faces.setdefault(index, []).append(self._build_face(face_scores, region, face_confidence))
+                for index, face_results in frame_faces.items():
+                    results[index] = self._build_result(face_results, pipelines[index])
+            except Exception as e:
+                for index, _, _ in owners:
+                    results[index] = self._error_result(str(e))
+        
+        # Frames that yielded no face crops
+        return [result if result is not None else self._error_result('No face detected') for result in results]
+    
+    def extract_faces(self, frame: np.ndarray) -> List[Dict[str, any]]:
+        """
+        Locate faces in a frame
+        
+        Args:
+            frame: Frame as numpy array in BGR order
             
-            return {
-                'emotion': self.emotion_mapping.get(dominant_emotion, 'neutral'),
-                'confidence': confidence,
-                'all_emotions': emotion_scores,
-                'face_detected': True
-            }
+        Returns:
+            List of DeepFace face objects ('face', 'facial_area', 'confidence')
+        """
+        return _deepface().extract_faces(
+            img_path=frame,
+            detector_backend=self.detector_backend,
+            enforce_detection=False,
+            align=True
+        )
+    
+    def preprocess_face(self, face: np.ndarray, color_conversion: int = cv2.COLOR_RGB2GRAY) -> np.ndarray:
+        """
+        Turn a face crop into emotion model input, mirroring DeepFace.analyze
+        
+        Args:
+            face: Face crop (RGB floats from extract_faces by default)
+            color_conversion: cv2 conversion code from the crop's colorspace to grayscale
             
-        except Exception as e:
-            return {
-                'emotion': 'neutral',
-                'confidence': 0.0,
-                'error': str(e),
-                'face_detected': False
-            }
+        Returns:
+            Grayscale array of shape (48, 48, 1) scaled to 0-1
+        """
+        gray = cv2.cvtColor(face.astype(np.float32), color_conversion)
+        if gray.max() > 1:
+            gray = gray / 255.0
+        
+        # Letterbox to a square before the final resize, as DeepFace does
+        factor = ANALYZE_SIZE / max(gray.shape[:2])
+        height = max(1, int(gray.shape[0] * factor))
+        width = max(1, int(gray.shape[1] * factor))
+        gray = cv2.resize(gray, (width, height))
+        pad_h = ANALYZE_SIZE - height
+        pad_w = ANALYZE_SIZE - width
+        gray = np.pad(gray, ((pad_h // 2, pad_h - pad_h // 2), (pad_w // 2, pad_w - pad_w // 2)), 'constant')
+        
+        gray = cv2.resize(gray, (EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE))
+        return gray[:, :, np.newaxis]
     
-    def detect_from_webcam(self, duration: int = 5) -> Dict[str, any]:
+    def classify_faces(self, faces: np.ndarray) -> np.ndarray:
         """
-        Capture from webcam and detect emotion
+        Run the emotion classifier over a stack of preprocessed faces
         
         Args:
-            duration: Seconds to capture (analyzes last frame)
+            faces: Array of shape (N, 48, 48, 1)
             
         Returns:
-            Dict with emotion detection results
+            Array of shape (N, 7) with emotion scores in percent, ordered as EMOTION_LABELS
         """
-        cap = cv2.VideoCapture(0)
+        predictions = self.classifier.predict(faces)
+        return 100 * predictions / predictions.sum(axis=1, keepdims=True)
+    
+    def classify_crops(self, crops: List[np.ndarray]) -> np.ndarray:
+        """
+        Classify face crops cut straight from frames, skipping face detection
         
-        if not cap.isOpened():
-            return {
-                'emotion': 'neutral',
-                'confidence': 0.0,
-                'error': 'Could not access webcam',
-                'face_detected': False
-            }
+        Args:
+            crops: List of BGR face crops
         
-        frame = None
-        for _ in range(duration * 30):  # Assuming 30fps
-            ret, frame = cap.read()
-            if not ret:
-                break
+        Returns:
+            Array of shape (N, 7) with emotion scores in percent, ordered as EMOTION_LABELS
+        """
+        if self.client is not None:
+            return self.client.call('facial', 'classify_crops', crops)
+        
+        return self.classify_faces(np.stack([self.preprocess_face(crop, cv2.COLOR_BGR2GRAY) for crop in crops]))
+    
+    def detect_tracked(self, frame: np.ndarray, key) -> Dict[str, any]:
+        """
+        Detect emotion in a frame of a live session, reusing the face box
+        tracked from earlier frames when possible
         
-        cap.release()
+        While the session's face is tracked only the emotion classifier runs,
+        on the tracked box. Frames without a live track get full detection,
+        and a track is started when the face detector finds exactly one face.
         
-        if frame is not None:
+        Args:
+            frame: Frame as numpy array (from cv2)
+            key: Session key
+        
+        Returns:
+            Dict with emotion, confidence, and raw data ('pipeline' has
+            'tracked': True when detection was skipped)
+        """
+        if self.tracker is None:
             return self.detect_from_frame(frame)
+        
+        located = self.tracker.track(key, frame)
+        if located is not None:
+            region, similarity = located
+            crop = frame[region['y']:region['y'] + region['h'], region['x']:region['x'] + region['w']]
+            try:
+                scores = self.classify_crops([crop])[0]
+                return self._build_result([self._build_face(scores, region, similarity)], {
+                    'detector_backend': 'tracker',
+                    'input_size': [frame.shape[1], frame.shape[0]],
+                    'tracked': True,
+                })
+            except Exception:
+                self.tracker.drop(key)
+        
+        result = self._detect_frame(frame)
+        # A face confidence of 0 marks the detector's whole-frame fallback, not a face
+        if result.get('face_count') == 1 and result['faces'][0]['face_confidence'] > 0:
+            self.tracker.start(key, frame, result['faces'][0]['region'])
         else:
-            return {
-                'emotion': 'neutral',
-                'confidence': 0.0,
-                'error': 'Could not capture frame',
-                'face_detected': False
-            }
+            self.tracker.drop(key)
+        return result
+    
+    def stream_from_capture(self, source=0, every_n_frames: Optional[int] = None, sample_interval: float = 0.2,
+                            interval: float = 1.0, buffer_size: int = 5, duration: Optional[float] = None) -> Iterator[Dict[str, any]]:
+        """
+        Analyze a video source as a stream, yielding smoothed results per interval
+        
+        Args:
+            source: Webcam index, video file path/URL or an opened cv2.VideoCapture
+            every_n_frames: Analyze every Nth frame (overrides sample_interval)
+            sample_interval: Analyze at most one frame per this many seconds
+            interval: Seconds covered by each yielded result
+            buffer_size: Number of recent detections averaged for smoothing
+            duration: Stop after this many seconds (None reads until the source ends)
+            
+        Returns:
+            Iterator of dicts with emotion, confidence, all_emotions and the interval's start/end
+        """
+        capture = open_capture(source)
+        
+        if not capture.isOpened():
+            yield self._error_result(f'Could not open video source: {source}')
+            return
+        
+        recent = deque(maxlen=buffer_size)
+        interval_start = 0.0
+        analyzed = 0
+        timestamp = 0.0
+        
+        try:
+            for timestamp, frame in sample_frames(capture, every_n_frames, sample_interval, duration):
+                result = self.detect_from_frame(frame)
+                analyzed += 1
+                if result.get('face_detected', False):
+                    recent.append(result)
+                
+                if timestamp - interval_start >= interval:
+                    yield self._interval_result(recent, interval_start, timestamp, analyzed)
+                    interval_start = timestamp
+                    analyzed = 0
+            
+            if analyzed:
+                yield self._interval_result(recent, interval_start, timestamp, analyzed)
+        finally:
+            if capture is not source:
+                capture.release()
+    
+    def analyze_video(self, path: str, sample_rate: float = 2.0, workers: int = 4, batch_size: int = 16) -> Dict[str, any]:
+        """
+        Analyze a recorded video into a per-second emotion timeline
+        
+        The video is split into segments that are decoded in parallel; the
+        frames sampled from each segment are classified in batches.
+        
+        Args:
+            path: Video file path
+            sample_rate: Frames analyzed per second of video
+            workers: Number of segments decoded and analyzed concurrently
+            batch_size: Frames per detect_batch call
+        
+        Returns:
+            Dict with duration, fps, frames_analyzed, faces_detected and timeline
+        """
+        info = probe_video(path)
+        if info is None:
+            return self._error_result('Could not read video')
+        
+        step = max(1, round(info['fps'] / sample_rate))
+        segments = split_frame_range(info['frame_count'], step, workers)
+        
+        def analyze_segment(segment):
+            samples = []
+            timestamps = []
+            frames = []
+            for timestamp, frame in iter_segment_frames(path, segment[0], segment[1], step):
+                timestamps.append(timestamp)
+                frames.append(cap_resolution(frame, self.max_image_side))
+                if len(frames) == batch_size:
+                    samples.extend(zip(timestamps, self.detect_batch(frames)))
+                    timestamps, frames = [], []
+            if frames:
+                samples.extend(zip(timestamps, self.detect_batch(frames)))
+            return samples
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            samples = [sample for segment_samples in pool.map(analyze_segment, segments) for sample in segment_samples]
+        
+        return {
+            'duration': round(info['duration'], 3),
+            'fps': info['fps'],
+            'frames_analyzed': len(samples),
+            'faces_detected': sum(1 for _, result in samples if result.get('face_detected', False)),
+            'timeline': build_timeline(samples)
+        }
+    
+    def detect_from_webcam(self, duration: int = 5) -> Dict[str, any]:
+        """
+        Capture from webcam and detect emotion
+        
+        Args:
+            duration: Seconds to capture
+            
+        Returns:
+            Dict with emotion detection results, smoothed over the last frames analyzed
+        """
+        result = None
+        for result in self.stream_from_capture(0, interval=duration, duration=duration):
+            pass
+        
+        if result is None:
+            return self._error_result('Could not capture frame')
+        return result
+    
+    def _interval_result(self, recent: deque, start: float, end: float, analyzed: int) -> Dict[str, any]:
+        """Build a streaming result from the detections in the ring buffer"""
+        smoothed = average_emotions(recent)
+        
+        if smoothed is None:
+            result = self._error_result('No face detected in interval')
+        else:
+            result = {**smoothed, 'emotion': self.emotion_mapping.get(smoothed['emotion'], 'neutral'), 'face_detected': True}
+        
+        result.update({'start': round(start, 3), 'end': round(end, 3), 'frames_analyzed': analyzed})
+        return result
+    
+    def _detect_frame(self, frame: np.ndarray) -> Dict[str, any]:
+        """Run detection on one frame, through the micro-batcher when enabled"""
+        if self.batcher is not None:
+            return self.batcher.submit(frame)
+        return self.detect_batch([frame])[0]
+    
+    def _detect_bytes(self, data, decoded: Optional[Tuple[Optional[np.ndarray], Dict[str, any]]] = None) -> Dict[str, any]:
+        """Run detection on an encoded image, remotely when using a client"""
+        if self.client is not None:
+            try:
+                return self.client.call('facial', 'detect_from_bytes', bytes(data))
+            except InferenceError as e:
+                return self._error_result(str(e))
+        
+        frame, decode_info = decoded or self.decode(data)
+        
+        if frame is None:
+            return self._error_result('Could not decode image')
+        
+        return self.apply_decode_info(self._detect_frame(frame), decode_info)
+    
+    def apply_decode_info(self, result: Dict[str, any], decode_info: Dict[str, any]) -> Dict[str, any]:
+        """Add decode details to a result and report face regions in the coordinates of the uploaded image"""
+        if 'pipeline' in result:
+            result['pipeline'] = {**result['pipeline'], **decode_info}
+            if decode_info['decode_scale'] != 1:
+                result['faces'] = [
+                    {**face, 'region': _scale_region(face['region'], decode_info['decode_scale'])}
+                    for face in result['faces']
+                ]
+        return result
+    
+    def _cached_detection(self, key: str, frame: Optional[np.ndarray], detect, scope=None) -> Dict[str, any]:
+        """Return a cached result for this content within scope, or run detect() and cache a successful result"""
+        phash = None
+        if frame is not None and self.cache.uses_perceptual_hash:
+            phash = self.cache.perceptual_hash(frame)
+        
+        cached = self.cache.get(key, phash, scope)
+        if cached is not None:
+            return cached
+        
+        result = detect()
+        if result.get('face_detected', False):
+            self.cache.put(key, result, phash, scope)
+        return result
+    
+    def _build_face(self, scores: np.ndarray, region: Dict[str, int], face_confidence: float) -> Dict[str, any]:
+        """Build the per-face result dict from one face's emotion scores"""
+        emotion_scores = {label: float(score) for label, score in zip(EMOTION_LABELS, scores)}
+        dominant_emotion = EMOTION_LABELS[int(np.argmax(scores))]
+        
+        return {
+            'emotion': self.emotion_mapping.get(dominant_emotion, 'neutral'),
+            'confidence': emotion_scores[dominant_emotion] / 100.0,
+            'all_emotions': emotion_scores,
+            'region': region,
+            'face_confidence': face_confidence
+        }
+    
+    def _build_result(self, faces: List[Dict[str, any]], pipeline: Dict[str, any]) -> Dict[str, any]:
+        """Build the detection result dict; top-level fields describe the largest face"""
+        primary = max(faces, key=_region_area)
+        
+        return {
+            'emotion': primary['emotion'],
+            'confidence': primary['confidence'],
+            'all_emotions': primary['all_emotions'],
+            'face_detected': True,
+            'face_count': len(faces),
+            'faces': faces,
+            'pipeline': pipeline
+        }
+    
+    def _error_result(self, error: str) -> Dict[str, any]:
+        """Build the result dict returned when detection fails"""
+        return {
+            'emotion': 'neutral',
+            'confidence': 0.0,
+            'error': error,
+            'face_detected': False
+        }
+
+
+# Singleton instance (a client of the inference server when ML_INFERENCE_BACKEND='server')
+facial_detector = FacialEmotionDetector(client=get_inference_client())
+
+if get_setting('FACIAL_BATCH_WINDOW_MS', 0) > 0:
+    facial_detector.enable_batching(
+        max_batch_size=get_setting('FACIAL_BATCH_MAX_SIZE', 8),
+        max_wait_ms=get_setting('FACIAL_BATCH_WINDOW_MS', 0)
+    )
 
+if get_setting('FACIAL_TRACKING', False):
+    facial_detector.enable_tracking(
+        redetect_interval=get_setting('FACIAL_REDETECT_INTERVAL', 10),
+        min_similarity=get_setting('FACIAL_TRACK_MIN_SIMILARITY', 0.6),
+        ttl=get_setting('FACIAL_TRACK_TTL', 30.0)
+    )
 
-# Singleton instance
-facial_detector = FacialEmotionDetector()
+if get_setting('FACIAL_CACHE_SIZE', 0) > 0:
+    facial_detector.enable_cache(
+        max_size=get_setting('FACIAL_CACHE_SIZE', 0),
+        ttl=get_setting('FACIAL_CACHE_TTL', 30.0),
+        phash_distance=get_setting('FACIAL_CACHE_PHASH_DISTANCE', None)
+    )
@@ -0,0 +1,136 @@
+"""
+Face + voice emotion detection with late score fusion
+
+The facial and voice detectors run concurrently on an image and an audio
+clip captured together, so the combined latency is that of the slower one.
+Each modality's scores are normalized to a probability distribution and
+the distributions are averaged with per-modality weights over the union of
+their labels.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+from .conf import get_setting
+from .facial_emotion import facial_detector
+from .voice_emotion import voice_detector
+
+
+def fuse_scores(distributions: Iterable[Tuple[Dict[str, float], float]]) -> Dict[str, float]:
+    """
+    Weighted average of emotion score distributions
+    
+    Args:
+        distributions: (scores by emotion, weight) pairs; scores may be on
+            any scale (e.g. percentages) and are normalized first
+    
+    Returns:
+        Fused probabilities by emotion, summing to 1 (empty if no
+        distribution has positive weight and scores)
+    """
+    fused = {}
+    total_weight = 0.0
+    for scores, weight in distributions:
+        total = sum(float(score) for score in scores.values())
+        if weight <= 0 or total <= 0:
+            continue
+        for emotion, score in scores.items():
+            fused[emotion] = fused.get(emotion, 0.0) + weight * float(score) / total
+        total_weight += weight
+    
+    return {emotion: score / total_weight for emotion, score in fused.items()} if total_weight else {}
+
+
+class CombinedEmotionDetector:
+    """
+    Runs facial and voice detection in parallel and fuses their scores
+    
+    The voice detection is submitted to a small shared thread pool while
+    the facial detection runs in the calling thread; both spend their time
+    in native code (inference runtimes, FFTs) that releases the GIL.
+    """
+    
+    def __init__(self, facial, voice, face_weight: float = 0.6, voice_weight: float = 0.4, workers: int = 4):
+        """
+        Args:
+            facial: FacialEmotionDetector
+            voice: VoiceEmotionDetector
+            face_weight: Weight of the facial scores in the fused distribution
+            voice_weight: Weight of the voice scores in the fused distribution
+            workers: Threads available for concurrent voice detections
+        """
+        self.facial = facial
+        self.voice = voice
+        self.face_weight = face_weight
+        self.voice_weight = voice_weight
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='combined-voice')
+    
+    def detect_from_bytes(self, image_data, audio_data, track_key: Optional[str] = None, scope=None) -> Dict[str, any]:
+        """
+        Detect emotion from an encoded image and audio clip held in memory
+        
+        Args:
+            image_data: Encoded image bytes (JPEG/PNG/BMP)
+            audio_data: Encoded audio bytes (WAV/FLAC/OGG/MP3)
+            track_key: (optional) Session key for face tracking between frames
+            scope: (optional) Facial result cache scope, such as the requesting user
+        
+        Returns:
+            Dict with the fused emotion, confidence and all_emotions
+            (probabilities), the modalities that contributed, and the
+            individual face and voice results
+        """
+        voice_future = self._pool.submit(self.voice.detect_from_bytes, bytes(audio_data))
+        try:
+            face = self.facial.detect_from_bytes(image_data, track_key=track_key, scope=scope)
+        finally:
+            voice = voice_future.result()
+        
+        distributions = []
+        modalities = []
+        # Modalities weighted 0 are left out, not reported as contributing
+        if face.get('face_detected', False) and self.face_weight > 0:
+            face_scores = {}
+            for label, score in face.get('all_emotions', {}).items():
+                emotion = self.facial.emotion_mapping.get(label, label)
+                face_scores[emotion] = face_scores.get(emotion, 0.0) + float(score)
+            distributions.append((face_scores, self.face_weight))
+            modalities.append('face')
+        # Without a trained voice model there are no voice scores to fuse
+        if voice.get('audio_processed', False) and voice.get('all_emotions') and self.voice_weight > 0:
+            distributions.append((voice['all_emotions'], self.voice_weight))
+            modalities.append('voice')
+        
+        fused = fuse_scores(distributions) if distributions else {}
+        if not fused:
+            if self.face_weight <= 0 and self.voice_weight <= 0:
+                error = 'Face and voice weights are both zero'
+            else:
+                error = face.get('error') or voice.get('error') or 'No face detected and no voice scores available'
+            return {
+                'emotion': 'neutral',
+                'confidence': 0.0,
+                'error': error,
+                'modalities': [],
+                'face': face,
+                'voice': voice
+            }
+        
+        emotion = max(fused, key=fused.get)
+        return {
+            'emotion': emotion,
+            'confidence': fused[emotion],
+            'all_emotions': fused,
+            'modalities': modalities,
+            'face': face,
+            'voice': voice
+        }
+
+
+# Singleton instance over the facial and voice detector singletons
+combined_detector = CombinedEmotionDetector(
+    facial_detector,
+    voice_detector,
+    face_weight=get_setting('COMBINED_FACE_WEIGHT', 0.6),
+    voice_weight=get_setting('COMBINED_VOICE_WEIGHT', 0.4),
+    workers=get_setting('COMBINED_WORKERS', 4)
+)
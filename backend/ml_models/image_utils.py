@@ -0,0 +1,143 @@
+"""
+Image decoding helpers for in-memory uploads
+"""
+import struct
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+
+# Magic byte signatures of the image formats accepted for detection
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'BM', 'bmp'),
+]
+
+# cv2 decode flags for libjpeg's reduced-size (DCT-scaled) decoding
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# JPEG start-of-frame markers, which carry the image dimensions
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def sniff_image_type(data) -> Optional[str]:
+    """
+    Identify an image format from its leading magic bytes
+    
+    Args:
+        data: Raw image bytes (bytes or memoryview)
+    
+    Returns:
+        Format name ('jpeg', 'png', 'bmp') or None if unsupported
+    """
+    header = bytes(data[:8])
+    for signature, image_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return image_type
+    return None
+
+
+def image_dimensions(data) -> Optional[Tuple[int, int]]:
+    """
+    Read an image's width and height from its header without decoding it
+    
+    Args:
+        data: Raw image bytes (bytes or memoryview)
+        
+    Returns:
+        (width, height), or None if the header could not be parsed
+    """
+    image_type = sniff_image_type(data)
+    
+    try:
+        if image_type == 'png':
+            return struct.unpack('>II', bytes(data[16:24]))
+        
+        if image_type == 'bmp':
+            width, height = struct.unpack('<ii', bytes(data[18:26]))
+            return width, abs(height)
+        
+        if image_type == 'jpeg':
+            # Walk the marker segments until a start-of-frame segment
+            i = 2
+            while i + 9 < len(data):
+                if data[i] != 0xFF:
+                    return None
+                marker = data[i + 1]
+                if marker == 0xFF:
+                    i += 1
+                    continue
+                if marker in JPEG_SOF_MARKERS:
+                    height = (data[i + 5] << 8) | data[i + 6]
+                    width = (data[i + 7] << 8) | data[i + 8]
+                    return width, height
+                i += 2 + ((data[i + 2] << 8) | data[i + 3])
+    except (struct.error, IndexError):
+        pass
+    
+    return None
+
+
+def reduced_decode_scale(size: Optional[Tuple[int, int]], max_side: Optional[int]) -> int:
+    """
+    Pick the largest JPEG decode reduction (1, 2, 4 or 8) that still leaves
+    the longest side at least max_side pixels
+    
+    Args:
+        size: (width, height) from image_dimensions()
+        max_side: Target longest side in pixels
+        
+    Returns:
+        Reduction factor
+    """
+    if not size or not max_side:
+        return 1
+    
+    longest = max(size)
+    for scale in (8, 4, 2):
+        if longest // scale >= max_side:
+            return scale
+    return 1
+
+
+def decode_image(data, scale: int = 1) -> Optional[np.ndarray]:
+    """
+    Decode an encoded image buffer straight into a BGR frame
+    
+    Args:
+        data: Raw image bytes (bytes or memoryview)
+        scale: Reduced-size decode factor (1, 2, 4 or 8)
+        
+    Returns:
+        Image as numpy array (as returned by cv2), or None if decoding failed
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if buffer.size == 0:
+        return None
+    return cv2.imdecode(buffer, REDUCED_DECODE_FLAGS.get(scale, cv2.IMREAD_COLOR))
+
+
+def cap_resolution(frame: np.ndarray, max_side: Optional[int]) -> np.ndarray:
+    """
+    Downscale a frame so its longest side is at most max_side pixels
+    
+    Args:
+        frame: Image as numpy array
+        max_side: Longest side allowed, or None for no limit
+        
+    Returns:
+        The original frame if small enough, else a resized copy
+    """
+    height, width = frame.shape[:2]
+    if not max_side or max(height, width) <= max_side:
+        return frame
+    
+    factor = max_side / max(height, width)
+    size = (max(1, round(width * factor)), max(1, round(height * factor)))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
@@ -0,0 +1,151 @@
+"""
+Inference server that owns the emotion models in a fixed pool of processes
+
+Web workers talk to it through InferenceClient over a Unix socket, so the
+number of model replicas per node is the pool size rather than the number
+of web workers.
+"""
+import os
+import threading
+from multiprocessing import Pool
+from multiprocessing.connection import Client, Listener
+from typing import Dict, Optional
+
+from .conf import get_setting
+
+
+# Detector methods that may be called through the server
+REMOTE_METHODS = {
+    'facial': {'classify_crops', 'detect_batch', 'detect_from_bytes', 'warmup'},
+    'voice': {'detect_batch_from_bytes', 'detect_from_audio', 'detect_from_bytes', 'extract_features', 'warmup'},
+}
+
+# Detectors owned by the current pool process
+_worker_detectors = {}
+
+
+class InferenceError(Exception):
+    """Raised by InferenceClient when the server cannot serve a call"""
+
+
+def _init_worker():
+    """Pool initializer: build local detectors and warm them up once per process"""
+    from .facial_emotion import FacialEmotionDetector
+    from .voice_emotion import VoiceEmotionDetector
+    
+    _worker_detectors['facial'] = FacialEmotionDetector(client=None)
+    _worker_detectors['voice'] = VoiceEmotionDetector(client=None)
+    
+    for detector in _worker_detectors.values():
+        detector.warmup()
+
+
+def _run(target: str, method: str, args: tuple, kwargs: dict):
+    """Pool task: call a method on this process's detector"""
+    return getattr(_worker_detectors[target], method)(*args, **kwargs)
+
+
+class InferenceServer:
+    """Serves detector calls from a fixed process pool over a Unix socket"""
+    
+    def __init__(self, address: str, authkey: bytes, workers: int = 2):
+        self.address = address
+        self.authkey = authkey
+        self.workers = workers
+        self.pool = None
+    
+    def serve_forever(self):
+        """Start the process pool and accept client connections until interrupted"""
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        
+        self.pool = Pool(self.workers, initializer=_init_worker)
+        
+        try:
+            with Listener(self.address, family='AF_UNIX', authkey=self.authkey) as listener:
+                while True:
+                    try:
+                        conn = listener.accept()
+                    except Exception:
+                        continue  # Failed handshake from a misconfigured client
+                    threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self.pool.terminate()
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+    
+    def _handle(self, conn):
+        """Answer requests on one client connection; the pool bounds concurrency"""
+        with conn:
+            while True:
+                try:
+                    target, method, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    break
+                
+                if method not in REMOTE_METHODS.get(target, ()):
+                    conn.send(('error', f'Unknown method: {target}.{method}'))
+                    continue
+                
+                try:
+                    result = self.pool.apply(_run, (target, method, args, kwargs))
+                    conn.send(('ok', result))
+                except Exception as e:
+                    conn.send(('error', str(e)))
+
+
+class InferenceClient:
+    """Submits detector calls to an InferenceServer, one connection per thread"""
+    
+    def __init__(self, address: str, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        self._local = threading.local()
+    
+    def call(self, target: str, method: str, *args, **kwargs):
+        """
+        Run a detector method in the inference server
+        
+        Args:
+            target: Detector name ('facial' or 'voice')
+            method: Detector method name
+            
+        Returns:
+            The method's return value
+        """
+        try:
+            conn = self._connection()
+            conn.send((target, method, args, kwargs))
+            status, payload = conn.recv()
+        except (EOFError, OSError) as e:
+            self._local.conn = None
+            raise InferenceError(f'Inference server unavailable: {e}')
+        
+        if status == 'error':
+            raise InferenceError(payload)
+        return payload
+    
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = Client(self.address, family='AF_UNIX', authkey=self.authkey)
+            self._local.conn = conn
+        return conn
+
+
+def get_server_settings() -> Dict[str, any]:
+    """Read the inference server address, key and pool size from settings"""
+    return {
+        'address': get_setting('ML_INFERENCE_SOCKET', '/tmp/emotionsense-inference.sock'),
+        'authkey': get_setting('ML_INFERENCE_AUTHKEY', 'emotionsense').encode(),
+        'workers': get_setting('ML_INFERENCE_WORKERS', 2),
+    }
+
+
+def get_inference_client() -> Optional[InferenceClient]:
+    """Return a client when settings select the 'server' backend, else None"""
+    if get_setting('ML_INFERENCE_BACKEND', 'local') != 'server':
+        return None
+    
+    server_settings = get_server_settings()
+    return InferenceClient(server_settings['address'], server_settings['authkey'])
@@ -0,0 +1,184 @@
+"""
+Per-session face tracking between full detections
+
+Consecutive frames of a live session show the same face in nearly the same
+place, so after a face is detected its crop is kept as a template and later
+frames only search a small window around the last position. Full detection
+runs again when the match is lost or every redetect_interval frames.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+# Templates are matched at this width at most, which keeps matching cheap for large faces
+TEMPLATE_MAX_WIDTH = 64
+
+
+class FaceTrack:
+    """Tracker state of one session: the last face box and its template"""
+    
+    __slots__ = ('region', 'template', 'scale', 'frames_since_detection', 'updated')
+    
+    def __init__(self, region: Dict[str, int], template: np.ndarray, scale: float):
+        self.region = region
+        self.template = template
+        self.scale = scale
+        self.frames_since_detection = 0
+        self.updated = time.monotonic()
+
+
+def _gray(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+
+def _clip_region(region: Dict[str, int], shape) -> Optional[Dict[str, int]]:
+    """Clip a region to the frame, or None if nothing of it is left"""
+    height, width = shape[:2]
+    x = max(0, min(region['x'], width))
+    y = max(0, min(region['y'], height))
+    w = min(region['x'] + region['w'], width) - x
+    h = min(region['y'] + region['h'], height) - y
+    if w <= 1 or h <= 1:
+        return None
+    return {'x': x, 'y': y, 'w': w, 'h': h}
+
+
+class FaceTracker:
+    """
+    Bounded registry of face tracks keyed by session
+    
+    Tracks are matched with normalized cross-correlation against the crop
+    taken at the last full detection. Least recently used tracks are evicted
+    beyond max_tracks, and tracks idle for longer than ttl seconds expire.
+    """
+    
+    def __init__(self, redetect_interval: int = 10, min_similarity: float = 0.6, search_margin: float = 0.5,
+                 max_tracks: int = 1024, ttl: float = 30.0):
+        self.redetect_interval = redetect_interval
+        self.min_similarity = min_similarity
+        self.search_margin = search_margin
+        self.max_tracks = max_tracks
+        self.ttl = ttl
+        self._tracks = OrderedDict()
+        self._lock = threading.Lock()
+        self.tracked = 0
+        self.lost = 0
+        self.detections = 0
+    
+    def start(self, key, frame: np.ndarray, region: Dict[str, int]):
+        """
+        Start (or restart) tracking a face found by full detection
+        
+        Args:
+            key: Session key
+            frame: Frame the face was detected in (BGR)
+            region: Face box (x, y, w, h) in frame coordinates
+        """
+        region = _clip_region(region, frame.shape)
+        if region is None:
+            self.drop(key)
+            return
+        
+        scale = min(1.0, TEMPLATE_MAX_WIDTH / region['w'])
+        crop = _gray(frame[region['y']:region['y'] + region['h'], region['x']:region['x'] + region['w']])
+        template = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else crop.copy()
+        
+        with self._lock:
+            self.detections += 1
+            self._tracks[key] = FaceTrack(region, template, scale)
+            self._tracks.move_to_end(key)
+            while len(self._tracks) > self.max_tracks:
+                self._tracks.popitem(last=False)
+    
+    def track(self, key, frame: np.ndarray) -> Optional[Tuple[Dict[str, int], float]]:
+        """
+        Locate the session's face in a new frame
+        
+        Args:
+            key: Session key
+            frame: New frame (BGR)
+        
+        Returns:
+            (face box, match similarity), or None when the session has no live
+            track, the match was lost or a full detection is due
+        """
+        with self._lock:
+            track = self._tracks.get(key)
+            if track is None:
+                return None
+            if (track.frames_since_detection >= self.redetect_interval
+                    or time.monotonic() - track.updated > self.ttl):
+                del self._tracks[key]
+                return None
+        
+        located = self._match(track, frame)
+        
+        with self._lock:
+            if located is None:
+                self._tracks.pop(key, None)
+                self.lost += 1
+                return None
+            
+            track.region = located[0]
+            track.frames_since_detection += 1
+            track.updated = time.monotonic()
+            if key in self._tracks:
+                self._tracks.move_to_end(key)
+            self.tracked += 1
+        return located
+    
+    def drop(self, key):
+        """Forget a session's track"""
+        with self._lock:
+            self._tracks.pop(key, None)
+    
+    def stats(self) -> Dict[str, any]:
+        with self._lock:
+            return {
+                'tracks': len(self._tracks),
+                'tracked_frames': self.tracked,
+                'detections': self.detections,
+                'lost': self.lost,
+            }
+    
+    def _match(self, track: FaceTrack, frame: np.ndarray) -> Optional[Tuple[Dict[str, int], float]]:
+        """Search a window around the last box for the template"""
+        region = track.region
+        margin_x = int(region['w'] * self.search_margin)
+        margin_y = int(region['h'] * self.search_margin)
+        window = _clip_region({
+            'x': region['x'] - margin_x,
+            'y': region['y'] - margin_y,
+            'w': region['w'] + 2 * margin_x,
+            'h': region['h'] + 2 * margin_y,
+        }, frame.shape)
+        if window is None:
+            return None
+        
+        search = _gray(frame[window['y']:window['y'] + window['h'], window['x']:window['x'] + window['w']])
+        if track.scale < 1:
+            search = cv2.resize(search, None, fx=track.scale, fy=track.scale, interpolation=cv2.INTER_AREA)
+        if search.shape[0] < track.template.shape[0] or search.shape[1] < track.template.shape[1]:
+            return None
+        
+        scores = cv2.matchTemplate(search, track.template, cv2.TM_CCOEFF_NORMED)
+        _, similarity, _, (match_x, match_y) = cv2.minMaxLoc(scores)
+        if not np.isfinite(similarity) or similarity < self.min_similarity:
+            return None
+        
+        located = _clip_region({
+            'x': window['x'] + int(round(match_x / track.scale)),
+            'y': window['y'] + int(round(match_y / track.scale)),
+            'w': region['w'],
+            'h': region['h'],
+        }, frame.shape)
+        if located is None:
+            return None
+        return located, float(similarity)
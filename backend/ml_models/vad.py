@@ -0,0 +1,165 @@
+"""
+Energy-based voice activity detection for streamed audio
+
+Audio is fed block by block; short frames are classed as voiced when their
+energy rises a margin above a running noise-floor estimate, seeded from the
+quieter frames of the first block. Voiced frames
+are grouped into segments (bridging pauses shorter than min_silence), and
+segments are cut into analysis windows of at most window seconds, sliding
+by hop seconds through long segments. Only the samples of the currently open
+segment are buffered, so memory stays bounded however long the recording is.
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+
+# Frames quieter than this are never voiced, whatever the noise floor (dB relative to full scale)
+MIN_VOICE_DB = -50.0
+# Percentile of the first block's frame energies taken as the initial noise floor
+NOISE_PERCENTILE = 10
+
+
+class VoiceActivitySegmenter:
+    """
+    Incremental voiced-window segmentation of one audio stream
+    
+    Call process() with consecutive blocks and flush() at the end of the
+    stream; both return the windows completed so far as (start, end,
+    samples) tuples, with start and end in seconds from the stream start.
+    """
+    
+    def __init__(self, sr: int, window: float = 3.0, hop: float = 1.5, margin_db: float = 10.0,
+                 frame_duration: float = 0.03, min_speech: float = 0.3, min_silence: float = 0.3,
+                 noise_rise_time: float = 10.0):
+        """
+        Args:
+            sr: Sample rate of the stream
+            window: Longest analysis window in seconds
+            hop: Step between windows through a long segment, in seconds
+            margin_db: Energy above the noise floor for a frame to count as voiced
+            frame_duration: VAD frame length in seconds
+            min_speech: Shortest voiced stretch analyzed, in seconds
+            min_silence: Pause length that ends a segment, in seconds
+            noise_rise_time: Time constant (seconds) of the noise floor rising to louder backgrounds
+        """
+        self.sr = sr
+        self.frame_length = max(1, int(round(frame_duration * sr)))
+        self.window_frames = max(1, int(round(window / frame_duration)))
+        self.hop_frames = max(1, min(self.window_frames, int(round(hop / frame_duration))))
+        self.min_speech_frames = max(1, int(round(min_speech / frame_duration)))
+        self.min_silence_frames = max(1, int(round(min_silence / frame_duration)))
+        self.margin_db = margin_db
+        self.noise_rise = frame_duration / noise_rise_time
+        
+        self.noise_db = None
+        self.voiced_frames = 0
+        self.total_frames = 0
+        self._remainder = np.zeros(0, dtype=np.float32)
+        # Open segment: buffered frames from the current window start, and bookkeeping in frames
+        self._frames = []
+        self._window_start = None
+        self._emitted_until = None
+        self._silent_run = 0
+    
+    def process(self, block: np.ndarray) -> List[Tuple[float, float, np.ndarray]]:
+        """Consume the next block of mono samples; returns the windows it completes"""
+        samples = np.concatenate([self._remainder, np.asarray(block, dtype=np.float32)])
+        count = len(samples) // self.frame_length
+        self._remainder = samples[count * self.frame_length:]
+        if not count:
+            return []
+        
+        frames = samples[:count * self.frame_length].reshape(count, self.frame_length)
+        energy_db = 10.0 * np.log10(np.maximum(np.mean(frames ** 2, axis=1), 1e-12))
+        if self.noise_db is None:
+            self.noise_db = self._initial_noise_db(energy_db)
+        
+        windows = []
+        for frame, db in zip(frames, energy_db):
+            windows.extend(self._step(frame, db))
+        return windows
+    
+    def flush(self) -> List[Tuple[float, float, np.ndarray]]:
+        """End the stream, closing any open segment"""
+        return self._close() if self._window_start is not None else []
+    
+    @property
+    def duration(self) -> float:
+        """Seconds of audio consumed so far"""
+        return (self.total_frames * self.frame_length + len(self._remainder)) / self.sr
+    
+    @property
+    def voiced_duration(self) -> float:
+        """Seconds of audio classed as voiced so far"""
+        return self.voiced_frames * self.frame_length / self.sr
+    
+    def _step(self, frame: np.ndarray, db: float) -> List[Tuple[float, float, np.ndarray]]:
+        index = self.total_frames
+        self.total_frames += 1
+        
+        voiced = db > max(MIN_VOICE_DB, self.noise_db + self.margin_db)
+        # The floor drops to quieter frames at once and rises slowly, so speech barely lifts it
+        if db < self.noise_db:
+            self.noise_db = db
+        else:
+            self.noise_db += (db - self.noise_db) * self.noise_rise
+        
+        if voiced:
+            self.voiced_frames += 1
+            if self._window_start is None:
+                self._window_start = index
+                self._emitted_until = index
+            self._silent_run = 0
+        elif self._window_start is None:
+            return []
+        else:
+            self._silent_run += 1
+        
+        self._frames.append(frame)
+        if self._silent_run >= self.min_silence_frames:
+            return self._close()
+        
+        if len(self._frames) == self.window_frames:
+            window = self._window(self._window_start + self.window_frames)
+            self._emitted_until = self._window_start + self.window_frames
+            del self._frames[:self.hop_frames]
+            self._window_start += self.hop_frames
+            return [window]
+        return []
+    
+    def _initial_noise_db(self, energy_db: np.ndarray) -> float:
+        """
+        Noise floor estimate from the first block's frame energies
+        
+        The quieter frames (pauses between words, background before speech)
+        give the floor. A block without such frames, e.g. a clip trimmed to
+        continuous speech, starts from MIN_VOICE_DB instead, so that audio
+        from the very first frame can count as voiced.
+        """
+        low, high = np.percentile(energy_db, [NOISE_PERCENTILE, 100 - NOISE_PERCENTILE])
+        if high - low >= self.margin_db:
+            return float(low)
+        return float(min(low, MIN_VOICE_DB))
+    
+    def _close(self) -> List[Tuple[float, float, np.ndarray]]:
+        """Emit what is left of the open segment, without its trailing silence"""
+        if self._silent_run:
+            del self._frames[-self._silent_run:]
+        end = self._window_start + len(self._frames)
+        
+        windows = []
+        if end - self._emitted_until >= self.min_speech_frames:
+            windows.append(self._window(end))
+        
+        self._frames = []
+        self._window_start = None
+        self._emitted_until = None
+        self._silent_run = 0
+        return windows
+    
+    def _window(self, end: int) -> Tuple[float, float, np.ndarray]:
+        """The buffered frames from the window start up to frame index end"""
+        samples = np.concatenate(self._frames[:end - self._window_start])
+        seconds = self.frame_length / self.sr
+        return round(self._window_start * seconds, 3), round(end * seconds, 3), samples
@@ -0,0 +1,198 @@
+"""
+Frame sampling and smoothing helpers for video sources
+"""
+import math
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def open_capture(source) -> cv2.VideoCapture:
+    """
+    Open a capture source
+    
+    Args:
+        source: Device index, file path/URL, or an already opened cv2.VideoCapture
+        
+    Returns:
+        cv2.VideoCapture (check isOpened())
+    """
+    if isinstance(source, cv2.VideoCapture):
+        return source
+    return cv2.VideoCapture(source)
+
+
+def sample_frames(capture: cv2.VideoCapture, every_n_frames: Optional[int] = None,
+                  sample_interval: Optional[float] = None, duration: Optional[float] = None) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Yield sampled frames from a capture
+    
+    Frames that are not sampled are only grabbed, not decoded. Timestamps
+    come from the media clock for files and from the wall clock for live
+    devices.
+    
+    Args:
+        capture: Opened cv2.VideoCapture
+        every_n_frames: Sample every Nth frame
+        sample_interval: Sample at most one frame per this many seconds (used when every_n_frames is not set)
+        duration: Stop after this many seconds
+        
+    Returns:
+        Iterator of (timestamp in seconds, frame)
+    """
+    media_clock = capture.get(cv2.CAP_PROP_FRAME_COUNT) > 0
+    started = time.monotonic()
+    next_sample = 0.0
+    frame_index = 0
+    
+    while True:
+        now = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0 if media_clock else time.monotonic() - started
+        if duration is not None and now >= duration:
+            break
+        
+        if every_n_frames:
+            sample = frame_index % every_n_frames == 0
+        else:
+            sample = now >= next_sample
+        
+        if sample:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            next_sample = now + (sample_interval or 0.0)
+            yield now, frame
+        elif not capture.grab():
+            break
+        
+        frame_index += 1
+
+
+def average_emotions(results: Iterable[Dict[str, any]]) -> Optional[Dict[str, any]]:
+    """
+    Average the emotion scores of several successful detections
+    
+    Args:
+        results: Result dicts with 'all_emotions'
+        
+    Returns:
+        Dict with the dominant emotion, its confidence and the averaged scores,
+        or None if there were no results
+    """
+    results = [result for result in results if result.get('face_detected', False)]
+    if not results:
+        return None
+    
+    labels = list(results[0]['all_emotions'])
+    scores = np.mean([[result['all_emotions'][label] for label in labels] for result in results], axis=0)
+    dominant = labels[int(np.argmax(scores))]
+    
+    return {
+        'emotion': dominant,
+        'confidence': float(scores.max()) / 100.0,
+        'all_emotions': {label: float(score) for label, score in zip(labels, scores)},
+    }
+
+
+def probe_video(path: str) -> Optional[Dict[str, float]]:
+    """
+    Read a video file's frame rate, frame count and duration
+    
+    Args:
+        path: Video file path
+    
+    Returns:
+        Dict with fps, frame_count and duration, or None if it cannot be opened
+    """
+    capture = cv2.VideoCapture(path)
+    try:
+        if not capture.isOpened():
+            return None
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        if fps <= 0 or frame_count <= 0:
+            return None
+        return {'fps': fps, 'frame_count': frame_count, 'duration': frame_count / fps}
+    finally:
+        capture.release()
+
+
+def split_frame_range(frame_count: int, step: int, parts: int) -> List[Tuple[int, int]]:
+    """
+    Split [0, frame_count) into contiguous segments whose starts fall on
+    multiples of step, so each segment can be sampled independently
+    
+    Args:
+        frame_count: Total number of frames
+        step: Sampling step in frames
+        parts: Desired number of segments
+    
+    Returns:
+        List of (start, end) frame ranges
+    """
+    samples = math.ceil(frame_count / step)
+    per_part = max(1, math.ceil(samples / max(1, parts)))
+    
+    segments = []
+    for first_sample in range(0, samples, per_part):
+        start = first_sample * step
+        end = min(frame_count, (first_sample + per_part) * step)
+        segments.append((start, end))
+    return segments
+
+
+def iter_segment_frames(path: str, start: int, end: int, step: int) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Yield every step-th frame of a video segment with its timestamp
+    
+    Each call opens its own capture, so segments can be decoded in parallel.
+    
+    Args:
+        path: Video file path
+        start: First frame index (a multiple of step)
+        end: Frame index to stop before
+        step: Sampling step in frames
+    
+    Returns:
+        Iterator of (timestamp in seconds, frame)
+    """
+    capture = cv2.VideoCapture(path)
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        if start:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+        
+        for index in range(start, end):
+            if (index - start) % step == 0:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                yield index / fps, frame
+            elif not capture.grab():
+                break
+    finally:
+        capture.release()
+
+
+def build_timeline(samples: Iterable[Tuple[float, Dict[str, any]]]) -> List[Dict[str, any]]:
+    """
+    Aggregate timestamped detections into one averaged entry per second
+    
+    Args:
+        samples: (timestamp in seconds, result dict) pairs
+    
+    Returns:
+        List of dicts with second, emotion, confidence, all_emotions and samples,
+        for the seconds in which a face was detected
+    """
+    seconds = {}
+    for timestamp, result in samples:
+        seconds.setdefault(int(timestamp), []).append(result)
+    
+    timeline = []
+    for second in sorted(seconds):
+        averaged = average_emotions(seconds[second])
+        if averaged is not None:
+            timeline.append({'second': second, **averaged, 'samples': len(seconds[second])})
+    return timeline
@@ -0,0 +1,192 @@
+"""
+Lightweight voice emotion classifier
+
+A small multilayer perceptron (one ReLU hidden layer, softmax output) over
+standardized acoustic feature vectors, implemented in NumPy so inference
+needs no extra dependencies and costs well under a millisecond per batch.
+With hidden=0 it reduces to multinomial logistic regression.
+
+Train it with `python manage.py train_voice_model`; the weights,
+standardization and labels are stored together in one .npz file.
+"""
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+class VoiceClassifier:
+    """Standardize, one hidden ReLU layer (optional), softmax"""
+    
+    def __init__(self, labels: Sequence[str], mean: np.ndarray, scale: np.ndarray, weights: List[np.ndarray]):
+        """
+        Args:
+            labels: Emotion label of each output class
+            mean: Per-feature mean used for standardization
+            scale: Per-feature standard deviation used for standardization
+            weights: [W1, b1, W2, b2] for the MLP, or [W, b] for a linear model
+        """
+        self.labels = list(labels)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+    
+    @property
+    def input_dim(self) -> int:
+        return self.mean.shape[0]
+    
+    @property
+    def name(self) -> str:
+        return 'mlp' if len(self.weights) > 2 else 'linear'
+    
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities for a batch of feature vectors
+        
+        Args:
+            features: Array of shape (N, input_dim)
+        
+        Returns:
+            Array of shape (N, len(labels))
+        """
+        activations = (np.asarray(features, dtype=np.float32) - self.mean) / self.scale
+        for layer in range(0, len(self.weights) - 2, 2):
+            activations = np.maximum(activations @ self.weights[layer] + self.weights[layer + 1], 0)
+        return _softmax(activations @ self.weights[-2] + self.weights[-1])
+    
+    def save(self, path: str):
+        """Write the classifier to a .npz file"""
+        arrays = {f'weight_{i}': w for i, w in enumerate(self.weights)}
+        np.savez(path, labels=np.array(self.labels), mean=self.mean, scale=self.scale, **arrays)
+    
+    @classmethod
+    def load(cls, path: str, input_dim: Optional[int] = None) -> 'VoiceClassifier':
+        """
+        Read a classifier written by save()
+        
+        Args:
+            path: .npz file
+            input_dim: (optional) Feature vector length the classifier must accept
+        
+        Returns:
+            The classifier
+        
+        Raises:
+            ValueError if the file is not a consistent classifier or expects
+            another input_dim
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                count = sum(1 for key in data.files if key.startswith('weight_'))
+                weights = [data[f'weight_{i}'] for i in range(count)]
+                classifier = cls([str(label) for label in data['labels']], data['mean'], data['scale'], weights)
+        except KeyError as e:
+            raise ValueError(f'{path} is not a voice classifier (missing {e})')
+        
+        shapes = [w.shape for w in classifier.weights]
+        sizes = [classifier.input_dim] + [shape[-1] for shape in shapes[::2]]
+        consistent = (
+            count >= 2 and count % 2 == 0
+            and classifier.scale.shape == classifier.mean.shape
+            and all(shape == (fan_in, fan_out) for shape, fan_in, fan_out in zip(shapes[::2], sizes[:-1], sizes[1:]))
+            and all(shape == (fan_out,) for shape, fan_out in zip(shapes[1::2], sizes[1:]))
+            and sizes[-1] == len(classifier.labels)
+        )
+        if not consistent:
+            raise ValueError(f'{path} has inconsistent weight shapes')
+        if input_dim is not None and classifier.input_dim != input_dim:
+            raise ValueError(
+                f'{path} expects {classifier.input_dim} features, but feature extraction produces {input_dim}; '
+                'retrain it with `python manage.py train_voice_model`'
+            )
+        return classifier
+    
+    @classmethod
+    def train(cls, features: np.ndarray, labels: Sequence[str], hidden: int = 64, epochs: int = 200,
+              batch_size: int = 64, learning_rate: float = 1e-3, weight_decay: float = 1e-4,
+              seed: Optional[int] = 0) -> 'VoiceClassifier':
+        """
+        Fit a classifier with mini-batch Adam on softmax cross-entropy
+        
+        Classes are weighted by inverse frequency so imbalanced datasets
+        do not collapse onto the majority emotion.
+        
+        Args:
+            features: Array of shape (N, input_dim)
+            labels: Emotion label of each row
+            hidden: Hidden layer width (0 for a linear model)
+            epochs: Passes over the data
+            batch_size: Rows per gradient step
+            learning_rate: Adam step size
+            weight_decay: L2 penalty on the weight matrices
+            seed: Random seed for initialization and shuffling
+        
+        Returns:
+            The trained classifier
+        """
+        rng = np.random.default_rng(seed)
+        features = np.asarray(features, dtype=np.float32)
+        classes, targets = np.unique(np.asarray(labels), return_inverse=True)
+        
+        mean = features.mean(axis=0)
+        scale = features.std(axis=0)
+        scale[scale < 1e-6] = 1.0
+        inputs = (features - mean) / scale
+        
+        sizes = [inputs.shape[1]] + ([hidden] if hidden else []) + [len(classes)]
+        weights = []
+        for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+            weights.append((rng.standard_normal((fan_in, fan_out)) * np.sqrt(2.0 / fan_in)).astype(np.float32))
+            weights.append(np.zeros(fan_out, dtype=np.float32))
+        
+        counts = np.bincount(targets, minlength=len(classes))
+        class_weights = (len(targets) / (len(classes) * counts)).astype(np.float32)
+        
+        # Adam state
+        moments = [np.zeros_like(w) for w in weights]
+        velocities = [np.zeros_like(w) for w in weights]
+        beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+        step = 0
+        
+        for _ in range(epochs):
+            order = rng.permutation(len(inputs))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                gradients = _gradients(weights, inputs[batch], targets[batch], class_weights[targets[batch]])
+                step += 1
+                for i, gradient in enumerate(gradients):
+                    if i % 2 == 0:
+                        gradient = gradient + weight_decay * weights[i]
+                    moments[i] = beta1 * moments[i] + (1 - beta1) * gradient
+                    velocities[i] = beta2 * velocities[i] + (1 - beta2) * gradient ** 2
+                    corrected_moment = moments[i] / (1 - beta1 ** step)
+                    corrected_velocity = velocities[i] / (1 - beta2 ** step)
+                    weights[i] -= learning_rate * corrected_moment / (np.sqrt(corrected_velocity) + epsilon)
+        
+        return cls([str(label) for label in classes], mean, scale, weights)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def _gradients(weights: List[np.ndarray], inputs: np.ndarray, targets: np.ndarray,
+               sample_weights: np.ndarray) -> List[np.ndarray]:
+    """Gradients of the weighted mean cross-entropy with respect to each weight array"""
+    activations = [inputs]
+    for layer in range(0, len(weights) - 2, 2):
+        activations.append(np.maximum(activations[-1] @ weights[layer] + weights[layer + 1], 0))
+    probabilities = _softmax(activations[-1] @ weights[-2] + weights[-1])
+    
+    # d(loss)/d(logits) for softmax cross-entropy
+    delta = probabilities
+    delta[np.arange(len(targets)), targets] -= 1
+    delta *= (sample_weights / sample_weights.sum())[:, np.newaxis]
+    
+    gradients = [None] * len(weights)
+    for layer in range(len(weights) - 2, -1, -2):
+        gradients[layer] = activations[layer // 2].T @ delta
+        gradients[layer + 1] = delta.sum(axis=0)
+        if layer:
+            delta = (delta @ weights[layer].T) * (activations[layer // 2] > 0)
+    return gradients
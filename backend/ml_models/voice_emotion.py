@@ -1,17 +1,102 @@
 """
 Voice Emotion Detection Module using Librosa
 """
-import librosa
+import os
+import sys
+import threading
 import numpy as np
-from typing import Dict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .audio_features import FEATURE_DIM, feature_extractor
+from .audio_utils import decode_audio, iter_audio_blocks, load_audio
+from .conf import get_setting
+from .inference_server import InferenceError, get_inference_client
+from .vad import VoiceActivitySegmenter
+from .voice_classifier import VoiceClassifier
+
+
+def _librosa():
+    """Import librosa on first use; its numba-backed import is slow"""
+    import librosa
+    return librosa
 
 
 class VoiceEmotionDetector:
-    """Detects emotions from voice/audio using acoustic features"""
+    """
+    Detects emotions from voice/audio using acoustic features
+    
+    Features are classified by the VoiceClassifier stored at model_path
+    (VOICE_MODEL_PATH), loaded once on first use. Until a model has been
+    trained (`python manage.py train_voice_model`), detection returns a
+    neutral placeholder.
     
-    def __init__(self):
-        # Placeholder - will integrate SpeechBrain or custom model later
+    With a client, inference is submitted to the inference server instead
+    of running in this process.
+    
+    Audio is decoded at its native sample rate and resampled once to
+    sample_rate with librosa.resample, as librosa.load(sr=...) did, so
+    features match those the classifier was trained on.
+    """
+    
+    def __init__(self, client=None, model_path: str = None):
         self.emotions = ['neutral', 'happy', 'sad', 'angry', 'fear']
+        self.model_path = model_path or get_setting('VOICE_MODEL_PATH')
+        self._classifier = None
+        self._classifier_checked = False
+        self.model_error = None
+        self._lock = threading.Lock()
+        self.sample_rate = 22050
+        self.max_duration = 3.0
+        self.client = client
+        self.is_warm = False
+    
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the audio stack has been imported (in the server when using a client)"""
+        if self.client is not None:
+            return self.is_warm
+        return 'librosa' in sys.modules
+    
+    def warmup(self) -> Dict[str, any]:
+        """
+        Import librosa and extract features from a short test tone so
+        the first real request does not pay for JIT compilation
+        
+        Returns:
+            Dict with the warm-up result
+        """
+        if self.client is not None:
+            try:
+                result = self.client.call('voice', 'warmup')
+            except InferenceError as e:
+                result = {'error': str(e)}
+            self.is_warm = 'error' not in result
+            return result
+        
+        t = np.arange(self.sample_rate, dtype=np.float32) / self.sample_rate
+        signal = 0.1 * np.sin(2 * np.pi * 220.0 * t)
+        features = self.extract_features_from_signal(signal, self.sample_rate)
+        self.classify(features)
+        self.is_warm = True
+        return {'features': int(features.shape[0]), 'model_loaded': self.classifier is not None}
+    
+    @property
+    def classifier(self) -> Optional[VoiceClassifier]:
+        """
+        The trained classifier, loaded on first access (None if no model
+        file exists, or it cannot be used; model_error then says why)
+        """
+        if not self._classifier_checked:
+            with self._lock:
+                if not self._classifier_checked:
+                    if self.model_path and os.path.exists(self.model_path):
+                        try:
+                            self._classifier = VoiceClassifier.load(self.model_path, input_dim=FEATURE_DIM)
+                            self.emotions = self._classifier.labels
+                        except (OSError, ValueError) as e:
+                            self.model_error = str(e)
+                    self._classifier_checked = True
+        return self._classifier
     
     def extract_features(self, audio_path: str) -> np.ndarray:
         """
@@ -23,31 +108,173 @@ class VoiceEmotionDetector:
         Returns:
             Feature vector as numpy array
         """
+        if self.client is not None:
+            try:
+                return self.client.call('voice', 'extract_features', audio_path)
+            except InferenceError:
+                return np.zeros(FEATURE_DIM)
+        
         try:
-            # Load audio file
-            y, sr = librosa.load(audio_path, duration=3, sr=22050)
+            return self.extract_features_from_signal(*self.prepare_signal(*self.load_signal(audio_path)))
             
-            # Extract features
-            mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-            mfcc_mean = np.mean(mfcc, axis=1)
-            
-            chroma = librosa.feature.chroma_stft(y=y, sr=sr)
-            chroma_mean = np.mean(chroma, axis=1)
+        except Exception as e:
+            return np.zeros(FEATURE_DIM)  # Return zero vector on error
+    
+    def load_signal(self, audio_path: str) -> Tuple[np.ndarray, int]:
+        """
+        Read the first max_duration seconds of an audio file at its native rate
+        
+        Args:
+            audio_path: Path to audio file
+        
+        Returns:
+            (mono signal, sample rate)
+        """
+        try:
+            return load_audio(audio_path, max_duration=self.max_duration)
+        except ValueError:
+            # librosa's audioread fallback covers formats soundfile cannot read
+            return _librosa().load(audio_path, duration=self.max_duration, sr=None)
+    
+    def extract_features_from_bytes(self, data) -> np.ndarray:
+        """
+        Extract acoustic features from an encoded audio file held in memory
+        
+        Args:
+            data: Encoded audio bytes (WAV/FLAC/OGG/MP3), bytes or memoryview
             
-            zcr = librosa.feature.zero_crossing_rate(y)
-            zcr_mean = np.mean(zcr)
+        Returns:
+            Feature vector as numpy array
             
-            # Combine features
-            features = np.concatenate([
-                mfcc_mean,
-                chroma_mean,
-                [zcr_mean]
-            ])
+        Raises:
+            ValueError if the audio cannot be decoded
+        """
+        y, sr = decode_audio(data, max_duration=self.max_duration)
+        return self.extract_features_from_signal(*self.prepare_signal(y, sr))
+    
+    def prepare_signal(self, y: np.ndarray, sr: int) -> Tuple[np.ndarray, int]:
+        """
+        Bring a signal to the rate features are extracted at
+        
+        Args:
+            y: Mono audio signal
+            sr: Sample rate of the signal
+        
+        Returns:
+            (signal, sample rate) to pass to extract_features_from_signal
+        """
+        if sr == self.sample_rate:
+            return y, sr
+        return _librosa().resample(y, orig_sr=sr, target_sr=self.sample_rate), self.sample_rate
+    
+    def extract_features_from_signal(self, y: np.ndarray, sr: int) -> np.ndarray:
+        """
+        Extract acoustic features from a decoded audio signal
+        
+        Args:
+            y: Mono audio signal
+            sr: Sample rate of the signal
             
-            return features
+        Returns:
+            Feature vector as numpy array (MFCC, chroma, ZCR, RMS and
+            spectral centroid means; see audio_features.FEATURE_NAMES)
+        """
+        return feature_extractor.extract(y, sr)
+    
+    def extract_features_batch(self, signals: List[np.ndarray], sr: int) -> np.ndarray:
+        """
+        Extract acoustic features from several decoded signals in one vectorized pass
+        
+        Args:
+            signals: Mono audio signals, all at sample rate sr
+            sr: Sample rate of the signals
             
-        except Exception as e:
-            return np.zeros(27)  # Return zero vector on error
+        Returns:
+            Array of shape (len(signals), FEATURE_DIM)
+        """
+        return feature_extractor.extract_batch(signals, sr)
+    
+    def stream_from_audio(self, source, window: float = None, hop: float = None,
+                          block_duration: float = 10.0) -> Iterator[Dict[str, any]]:
+        """
+        Detect emotions through a whole recording, reading it block by block
+        
+        An energy-based voice activity detector skips silence; voiced
+        segments are analyzed in windows of at most window seconds, sliding
+        by hop through long segments, and the windows completed by each
+        block are classified together.
+        
+        Args:
+            source: Audio file path or binary file-like object
+            window: Analysis window in seconds (default: max_duration)
+            hop: Step between windows of a long segment (default: half the window)
+            block_duration: Seconds of audio read at a time
+        
+        Returns:
+            Iterator of result dicts with start and end (seconds into the
+            recording), emotion, confidence and features, one per window
+        
+        Raises:
+            ValueError if the audio cannot be decoded
+        """
+        for segmenter, windows in self._segment_stream(source, window, hop, block_duration):
+            yield from self._classify_windows(windows, segmenter.sr)
+    
+    def analyze_audio(self, source, window: float = None, hop: float = None) -> Dict[str, any]:
+        """
+        Analyze a whole recording into per-segment emotions
+        
+        Args:
+            source: Audio file path or binary file-like object
+            window: Analysis window in seconds (default: max_duration)
+            hop: Step between windows of a long segment (default: half the window)
+        
+        Returns:
+            Dict with duration, voiced_duration (seconds) and segments (see
+            stream_from_audio)
+        """
+        segmenter = None
+        segments = []
+        try:
+            for segmenter, windows in self._segment_stream(source, window, hop):
+                segments.extend(self._classify_windows(windows, segmenter.sr))
+        except ValueError as e:
+            return self._error_result(str(e))
+        
+        if segmenter is None:
+            return self._error_result('Audio contains no samples')
+        
+        return {
+            'duration': round(segmenter.duration, 3),
+            'voiced_duration': round(segmenter.voiced_duration, 3),
+            'segments': segments,
+            'audio_processed': True
+        }
+    
+    def _segment_stream(self, source, window: float = None, hop: float = None, block_duration: float = 10.0):
+        """Yield (segmenter, completed windows) after each block read and at the end of the stream"""
+        window = window or self.max_duration
+        segmenter = None
+        for block, sr in iter_audio_blocks(source, block_duration):
+            if segmenter is None:
+                segmenter = VoiceActivitySegmenter(sr, window=window, hop=hop or window / 2)
+            yield segmenter, segmenter.process(block)
+        
+        if segmenter is not None:
+            yield segmenter, segmenter.flush()
+    
+    def _classify_windows(self, windows: List[Tuple[float, float, np.ndarray]], sr: int) -> List[Dict[str, any]]:
+        """Classify the (start, end, samples) windows of one segmenter call in one batch"""
+        if not windows:
+            return []
+        
+        prepared = [self.prepare_signal(samples, sr) for _, _, samples in windows]
+        features = self.extract_features_batch([y for y, _ in prepared], prepared[0][1])
+        results = self.predict_batch(features)
+        for (start, end, _), result in zip(windows, results):
+            result['start'] = start
+            result['end'] = end
+        return results
     
     def detect_from_audio(self, audio_path: str) -> Dict[str, any]:
         """
@@ -59,27 +286,126 @@ class VoiceEmotionDetector:
         Returns:
             Dict with emotion, confidence, and features
         """
+        if self.client is not None:
+            try:
+                return self.client.call('voice', 'detect_from_audio', audio_path)
+            except InferenceError as e:
+                return self._error_result(str(e))
+        
         try:
-            features = self.extract_features(audio_path)
+            return self.classify(self.extract_features(audio_path))
+        except Exception as e:
+            return self._error_result(str(e))
+    
+    def detect_from_bytes(self, data) -> Dict[str, any]:
+        """
+        Detect emotion from an encoded audio file held in memory
+        
+        Args:
+            data: Encoded audio bytes (WAV/FLAC/OGG/MP3), bytes or memoryview
             
-            # Placeholder classification - will implement ML model later
-            # For now, return neutral with low confidence
-            return {
+        Returns:
+            Dict with emotion, confidence, and features
+        """
+        if self.client is not None:
+            try:
+                return self.client.call('voice', 'detect_from_bytes', bytes(data))
+            except InferenceError as e:
+                return self._error_result(str(e))
+        
+        try:
+            return self.classify(self.extract_features_from_bytes(data))
+        except Exception as e:
+            return self._error_result(str(e))
+    
+    def detect_batch_from_bytes(self, payloads: List[bytes]) -> List[Dict[str, any]]:
+        """
+        Detect emotions from several encoded audio files, classifying all
+        of them in one predict_batch call
+        
+        Args:
+            payloads: Encoded audio bytes of each file
+        
+        Returns:
+            One result dict per payload, in order
+        """
+        if self.client is not None:
+            try:
+                return self.client.call('voice', 'detect_batch_from_bytes', [bytes(data) for data in payloads])
+            except InferenceError as e:
+                return [self._error_result(str(e)) for _ in payloads]
+        
+        results = [None] * len(payloads)
+        decoded = []
+        features = []
+        for i, data in enumerate(payloads):
+            try:
+                features.append(self.extract_features_from_bytes(data))
+                decoded.append(i)
+            except Exception as e:
+                results[i] = self._error_result(str(e))
+        
+        if features:
+            try:
+                predictions = self.predict_batch(np.stack(features))
+            except Exception as e:
+                predictions = [self._error_result(str(e)) for _ in decoded]
+            for i, result in zip(decoded, predictions):
+                results[i] = result
+        return results
+    
+    def classify(self, features: np.ndarray) -> Dict[str, any]:
+        """
+        Classify a feature vector
+        
+        Args:
+            features: Feature vector from extract_features
+            
+        Returns:
+            Dict with emotion, confidence, and features
+        """
+        return self.predict_batch(np.asarray(features)[np.newaxis])[0]
+    
+    def predict_batch(self, features: np.ndarray) -> List[Dict[str, any]]:
+        """
+        Classify a batch of feature vectors in one vectorized pass
+        
+        Args:
+            features: Array of shape (N, FEATURE_DIM)
+        
+        Returns:
+            List of N dicts with emotion, confidence, all_emotions and features
+        """
+        classifier = self.classifier
+        if classifier is None:
+            return [{
                 'emotion': 'neutral',
                 'confidence': 0.5,
-                'features': features.tolist(),
+                'features': row.tolist(),
                 'audio_processed': True,
-                'note': 'Voice ML model pending - using placeholder'
-            }
-            
-        except Exception as e:
-            return {
-                'emotion': 'neutral',
-                'confidence': 0.0,
-                'error': str(e),
-                'audio_processed': False
-            }
+                'note': f'Voice ML model unusable ({self.model_error}) - using placeholder' if self.model_error
+                else 'Voice ML model pending - using placeholder'
+            } for row in features]
+        
+        probabilities = classifier.predict_proba(features)
+        best = probabilities.argmax(axis=1)
+        return [{
+            'emotion': classifier.labels[index],
+            'confidence': float(row[index]),
+            'all_emotions': {label: float(p) for label, p in zip(classifier.labels, row)},
+            'features': vector.tolist(),
+            'audio_processed': True
+        } for vector, row, index in zip(features, probabilities, best)]
+    
+    def _error_result(self, error: str) -> Dict[str, any]:
+        """Build the result dict returned when detection fails"""
+        return {
+            'emotion': 'neutral',
+            'confidence': 0.0,
+            'error': error,
+            'audio_processed': False
+        }
 
 
-# Singleton instance
-voice_detector = VoiceEmotionDetector()
+# Singleton instance (a client of the inference server when ML_INFERENCE_BACKEND='server')
+voice_detector = VoiceEmotionDetector(client=get_inference_client())
@@ -0,0 +1,85 @@
+"""
+Model warm-up and readiness helpers
+"""
+import sys
+import time
+from typing import Dict, Iterable
+
+
+DETECTORS = {
+    'facial': ('ml_models.facial_emotion', 'facial_detector'),
+    'voice': ('ml_models.voice_emotion', 'voice_detector'),
+}
+
+
+def _get_detector(name: str, load: bool = True):
+    """Return a detector singleton, importing its module only if load is True"""
+    module_name, attribute = DETECTORS[name]
+    module = sys.modules.get(module_name)
+    
+    if module is None and load:
+        module = __import__(module_name, fromlist=[attribute])
+    
+    return getattr(module, attribute) if module is not None else None
+
+
+def warmup_models(names: Iterable[str] = None) -> Dict[str, Dict[str, any]]:
+    """
+    Load model weights and run a dummy inference for each detector
+    
+    Args:
+        names: Detector names to warm up (defaults to all)
+        
+    Returns:
+        Dict mapping detector name to its warm-up status and duration
+    """
+    report = {}
+    
+    for name in names or DETECTORS:
+        started = time.perf_counter()
+        try:
+            result = _get_detector(name).warmup()
+            report[name] = {'warm': 'error' not in result, 'error': result.get('error')}
+        except Exception as e:
+            report[name] = {'warm': False, 'error': str(e)}
+        report[name]['seconds'] = round(time.perf_counter() - started, 3)
+    
+    return report
+
+
+def model_status() -> Dict[str, Dict[str, bool]]:
+    """
+    Report whether each detector is loaded and warm, without loading anything
+    
+    Returns:
+        Dict mapping detector name to 'loaded' and 'warm' flags, plus
+        micro-batching, cache and tracking metrics where enabled
+    """
+    status = {}
+    
+    for name in DETECTORS:
+        detector = _get_detector(name, load=False)
+        status[name] = {
+            'loaded': bool(detector and detector.is_loaded),
+            'warm': bool(detector and detector.is_warm),
+        }
+        
+        classifier = getattr(detector, 'classifier', None)
+        if classifier is not None:
+            status[name]['classifier'] = classifier.name
+        if getattr(detector, 'model_error', None):
+            status[name]['model_error'] = detector.model_error
+        
+        batcher = getattr(detector, 'batcher', None)
+        if batcher is not None:
+            status[name]['batching'] = batcher.stats()
+        
+        cache = getattr(detector, 'cache', None)
+        if cache is not None:
+            status[name]['cache'] = cache.stats()
+        
+        tracker = getattr(detector, 'tracker', None)
+        if tracker is not None:
+            status[name]['tracking'] = tracker.stats()
+    
+    return status